@@ -0,0 +1,46 @@
+"""Criar tabela job
+
+Revision ID: a3c9e1f27b54
+Revises: 63b90855f98e
+Create Date: 2026-10-19 10:12:31.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f27b54'
+down_revision: Union[str, Sequence[str], None] = '63b90855f98e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job',
+        sa.Column('id_job', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('parametros', sa.Text(), nullable=True),
+        sa.Column('progresso', sa.Integer(), nullable=False),
+        sa.Column('mensagem', sa.String(length=255), nullable=True),
+        sa.Column('resultado', sa.Text(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('cancelar', sa.Boolean(), nullable=False),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.Column('iniciado_em', sa.DateTime(), nullable=True),
+        sa.Column('concluido_em', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id_job')
+    )
+    op.create_index('ix_job_status_id', 'job', ['status', 'id_job'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_status_id', table_name='job')
+    op.drop_table('job')
@@ -0,0 +1,32 @@
+"""Adicionar encargos por atraso (multa e juros) à parcela
+
+Revision ID: a9c2e7f4d130
+Revises: d8a3f5e2b619
+Create Date: 2026-10-19 19:26:44.118903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c2e7f4d130'
+down_revision: Union[str, Sequence[str], None] = 'd8a3f5e2b619'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('parcela', sa.Column('valor_multa', sa.Numeric(precision=12, scale=2), nullable=True))
+    op.add_column('parcela', sa.Column('valor_juros', sa.Numeric(precision=12, scale=2), nullable=True))
+    op.add_column('parcela', sa.Column('data_calculo_encargos', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('parcela', 'data_calculo_encargos')
+    op.drop_column('parcela', 'valor_juros')
+    op.drop_column('parcela', 'valor_multa')
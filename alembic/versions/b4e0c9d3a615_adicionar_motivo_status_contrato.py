@@ -0,0 +1,28 @@
+"""Adicionar motivo da última mudança de status ao contrato
+
+Revision ID: b4e0c9d3a615
+Revises: f2b7d6a1c384
+Create Date: 2026-10-19 18:05:31.582046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e0c9d3a615'
+down_revision: Union[str, Sequence[str], None] = 'f2b7d6a1c384'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contrato', sa.Column('motivo_status', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contrato', 'motivo_status')
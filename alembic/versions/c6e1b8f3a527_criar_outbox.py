@@ -0,0 +1,46 @@
+"""Criar outbox de mensagens (lembretes de vencimento e status de solicitação)
+
+Revision ID: c6e1b8f3a527
+Revises: a9c2e7f4d130
+Create Date: 2026-10-19 20:05:31.402716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e1b8f3a527'
+down_revision: Union[str, Sequence[str], None] = 'a9c2e7f4d130'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox',
+        sa.Column('id_outbox', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('canal', sa.String(length=10), nullable=False),
+        sa.Column('destinatario', sa.String(length=150), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('chave', sa.String(length=100), nullable=True),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('tentativas', sa.Integer(), nullable=False),
+        sa.Column('proxima_tentativa', sa.DateTime(), nullable=False),
+        sa.Column('reservado_em', sa.DateTime(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.Column('enviado_em', sa.DateTime(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id_outbox'),
+        sa.UniqueConstraint('chave')
+    )
+    op.create_index('ix_outbox_status_proxima_tentativa', 'outbox', ['status', 'proxima_tentativa'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_status_proxima_tentativa', table_name='outbox')
+    op.drop_table('outbox')
@@ -0,0 +1,41 @@
+"""Criar aging_snapshot e índice de parcelas por status e vencimento
+
+Revision ID: c71d4b8e09a2
+Revises: a3c9e1f27b54
+Create Date: 2026-10-19 14:03:52.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71d4b8e09a2'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f27b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('aging_snapshot',
+        sa.Column('id_snapshot', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('data_referencia', sa.Date(), nullable=False),
+        sa.Column('marca', sa.String(length=80), nullable=False),
+        sa.Column('ano_modelo', sa.Integer(), nullable=False),
+        sa.Column('faixa_renda', sa.String(length=20), nullable=False),
+        sa.Column('faixa_atraso', sa.String(length=20), nullable=False),
+        sa.Column('qtde_parcelas', sa.Integer(), nullable=False),
+        sa.Column('valor', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('id_snapshot'),
+        sa.UniqueConstraint('data_referencia', 'marca', 'ano_modelo', 'faixa_renda', 'faixa_atraso', name='uq_aging_snapshot')
+    )
+    op.create_index('ix_parcela_status_vencimento', 'parcela', ['status', 'data_vencimento'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parcela_status_vencimento', table_name='parcela')
+    op.drop_table('aging_snapshot')
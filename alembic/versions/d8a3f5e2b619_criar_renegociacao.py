@@ -0,0 +1,47 @@
+"""Criar histórico de renegociações e sistema de amortização do financeiro
+
+Revision ID: d8a3f5e2b619
+Revises: b4e0c9d3a615
+Create Date: 2026-10-19 18:47:12.640381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3f5e2b619'
+down_revision: Union[str, Sequence[str], None] = 'b4e0c9d3a615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('financeiro', sa.Column('sistema_amortizacao', sa.String(length=5), server_default='price', nullable=False))
+    op.create_table('renegociacao',
+        sa.Column('id_renegociacao', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('id_financeiro', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('data', sa.DateTime(), nullable=False),
+        sa.Column('valor_pago', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('saldo_anterior', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('saldo_novo', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('taxa_anterior', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('taxa_nova', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('sistema', sa.String(length=5), nullable=False),
+        sa.Column('parcelas_anteriores', sa.Integer(), nullable=False),
+        sa.Column('parcelas_novas', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['id_financeiro'], ['financeiro.id_financeiro'], ),
+        sa.PrimaryKeyConstraint('id_renegociacao')
+    )
+    op.create_index('ix_renegociacao_id_financeiro', 'renegociacao', ['id_financeiro'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_renegociacao_id_financeiro', table_name='renegociacao')
+    op.drop_table('renegociacao')
+    op.drop_column('financeiro', 'sistema_amortizacao')
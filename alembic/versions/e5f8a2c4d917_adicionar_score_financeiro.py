@@ -0,0 +1,40 @@
+"""Adicionar pré-análise de risco ao financeiro e índice de contratos por cliente
+
+Revision ID: e5f8a2c4d917
+Revises: c71d4b8e09a2
+Create Date: 2026-10-19 16:41:07.274519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f8a2c4d917'
+down_revision: Union[str, Sequence[str], None] = 'c71d4b8e09a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('financeiro', sa.Column('renda_mensal', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.add_column('financeiro', sa.Column('comprometimento_renda', sa.Numeric(precision=8, scale=4), nullable=True))
+    op.add_column('financeiro', sa.Column('ltv', sa.Numeric(precision=8, scale=4), nullable=True))
+    op.add_column('financeiro', sa.Column('exposicao', sa.Numeric(precision=14, scale=2), nullable=True))
+    op.add_column('financeiro', sa.Column('score_risco', sa.Integer(), nullable=True))
+    op.create_index('ix_financeiro_score_risco', 'financeiro', ['score_risco'], unique=False)
+    op.create_index('ix_contrato_id_cliente', 'contrato', ['id_cliente'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contrato_id_cliente', table_name='contrato')
+    op.drop_index('ix_financeiro_score_risco', table_name='financeiro')
+    op.drop_column('financeiro', 'score_risco')
+    op.drop_column('financeiro', 'exposicao')
+    op.drop_column('financeiro', 'ltv')
+    op.drop_column('financeiro', 'comprometimento_renda')
+    op.drop_column('financeiro', 'renda_mensal')
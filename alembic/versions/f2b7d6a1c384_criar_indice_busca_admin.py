@@ -0,0 +1,31 @@
+"""Criar índice de busca do admin (FTS5 trigram no SQLite, pg_trgm no PostgreSQL)
+
+Revision ID: f2b7d6a1c384
+Revises: e5f8a2c4d917
+Create Date: 2026-10-19 17:22:48.903115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from servicos.busca import criar_indice_busca, popular_indice_busca, remover_indice_busca
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7d6a1c384'
+down_revision: Union[str, Sequence[str], None] = 'e5f8a2c4d917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conexao = op.get_bind()
+    criar_indice_busca(conexao)
+    popular_indice_busca(conexao)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    remover_indice_busca(op.get_bind())
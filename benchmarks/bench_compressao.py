@@ -0,0 +1,110 @@
+"""
+Benchmark de compressão de respostas.
+
+Gera payloads reais de ContratoCompletoSchema (de 1 a 72 parcelas) e da
+listagem /admin/contratos (de 10 a 5000 contratos) e mede, para cada
+faixa de tamanho, os bytes trafegados e o custo de CPU de gzip/brotli.
+Use o resultado para ajustar COMPRESSAO_TAMANHO_MINIMO.
+
+Uso:
+    python benchmarks/bench_compressao.py > bench_output.txt
+"""
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from middlewares.compressao import brotli, comprimir
+from schemas import (
+    ContratoCompletoSchema, VeiculoCompletoSchema, FinanceiroCompletoSchema, ParcelaSchema,
+    ClienteInfoSchema, ContratosVigentesResponseSchema, ContratoListaSchema
+)
+
+REPETICOES = 200
+
+
+def payload_contrato(qtde_parcelas: int) -> bytes:
+    hoje = date.today()
+    parcelas = [
+        ParcelaSchema(
+            id_parcela=i,
+            numero_parcela=i,
+            valor_parcela=1532.47,
+            data_vencimento=hoje + timedelta(days=30 * i),
+            status="pendente"
+        ) for i in range(1, qtde_parcelas + 1)
+    ]
+    contrato = ContratoCompletoSchema(
+        id_contrato=1,
+        numero_contrato="CT-20250101-0001",
+        status="ativo",
+        id_cliente=1,
+        data_emissao=hoje,
+        veiculo=VeiculoCompletoSchema(
+            id_veiculo=1, marca="Fiat", modelo="Uno", ano_fabricacao=2024, ano_modelo=2024,
+            cor="Branco", placa="ABC1234", num_chassi="9BW12345678901234", num_renavam="12345678901",
+            valor=50000.0
+        ),
+        financeiro=FinanceiroCompletoSchema(
+            id_financeiro=1, valor_total=54000.0, valor_entrada=10000.0, taxa_juros=1.5,
+            qtde_parcelas=qtde_parcelas, data_primeiro_vencimento=hoje, status_pagamento="em_dia",
+            data_criacao=hoje, parcelas=parcelas
+        ),
+        cliente=ClienteInfoSchema(
+            id_cliente=1, nome="Cliente Teste", cpf="12345678901", email="cliente@teste.com",
+            telefone="11999999999", renda=5000.0
+        )
+    )
+    return contrato.model_dump_json().encode()
+
+
+def payload_lista_contratos(qtde_contratos: int) -> bytes:
+    contratos = [
+        ContratoListaSchema(
+            id_contrato=i,
+            numero_contrato=f"CT-20250101-{i:04d}",
+            id_cliente=i,
+            nome_cliente=f"Cliente {i}",
+            marca_veiculo="Fiat",
+            modelo_veiculo="Uno",
+            valor_total=54000.0 + i,
+            status="ativo",
+            data_emissao=date.today()
+        ) for i in range(1, qtde_contratos + 1)
+    ]
+    resposta = ContratosVigentesResponseSchema(contratos=contratos, total=len(contratos))
+    return resposta.model_dump_json().encode()
+
+
+def medir(corpo: bytes, codificacao: str) -> dict:
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        comprimido = comprimir(corpo, codificacao)
+    duracao = (time.perf_counter() - inicio) / REPETICOES
+    return {
+        "bytes": len(comprimido),
+        "razao": round(len(comprimido) / len(corpo), 4),
+        "cpu_us": round(duracao * 1_000_000, 1),
+    }
+
+
+def main():
+    payloads = [(f"contrato_{n}_parcelas", payload_contrato(n)) for n in (1, 6, 12, 36, 72)]
+    payloads += [(f"lista_{n}_contratos", payload_lista_contratos(n)) for n in (10, 100, 1000, 5000)]
+
+    codificacoes = ["gzip"] + (["br"] if brotli is not None else [])
+    resultados = []
+    for nome, corpo in sorted(payloads, key=lambda item: len(item[1])):
+        linha = {"payload": nome, "bytes_original": len(corpo)}
+        for codificacao in codificacoes:
+            linha[codificacao] = medir(corpo, codificacao)
+        resultados.append(linha)
+
+    print(json.dumps({"repeticoes": REPETICOES, "resultados": resultados}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark do cálculo de encargos por atraso (multa + juros de mora).
+
+Mede três caminhos, em milhões de parcelas:
+- calcular_encargos(): a passada em Python sobre as colunas (usada na leitura do contrato);
+- acumular_encargos(): o lote noturno, um UPDATE por faixa de id_parcela;
+- o agregado do dashboard (SUM do valor atualizado das parcelas em atraso).
+
+Os dois últimos rodam num SQLite temporário gerado por scripts/gerar_dados.py.
+
+Uso:
+    python benchmarks/bench_encargos.py --parcelas 2000000 --contratos 60000 > bench_output.txt
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Parcela, criar_engine
+from scripts.gerar_dados import gerar_carteira
+from servicos.encargos import acumular_encargos, calcular_encargos
+from servicos.painel_admin import calcular_metricas_dashboard
+
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def bench_python(linhas: int, hoje: date) -> dict:
+    aleatorio = random.Random(42)
+    valores = [round(aleatorio.uniform(300, 5000), 2) for _ in range(linhas)]
+    vencimentos = [hoje - timedelta(days=aleatorio.randint(-720, 180)) for _ in range(linhas)]
+    _, duracao = cronometrar(calcular_encargos, valores, vencimentos, hoje)
+    return {"linhas": linhas, "segundos": round(duracao, 3), "linhas_por_s": round(linhas / duracao)}
+
+
+def bench_banco(contratos: int, hoje: date) -> dict:
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_engine(f"sqlite:///{diretorio}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        gerar_carteira(engine, clientes=max(contratos // 5, 1), contratos=contratos, taxa_inadimplencia=0.2, hoje=hoje)
+        with sessionmaker(bind=engine)() as session:
+            total = session.query(func.count(Parcela.id_parcela)).scalar()
+            atualizadas, duracao_lote = cronometrar(acumular_encargos, session, hoje)
+            metricas, duracao_dashboard = cronometrar(calcular_metricas_dashboard, session)
+        engine.dispose()
+    return {
+        "parcelas": total,
+        "lote": {"atualizadas": atualizadas, "segundos": round(duracao_lote, 3)},
+        "dashboard": {
+            "segundos": round(duracao_dashboard, 3),
+            "em_atraso": metricas.parcelas_em_atraso_qtd,
+            "valor_nominal": metricas.parcelas_em_atraso_valor,
+            "valor_atualizado": metricas.parcelas_em_atraso_valor_atualizado,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos encargos por atraso")
+    parser.add_argument("--parcelas", type=int, default=2_000_000, help="Linhas da passada em Python")
+    parser.add_argument("--contratos", type=int, default=60_000, help="Contratos da carteira no SQLite")
+    args = parser.parse_args()
+
+    hoje = date.today()
+    print(json.dumps({
+        "python": bench_python(args.parcelas, hoje),
+        "banco": bench_banco(args.contratos, hoje),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compara dois resultados do bench_carga.py (ex.: commit anterior x atual).
+
+Uso:
+    python benchmarks/comparar.py base.json atual.json [--tolerancia 0.10]
+
+Sai com código 1 se alguma rota piorar o p95 ou o rps além da tolerância.
+"""
+import argparse
+import json
+import sys
+
+
+def carregar(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    return {(r["metodo"], r["rota"]): r for r in dados["resultados"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark")
+    parser.add_argument("base")
+    parser.add_argument("atual")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Piora relativa aceita (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    base = carregar(args.base)
+    atual = carregar(args.atual)
+    regressoes = []
+
+    print(f"{'rota':52} {'p95 base':>10} {'p95 atual':>10} {'rps base':>10} {'rps atual':>10}")
+    for chave in sorted(base.keys() & atual.keys()):
+        b, a = base[chave], atual[chave]
+        nome = f"{chave[0]} {chave[1]}"
+        print(f"{nome:52} {b['p95_ms']:>10} {a['p95_ms']:>10} {b['rps']:>10} {a['rps']:>10}")
+        if b["p95_ms"] and a["p95_ms"] > b["p95_ms"] * (1 + args.tolerancia):
+            regressoes.append(f"{nome}: p95 {b['p95_ms']} -> {a['p95_ms']} ms")
+        if b["rps"] and a["rps"] < b["rps"] * (1 - args.tolerancia):
+            regressoes.append(f"{nome}: rps {b['rps']} -> {a['rps']}")
+
+    if regressoes:
+        print("\nRegressões:")
+        for regressao in regressoes:
+            print(f"  - {regressao}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+
+# Vagas simultâneas por classe de rota; a soma cabe no pool do PostgreSQL (5 + 10 de overflow)
+LIMITES_ADMISSAO_PADRAO = {"auth": 3, "cliente": 6, "admin": 2, "escrita": 4}
+
+
+def _limites(valor: str | None) -> dict:
+    """Lê "auth=3,cliente=6,..." sobre os limites padrão"""
+    limites = dict(LIMITES_ADMISSAO_PADRAO)
+    for item in (valor or "").split(","):
+        if item.strip():
+            nome, limite = item.split("=")
+            limites[nome.strip()] = int(limite)
+    return limites
+
+
+def _prazos(valor: str | None) -> dict:
+    """Lê "/admin/contratos=30,/cliente/me=2" (template da rota = segundos)"""
+    prazos = {}
+    for item in (valor or "").split(","):
+        if item.strip():
+            rota, prazo = item.rsplit("=", 1)
+            prazos[rota.strip()] = float(prazo)
+    return prazos
+
+
+def _bool(valor: str | None, padrao: bool) -> bool:
+    if valor is None or valor == "":
+        return padrao
+    return valor.lower() in ("1", "true", "sim", "yes")
+
+
+@dataclass
+class Settings:
+    """Configurações da aplicação. Use Settings.do_ambiente() para ler do .env / variáveis de ambiente."""
+
+    secret_key: str
+    algorithm: str = "HS256"
+    access_token_expire_minutes: int = 30
+    database_url: str = "sqlite:///./database.db"
+
+    # Compressão de respostas (tamanho mínimo em bytes para comprimir)
+    compressao_tamanho_minimo: int = 1024
+    compressao_nivel_gzip: int = 6
+    compressao_qualidade_brotli: int = 4
+
+    # Server-Timing: linha de log estruturada por requisição (o header é sempre enviado)
+    server_timing_log: bool = True
+
+    # Log de consultas lentas: limite em ms (None = desligado) e captura opcional do EXPLAIN
+    slow_query_ms: float | None = None
+    slow_query_explain: bool = False
+
+    # Se definido, o /metrics exige "Authorization: Bearer <metricas_token>"
+    metricas_token: str | None = None
+
+    cors_origens: list = field(default_factory=lambda: ["*"])
+
+    # Workers de jobs em segundo plano dentro da API (0 = só via python -m scripts.worker_jobs)
+    jobs_workers: int = 1
+    jobs_intervalo: float = 1.0
+
+    # Streams SSE: intervalo do heartbeat e duração máxima de uma conexão em segundos (o navegador reconecta)
+    sse_heartbeat: float = 15.0
+    sse_duracao_maxima: float | None = 300.0
+
+    # Controle de admissão: vagas por classe de rota, fila de espera por classe e espera máxima (s)
+    # antes de responder 503; Retry-After em segundos
+    admissao_ativa: bool = True
+    admissao_limites: dict = field(default_factory=lambda: dict(LIMITES_ADMISSAO_PADRAO))
+    admissao_fila: int = 10
+    admissao_espera_maxima: float = 1.0
+    admissao_retry_after: int = 1
+
+    # Prazo das requisições (s), propagado ao banco como timeout de statement; por template de rota
+    # em prazos_rotas, senão prazo_padrao (None = sem limite)
+    prazo_padrao: float | None = 10.0
+    prazos_rotas: dict = field(default_factory=dict)
+
+    @classmethod
+    def do_ambiente(cls) -> "Settings":
+        load_dotenv()
+        slow_query_ms = os.getenv("SLOW_QUERY_MS")
+        return cls(
+            secret_key=os.getenv("SECRET_KEY"),
+            algorithm=os.getenv("ALGORITHM", "HS256"),
+            access_token_expire_minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+            database_url=os.getenv("DATABASE_URL", "sqlite:///./database.db"),
+            compressao_tamanho_minimo=int(os.getenv("COMPRESSAO_TAMANHO_MINIMO", "1024")),
+            compressao_nivel_gzip=int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6")),
+            compressao_qualidade_brotli=int(os.getenv("COMPRESSAO_QUALIDADE_BROTLI", "4")),
+            server_timing_log=_bool(os.getenv("SERVER_TIMING_LOG"), True),
+            slow_query_ms=float(slow_query_ms) if slow_query_ms else None,
+            slow_query_explain=_bool(os.getenv("SLOW_QUERY_EXPLAIN"), False),
+            metricas_token=os.getenv("METRICAS_TOKEN") or None,
+            jobs_workers=int(os.getenv("JOBS_WORKERS", "1")),
+            jobs_intervalo=float(os.getenv("JOBS_INTERVALO", "1.0")),
+            sse_heartbeat=float(os.getenv("SSE_HEARTBEAT", "15")),
+            sse_duracao_maxima=float(os.getenv("SSE_DURACAO_MAXIMA", "300")) or None,
+            admissao_ativa=_bool(os.getenv("ADMISSAO_ATIVA"), True),
+            admissao_limites=_limites(os.getenv("ADMISSAO_LIMITES")),
+            admissao_fila=int(os.getenv("ADMISSAO_FILA", "10")),
+            admissao_espera_maxima=float(os.getenv("ADMISSAO_ESPERA_MAXIMA", "1.0")),
+            admissao_retry_after=int(os.getenv("ADMISSAO_RETRY_AFTER", "1")),
+            prazo_padrao=float(os.getenv("PRAZO_PADRAO", "10")) or None,
+            prazos_rotas=_prazos(os.getenv("PRAZOS_ROTAS")),
+        )
+
+
+@lru_cache
+def obter_settings() -> Settings:
+    """Settings lidas do ambiente uma única vez por processo"""
+    return Settings.do_ambiente()
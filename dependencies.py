@@ -1,13 +1,18 @@
-from fastapi import Depends, HTTPException
-from main import SECRET_KEY, ALGORITHM, oauth2_schema
-from models import db
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
 from models import Usuario
 from jose import jwt, JWTError
+from slowapi import Limiter
+from slowapi.util import get_remote_address
 
-def pegar_sessao():
-    SessionLocal = sessionmaker(bind=db, autocommit=False, autoflush=False)
-    session = SessionLocal()
+limiter = Limiter(key_func=get_remote_address)
+oauth2_schema = OAuth2PasswordBearer(tokenUrl="auth/login-form")
+
+
+def pegar_sessao(request: Request):
+    # A fábrica de sessões é criada no lifespan da aplicação (ver main.create_app)
+    session = request.app.state.session_factory()
     try:
         yield session
     except Exception:
@@ -16,9 +21,10 @@ def pegar_sessao():
     finally:
         session.close()
 
-def verificar_token(token: str = Depends(oauth2_schema), session: Session = Depends(pegar_sessao)):
+def verificar_token(request: Request, token: str = Depends(oauth2_schema), session: Session = Depends(pegar_sessao)):
+    settings = request.app.state.settings
     try:
-        dic_info = jwt.decode(token, SECRET_KEY, ALGORITHM)
+        dic_info = jwt.decode(token, settings.secret_key, settings.algorithm)
         id_usuario = dic_info.get("sub")
     except JWTError as erro:
         print(erro)
@@ -31,4 +37,4 @@ def verificar_token(token: str = Depends(oauth2_schema), session: Session = Depe
 def verificar_admin(usuario: Usuario = Depends(verificar_token)):
     if usuario.id_perfil != 2:
         raise HTTPException(status_code=403, detail="Acesso negado. Apenas administradores podem acessar esta rota.")
-    return usuario
\ No newline at end of file
+    return usuario
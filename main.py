@@ -1,43 +1,149 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from passlib.context import CryptContext
-from fastapi.security import OAuth2PasswordBearer
-from dotenv import load_dotenv
-import os
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings, obter_settings
+from dependencies import limiter
+from middlewares.admissao import AdmissaoMiddleware
+from middlewares.compressao import CompressaoMiddleware
+from middlewares.server_timing import ServerTimingMiddleware, JSONResponseMedida
+from middlewares.metricas import MetricasMiddleware
+from servicos.metricas import rate_limit_rejeicoes, registrar_gauges_pool
+from servicos.prazos import PrazoExcedido
+
+logger = logging.getLogger("aureus")
+
+
+def rate_limit_excedido(request, exc):
+    rota = request.scope.get("route")
+    rate_limit_rejeicoes.inc(rota.path if rota is not None else "desconhecida")
+    return _rate_limit_exceeded_handler(request, exc)
+
+
+def prazo_excedido(request, exc):
+    return JSONResponse(status_code=504, content={"detail": "Tempo limite da requisição excedido"})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Cria a engine e a fábrica de sessões na subida de cada worker e libera o pool na descida.
+    Com workers pré-carregados (gunicorn --preload), cada processo abre o próprio pool após o fork.
+    """
+    from models import criar_engine
+    from servicos.consultas_lentas import LogConsultasLentas
+    from servicos.jobs import WorkerJobs
+    from servicos.prazos import PrazosConsultas
+
+    inicio = time.perf_counter()
+    settings = app.state.settings
+    engine = criar_engine(settings.database_url)
+    app.state.engine = engine
+    app.state.session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    registrar_gauges_pool(engine)
+
+    prazos_consultas = None
+    if settings.prazo_padrao or settings.prazos_rotas:
+        prazos_consultas = PrazosConsultas(engine, settings.prazo_padrao, settings.prazos_rotas).registrar()
+    app.state.prazos_consultas = prazos_consultas
+
+    log_consultas_lentas = None
+    if settings.slow_query_ms is not None:
+        log_consultas_lentas = LogConsultasLentas(
+            engine, settings.slow_query_ms, capturar_explain=settings.slow_query_explain
+        ).registrar()
+
+    worker_jobs = None
+    if settings.jobs_workers > 0:
+        worker_jobs = WorkerJobs(app.state.session_factory, settings.jobs_workers, settings.jobs_intervalo).iniciar()
+
+    logger.info("startup do lifespan em %.1f ms", (time.perf_counter() - inicio) * 1000)
+    try:
+        yield
+    finally:
+        if worker_jobs:
+            worker_jobs.parar()
+        if log_consultas_lentas:
+            log_consultas_lentas.remover()
+        if prazos_consultas:
+            prazos_consultas.remover()
+        engine.dispose()
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Monta a aplicação. Sem argumentos, lê as configurações do ambiente (.env).
+    Os testes podem criar apps isolados passando Settings próprias.
+    """
+    settings = settings or obter_settings()
+    if not settings.secret_key:
+        raise RuntimeError("SECRET_KEY não configurada")
+
+    app = FastAPI(default_response_class=JSONResponseMedida, lifespan=lifespan)
+    app.state.settings = settings
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, rate_limit_excedido)
+    app.add_exception_handler(PrazoExcedido, prazo_excedido)
+
+    # O mais interno: o 503 de sobrecarga também recebe CORS, compressão e métricas
+    if settings.admissao_ativa:
+        app.add_middleware(
+            AdmissaoMiddleware,
+            limites=settings.admissao_limites,
+            fila=settings.admissao_fila,
+            espera_maxima=settings.admissao_espera_maxima,
+            retry_after=settings.admissao_retry_after,
+        )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origens,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
 
-load_dotenv()
+    app.add_middleware(
+        CompressaoMiddleware,
+        tamanho_minimo=settings.compressao_tamanho_minimo,
+        nivel_gzip=settings.compressao_nivel_gzip,
+        qualidade_brotli=settings.compressao_qualidade_brotli,
+    )
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+    app.add_middleware(MetricasMiddleware)
 
-limiter = Limiter(key_func=get_remote_address)
+    # Adicionado por último para ser o mais externo e medir a requisição inteira
+    app.add_middleware(ServerTimingMiddleware, registrar_log=settings.server_timing_log)
 
-app = FastAPI()
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    # Rotas importadas aqui para não haver import circular com este módulo
+    from routes.auth_routes import auth_router
+    from routes.admin_routes import admin_router
+    from routes.cliente_routes import cliente_router
+    from routes.metricas_routes import metricas_router
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "*",
-    ],
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-)
+    app.include_router(admin_router)
+    app.include_router(cliente_router)
+    app.include_router(auth_router)
+    app.include_router(metricas_router)
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_schema = OAuth2PasswordBearer(tokenUrl="auth/login-form")
+    return app
 
-from routes.auth_routes import auth_router
-from routes.admin_routes import admin_router
-from routes.cliente_routes import cliente_router
 
-app.include_router(admin_router)
-app.include_router(cliente_router)
-app.include_router(auth_router)
\ No newline at end of file
+def __getattr__(nome):
+    """
+    "uvicorn main:app" continua funcionando, mas o app padrão só é criado quando alguém
+    pede main.app; importar o módulo (ex.: para chamar create_app) não lê o ambiente.
+    Também é possível usar "uvicorn main:create_app --factory".
+    """
+    if nome == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
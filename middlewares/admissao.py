@@ -0,0 +1,142 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+from servicos.metricas import admissao_em_execucao, admissao_espera, admissao_fila, admissao_rejeicoes
+
+# Streams SSE e long-poll devolvem a conexão do banco antes de esperar eventos:
+# não ocupam vaga enquanto a conexão HTTP fica aberta
+CAMINHOS_SEM_ADMISSAO = ("/admin/eventos", "/cliente/eventos")
+
+METODOS_ESCRITA = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def classificar_requisicao(metodo: str, caminho: str) -> str | None:
+    """
+    Classe de admissão da requisição: auth, escrita, admin ou cliente.
+    None para o que não usa o banco (/metrics, /docs) e para os streams.
+    """
+    if caminho.startswith(CAMINHOS_SEM_ADMISSAO):
+        return None
+    if caminho.startswith("/auth"):
+        return "auth"
+    if not caminho.startswith(("/admin", "/cliente")):
+        return None
+    if metodo in METODOS_ESCRITA:
+        return "escrita"
+    return "admin" if caminho.startswith("/admin") else "cliente"
+
+
+class ClasseAdmissao:
+    """
+    Limite de requisições simultâneas de uma classe, com uma fila curta de espera.
+    Ao terminar, a vaga passa direto para o primeiro da fila (ordem de chegada).
+    Todo o estado é do event loop do worker, então não há lock.
+    """
+
+    def __init__(self, nome: str, limite: int, fila: int, espera_maxima: float):
+        self.nome = nome
+        self.limite = limite
+        self.fila = fila
+        self.espera_maxima = espera_maxima
+        self.em_execucao = 0
+        self.rejeitadas = 0
+        self._esperando = deque()
+
+    def aguardando(self) -> int:
+        return len(self._esperando)
+
+    async def entrar(self) -> bool:
+        """Ocupa uma vaga, esperando na fila até espera_maxima; False se a requisição deve ser descartada"""
+        if self.em_execucao < self.limite and not self._esperando:
+            self.em_execucao += 1
+            admissao_em_execucao.inc(self.nome)
+            return True
+        if len(self._esperando) >= self.fila:
+            self._rejeitar()
+            return False
+
+        vaga = asyncio.get_running_loop().create_future()
+        self._esperando.append(vaga)
+        admissao_fila.inc(self.nome)
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(vaga, self.espera_maxima)
+        except asyncio.TimeoutError:
+            # A vaga pode ter chegado na mesma volta do loop em que o prazo venceu (no Python 3.12+
+            # o wait_for levanta TimeoutError mesmo com o resultado pronto): repassa para o próximo
+            if vaga.done() and not vaga.cancelled():
+                self.sair()
+            self._rejeitar()
+            return False
+        except asyncio.CancelledError:
+            # Cancelada (ex.: cliente desconectou) depois de receber a vaga: repassa para o próximo
+            if vaga.done() and not vaga.cancelled():
+                self.sair()
+            raise
+        finally:
+            if vaga in self._esperando:
+                self._esperando.remove(vaga)
+            admissao_fila.dec(self.nome)
+            admissao_espera.observar(time.perf_counter() - inicio, self.nome)
+        return True
+
+    def sair(self) -> None:
+        while self._esperando:
+            vaga = self._esperando.popleft()
+            if not vaga.done():
+                vaga.set_result(None)  # a vaga continua ocupada, agora pelo próximo da fila
+                return
+        self.em_execucao -= 1
+        admissao_em_execucao.dec(self.nome)
+
+    def _rejeitar(self) -> None:
+        self.rejeitadas += 1
+        admissao_rejeicoes.inc(self.nome)
+
+
+class AdmissaoMiddleware:
+    """
+    Controle de admissão por classe de rota (auth, leitura do cliente, admin, escritas).
+    Com o limite atingido a requisição espera numa fila curta; com a fila cheia, ou depois de
+    espera_maxima, responde 503 com Retry-After na hora, em vez de esperar uma conexão do pool
+    do SQLAlchemy (até 30 s) e falhar depois. Os limites somados devem caber no pool
+    (pool_size + max_overflow) para uma requisição admitida não ficar esperando conexão.
+    """
+
+    def __init__(self, app, limites: dict, fila: int = 10, espera_maxima: float = 1.0, retry_after: int = 1):
+        self.app = app
+        self.classes = {nome: ClasseAdmissao(nome, limite, fila, espera_maxima) for nome, limite in limites.items()}
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        classe = self.classes.get(classificar_requisicao(scope["method"], scope["path"]))
+        if classe is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await classe.entrar():
+            await self._responder_sobrecarga(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            classe.sair()
+
+    async def _responder_sobrecarga(self, send):
+        corpo = json.dumps({"detail": "Servidor sobrecarregado, tente novamente em instantes"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(corpo)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": corpo})
@@ -0,0 +1,137 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional, sem ele usamos apenas gzip
+    brotli = None
+
+# Tipos que não devem ser comprimidos (streaming ou já comprimidos)
+TIPOS_EXCLUIDOS = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def escolher_codificacao(accept_encoding: str) -> str | None:
+    """
+    Escolhe a codificação a partir do header Accept-Encoding do cliente.
+    Respeita q=0 (codificação recusada) e prefere brotli quando disponível.
+    Retorna None quando o cliente não aceita nenhuma codificação suportada.
+    """
+    aceitas = {}
+    for item in accept_encoding.split(","):
+        partes = item.strip().split(";")
+        nome = partes[0].strip().lower()
+        if not nome:
+            continue
+        q = 1.0
+        for parametro in partes[1:]:
+            chave, _, valor = parametro.strip().partition("=")
+            if chave.strip() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        aceitas[nome] = q
+
+    def aceita(codificacao):
+        if codificacao in aceitas:
+            return aceitas[codificacao] > 0
+        return aceitas.get("*", 0) > 0
+
+    if brotli is not None and aceita("br"):
+        return "br"
+    if aceita("gzip"):
+        return "gzip"
+    return None
+
+
+def comprimir(corpo: bytes, codificacao: str, nivel_gzip: int = 6, qualidade_brotli: int = 4) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=qualidade_brotli)
+    return gzip.compress(corpo, compresslevel=nivel_gzip, mtime=0)
+
+
+def adicionar_vary(headers: list) -> list:
+    """Acrescenta Accept-Encoding ao header Vary sem perder valores existentes (ex.: Origin do CORS)"""
+    for i, (chave, valor) in enumerate(headers):
+        if chave.lower() == b"vary":
+            if b"accept-encoding" not in valor.lower():
+                headers[i] = (chave, valor + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI que comprime respostas com gzip (ou brotli, se instalado).
+
+    - Só comprime respostas completas com tamanho >= tamanho_minimo
+    - Respostas em streaming (ex.: SSE) passam sem alteração
+    - Clientes sem Accept-Encoding recebem a resposta original
+    - Sempre adiciona "Vary: Accept-Encoding" para caches intermediários
+    """
+
+    def __init__(self, app, tamanho_minimo: int = 1024, nivel_gzip: int = 6, qualidade_brotli: int = 4):
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for chave, valor in scope.get("headers", []):
+            if chave == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+                break
+
+        codificacao = escolher_codificacao(accept_encoding)
+        inicio = None
+        repassar = False
+
+        async def enviar(message):
+            nonlocal inicio, repassar
+
+            if message["type"] == "http.response.start":
+                inicio = message
+                return
+
+            if message["type"] != "http.response.body" or repassar:
+                await send(message)
+                return
+
+            headers = list(inicio.get("headers", []))
+            tipo = b""
+            ja_codificada = False
+            for chave, valor in headers:
+                nome = chave.lower()
+                if nome == b"content-type":
+                    tipo = valor.lower()
+                elif nome == b"content-encoding":
+                    ja_codificada = True
+
+            corpo = message.get("body", b"")
+            streaming = message.get("more_body", False)
+            excluido = any(tipo.startswith(t.encode()) for t in TIPOS_EXCLUIDOS)
+
+            if streaming or ja_codificada or excluido:
+                # Não mexemos em streaming nem em conteúdo já codificado
+                repassar = True
+                await send(inicio)
+                await send(message)
+                return
+
+            headers = adicionar_vary(headers)
+
+            if codificacao and len(corpo) >= self.tamanho_minimo:
+                corpo = comprimir(corpo, codificacao, self.nivel_gzip, self.qualidade_brotli)
+                headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+                headers.append((b"content-encoding", codificacao.encode()))
+                headers.append((b"content-length", str(len(corpo)).encode()))
+
+            await send({**inicio, "headers": headers})
+            await send({"type": "http.response.body", "body": corpo, "more_body": False})
+
+        await self.app(scope, receive, enviar)
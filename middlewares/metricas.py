@@ -0,0 +1,38 @@
+import time
+
+from servicos.metricas import requisicoes_total, latencia_requisicao, requisicoes_em_andamento
+
+
+class MetricasMiddleware:
+    """
+    Registra contagem, latência e requisições em andamento por rota.
+    Usa o template da rota (ex.: /cliente/contrato/{id_contrato}) para não criar uma série por id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = 500
+        requisicoes_em_andamento.inc()
+
+        async def enviar(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            requisicoes_em_andamento.dec()
+            rota = scope.get("route")
+            caminho = rota.path if rota is not None else "desconhecida"
+            metodo = scope["method"]
+            latencia_requisicao.observar(time.perf_counter() - inicio, metodo, caminho)
+            requisicoes_total.inc(metodo, caminho, str(status))
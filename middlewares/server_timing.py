@@ -0,0 +1,77 @@
+import json
+import logging
+import time
+
+from fastapi.responses import JSONResponse
+
+from servicos.instrumentacao import MedicoesRequisicao, medicoes_atuais, medir
+
+logger = logging.getLogger("aureus.timing")
+
+
+class JSONResponseMedida(JSONResponse):
+    """JSONResponse que registra o tempo de codificação JSON na categoria 'serializacao'"""
+
+    def render(self, content) -> bytes:
+        with medir("serializacao"):
+            return super().render(content)
+
+
+def montar_server_timing(medicoes: MedicoesRequisicao, total: float) -> str:
+    app = max(total - medicoes.db - medicoes.hash - medicoes.serializacao, 0.0)
+    return ", ".join([
+        f'db;dur={medicoes.db * 1000:.2f};desc="{medicoes.db_queries} queries"',
+        f"hash;dur={medicoes.hash * 1000:.2f}",
+        f"ser;dur={medicoes.serializacao * 1000:.2f}",
+        f"app;dur={app * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ])
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que separa o tempo de cada requisição em banco, hash de senha,
+    serialização e o restante da aplicação (validação Pydantic, regras de negócio).
+    Emite o header Server-Timing e uma linha de log estruturada (JSON) por requisição.
+    O custo é de algumas chamadas a perf_counter por query, então pode ficar ligado em produção.
+    """
+
+    def __init__(self, app, registrar_log: bool = True):
+        self.app = app
+        self.registrar_log = registrar_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicoes = MedicoesRequisicao(scope)
+        token = medicoes_atuais.set(medicoes)
+        status = 500
+
+        async def enviar(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = time.perf_counter() - medicoes.inicio
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", montar_server_timing(medicoes, total).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            medicoes_atuais.reset(token)
+            if self.registrar_log:
+                logger.info(json.dumps({
+                    "metodo": scope["method"],
+                    "caminho": scope["path"],
+                    "rota": medicoes.rota,
+                    "status": status,
+                    "total_ms": round((time.perf_counter() - medicoes.inicio) * 1000, 2),
+                    "db_ms": round(medicoes.db * 1000, 2),
+                    "db_queries": medicoes.db_queries,
+                    "hash_ms": round(medicoes.hash * 1000, 2),
+                    "serializacao_ms": round(medicoes.serializacao * 1000, 2),
+                }))
@@ -1,25 +1,28 @@
-from sqlalchemy import create_engine, Column, String, Integer, Date, Numeric, ForeignKey, UniqueConstraint, CheckConstraint
+from sqlalchemy import create_engine, Column, String, Integer, Date, DateTime, Numeric, Text, Boolean, ForeignKey, UniqueConstraint, CheckConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database.db")
-
-
-if DATABASE_URL.startswith("postgresql"):
-    db = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=True,  
-        pool_recycle=3600,   
-        pool_size=5,        
-        max_overflow=10,     
-        echo=False            
-    )
-else:
-    db = create_engine(DATABASE_URL)
+from sqlalchemy.pool import StaticPool
+
+
+def criar_engine(database_url: str):
+    """
+    Cria a engine do banco. Chamada no lifespan da aplicação (e não na importação),
+    para cada worker abrir o próprio pool depois do fork.
+    """
+    if database_url.startswith("postgresql"):
+        return create_engine(
+            database_url,
+            pool_pre_ping=True,  
+            pool_recycle=3600,   
+            pool_size=5,        
+            max_overflow=10,     
+            echo=False            
+        )
+    # As dependências síncronas do FastAPI rodam no threadpool: a conexão pode mudar de thread
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        # Banco em memória: uma única conexão compartilhada entre as threads
+        return create_engine(database_url, connect_args=connect_args, poolclass=StaticPool)
+    return create_engine(database_url, connect_args=connect_args)
 
 Base = declarative_base()
 
@@ -144,11 +147,17 @@ class Contrato(Base):
     data_emissao = Column("data_emissao", Date, nullable=False)
     vigencia_fim = Column("vigencia_fim", Date)
     status = Column("status", String(30), default="ativo")
+    # Motivo informado pelo admin na última mudança de status (ex.: rejeição)
+    motivo_status = Column("motivo_status", String(255))
 
     cliente = relationship("Cliente", back_populates="contratos")
     veiculo = relationship("Veiculo", back_populates="contrato")
     financeiro = relationship("Financeiro", back_populates="contrato", uselist=False)
 
+    __table_args__ = (
+        Index("ix_contrato_id_cliente", "id_cliente"),
+    )
+
     def __init__(self, id_cliente, id_veiculo, num_contrato, data_emissao, vigencia_fim=None, status="ativo"):
         self.id_cliente = id_cliente
         self.id_veiculo = id_veiculo
@@ -170,9 +179,23 @@ class Financeiro(Base):
     status_pagamento = Column("status_pagamento", String(30), default="em_dia")
     data_criacao = Column("data_criacao", Date, default=Date)
 
+    # Pré-análise de risco (servicos/score.py), calculada na solicitação e no reprocessamento em lote
+    renda_mensal = Column("renda_mensal", Numeric(10, 2))
+    comprometimento_renda = Column("comprometimento_renda", Numeric(8, 4))
+    ltv = Column("ltv", Numeric(8, 4))
+    exposicao = Column("exposicao", Numeric(14, 2))
+    score_risco = Column("score_risco", Integer)
+
+    # Sistema das parcelas em aberto: "price" (parcelas iguais) ou "sac" (amortização constante)
+    sistema_amortizacao = Column("sistema_amortizacao", String(5), nullable=False, default="price", server_default="price")
+
     contrato = relationship("Contrato", back_populates="financeiro")
     parcelas = relationship("Parcela", back_populates="financeiro")
 
+    __table_args__ = (
+        Index("ix_financeiro_score_risco", "score_risco"),
+    )
+
     def __init__(self, id_contrato, valor_total, valor_entrada=0, taxa_juros=None, qtde_parcelas=None, 
                  data_primeiro_vencimento=None, status_pagamento="em_dia", data_criacao=None):
         self.id_contrato = id_contrato
@@ -195,11 +218,16 @@ class Parcela(Base):
     data_pagamento = Column("data_pagamento", Date)
     valor_pago = Column("valor_pago", Numeric(12, 2))
     status = Column("status", String(30), default="pendente")
+    # Encargos por atraso gravados pelo lote noturno (servicos/encargos.py)
+    valor_multa = Column("valor_multa", Numeric(12, 2))
+    valor_juros = Column("valor_juros", Numeric(12, 2))
+    data_calculo_encargos = Column("data_calculo_encargos", Date)
 
     financeiro = relationship("Financeiro", back_populates="parcelas")
 
     __table_args__ = (
         UniqueConstraint('id_financeiro', 'numero_parcela', name='uq_financeiro_numero_parcela'),
+        Index("ix_parcela_status_vencimento", "status", "data_vencimento"),
     )
 
     def __init__(self, id_financeiro, numero_parcela, valor_parcela, data_vencimento, 
@@ -210,4 +238,99 @@ class Parcela(Base):
         self.data_vencimento = data_vencimento
         self.data_pagamento = data_pagamento
         self.valor_pago = valor_pago
-        self.status = status
\ No newline at end of file
+        self.status = status
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id_job = Column("id_job", Integer, primary_key=True, autoincrement=True)
+    tipo = Column("tipo", String(50), nullable=False)
+    status = Column("status", String(20), nullable=False, default="pendente")
+    parametros = Column("parametros", Text)
+    progresso = Column("progresso", Integer, nullable=False, default=0)
+    mensagem = Column("mensagem", String(255))
+    resultado = Column("resultado", Text)
+    erro = Column("erro", Text)
+    cancelar = Column("cancelar", Boolean, nullable=False, default=False)
+    worker = Column("worker", String(100))
+    criado_em = Column("criado_em", DateTime, nullable=False)
+    iniciado_em = Column("iniciado_em", DateTime)
+    concluido_em = Column("concluido_em", DateTime)
+    heartbeat = Column("heartbeat", DateTime)
+
+    __table_args__ = (
+        Index("ix_job_status_id", "status", "id_job"),
+    )
+
+    def __init__(self, tipo, criado_em, parametros=None, status="pendente"):
+        self.tipo = tipo
+        self.criado_em = criado_em
+        self.parametros = parametros
+        self.status = status
+        self.progresso = 0
+        self.cancelar = False
+
+class AgingSnapshot(Base):
+    __tablename__ = "aging_snapshot"
+
+    id_snapshot = Column("id_snapshot", Integer, primary_key=True, autoincrement=True)
+    data_referencia = Column("data_referencia", Date, nullable=False)
+    marca = Column("marca", String(80), nullable=False)
+    ano_modelo = Column("ano_modelo", Integer, nullable=False)
+    faixa_renda = Column("faixa_renda", String(20), nullable=False)
+    faixa_atraso = Column("faixa_atraso", String(20), nullable=False)
+    qtde_parcelas = Column("qtde_parcelas", Integer, nullable=False)
+    valor = Column("valor", Numeric(14, 2), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("data_referencia", "marca", "ano_modelo", "faixa_renda", "faixa_atraso", name="uq_aging_snapshot"),
+    )
+
+
+class Renegociacao(Base):
+    """Histórico de antecipações, renegociações e repreciamentos (servicos/renegociacao.py)"""
+    __tablename__ = "renegociacao"
+
+    id_renegociacao = Column("id_renegociacao", Integer, primary_key=True, autoincrement=True)
+    id_financeiro = Column("id_financeiro", Integer, ForeignKey("financeiro.id_financeiro"), nullable=False)
+    tipo = Column("tipo", String(20), nullable=False)  # antecipacao, renegociacao, repreciamento
+    data = Column("data", DateTime, nullable=False)
+    valor_pago = Column("valor_pago", Numeric(12, 2), nullable=False, default=0)
+    saldo_anterior = Column("saldo_anterior", Numeric(14, 2), nullable=False)
+    saldo_novo = Column("saldo_novo", Numeric(14, 2), nullable=False)
+    taxa_anterior = Column("taxa_anterior", Numeric(5, 2))
+    taxa_nova = Column("taxa_nova", Numeric(5, 2))
+    sistema = Column("sistema", String(5), nullable=False)
+    parcelas_anteriores = Column("parcelas_anteriores", Integer, nullable=False)
+    parcelas_novas = Column("parcelas_novas", Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_renegociacao_id_financeiro", "id_financeiro"),
+    )
+
+
+class Outbox(Base):
+    """
+    Mensagens a enviar (e-mail/SMS), gravadas na mesma transação da alteração que as originou
+    e enviadas depois pelo despachante (servicos/outbox.py)
+    """
+    __tablename__ = "outbox"
+
+    id_outbox = Column("id_outbox", Integer, primary_key=True, autoincrement=True)
+    tipo = Column("tipo", String(50), nullable=False)  # lembrete_vencimento, status_solicitacao
+    canal = Column("canal", String(10), nullable=False, default="email")
+    destinatario = Column("destinatario", String(150), nullable=False)
+    payload = Column("payload", Text, nullable=False)
+    # Chave de idempotência: a mesma mensagem não é registrada duas vezes (ex.: lembrete por parcela e vencimento)
+    chave = Column("chave", String(100), unique=True)
+    status = Column("status", String(10), nullable=False, default="pendente")  # pendente, enviando, enviado, falhou
+    tentativas = Column("tentativas", Integer, nullable=False, default=0)
+    proxima_tentativa = Column("proxima_tentativa", DateTime, nullable=False)
+    reservado_em = Column("reservado_em", DateTime)
+    criado_em = Column("criado_em", DateTime, nullable=False)
+    enviado_em = Column("enviado_em", DateTime)
+    erro = Column("erro", Text)
+
+    __table_args__ = (
+        Index("ix_outbox_status_proxima_tentativa", "status", "proxima_tentativa"),
+    )
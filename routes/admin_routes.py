@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, List, Literal
 from dependencies import pegar_sessao, verificar_token, verificar_admin
-from models import Contrato, Cliente, Veiculo, Financeiro, Parcela
+from models import Contrato, Cliente, Veiculo, Financeiro, Parcela, Job
 from schemas import (
     SolicitacoesResponseSchema, SolicitacaoListaSchema, SolicitacaoDetalheSchema,
     ContratosVigentesResponseSchema, ContratoListaSchema, ContratoCompletoSchema,
     VeiculoCompletoSchema, FinanceiroCompletoSchema, ParcelaSchema, AprovarRejeitarSchema,
-    ClienteInfoSchema, DashboardMetricasSchema
+    DashboardMetricasSchema, CacheEstatisticasSchema, JobSchema, JobCriadoSchema,
+    AgingRelatorioSchema, AgingHistoricoSchema, FluxoCaixaSchema, AvaliacaoRiscoSchema, BuscaResponseSchema,
+    RenegociacaoSchema, RenegociacaoResultadoSchema, RepreciamentoSchema
 )
+from servicos.busca import buscar
+from servicos.cache_contrato import cache_contrato, responder_contrato_cacheado
+from servicos.estado_contrato import transicionar_contrato
+from servicos.aging import calcular_aging, consultar_snapshot_aging, historico_aging
+from servicos.fluxo_caixa import CenarioFluxoCaixa, calcular_fluxo_caixa
+from servicos.eventos import Evento, barramento, transmitir_sse
+from servicos.eventos_cliente import notificar_status_solicitacao
+from servicos.painel_admin import (
+    TOPICO_ADMIN, calcular_metricas_dashboard, notificar_solicitacao_aprovada, notificar_solicitacao_rejeitada
+)
+from servicos.outbox import LEMBRETE_DIAS_ANTECEDENCIA, registrar_status_solicitacao
+from servicos.renegociacao import renegociar_contrato
+from servicos.jobs import enfileirar_job, cancelar_job, montar_job_schema
+import servicos.tarefas  # registra as tarefas dos jobs
 from datetime import date
 
 admin_router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(verificar_admin)])
@@ -23,68 +40,86 @@ async def obter_metricas_dashboard(session: Session = Depends(pegar_sessao)):
     - Valor total financiado
     - Parcelas em atraso (quantidade e valor)
     """
-    from sqlalchemy import func
-    from datetime import date
-    
-    # Solicitações pendentes
-    solicitacoes_pendentes = session.query(Contrato).filter(Contrato.status == "pendente").count()
-    
-    # Contratos ativos
-    contratos_ativos = session.query(Contrato).filter(Contrato.status == "ativo").count()
-    
-    # Valor total financiado (soma de todos os financeiros de contratos ativos)
-    valor_total_financiado = session.query(func.sum(Financeiro.valor_total)).join(
-        Contrato, Financeiro.id_contrato == Contrato.id_contrato
-    ).filter(Contrato.status == "ativo").scalar() or 0.0
-    
-    # Parcelas em atraso
-    hoje = date.today()
-    parcelas_em_atraso = session.query(Parcela).join(
-        Financeiro, Parcela.id_financeiro == Financeiro.id_financeiro
-    ).join(
-        Contrato, Financeiro.id_contrato == Contrato.id_contrato
-    ).filter(
-        Contrato.status == "ativo"
-    ).filter(
-        (Parcela.status == "atrasada") | 
-        ((Parcela.status == "pendente") & (Parcela.data_vencimento < hoje))
-    ).all()
-    
-    parcelas_em_atraso_qtd = len(parcelas_em_atraso)
-    parcelas_em_atraso_valor = sum(float(p.valor_parcela) for p in parcelas_em_atraso)
-    
-    return DashboardMetricasSchema(
-        solicitacoes_pendentes=solicitacoes_pendentes,
-        contratos_ativos=contratos_ativos,
-        valor_total_financiado=float(valor_total_financiado),
-        parcelas_em_atraso_qtd=parcelas_em_atraso_qtd,
-        parcelas_em_atraso_valor=parcelas_em_atraso_valor
+    return calcular_metricas_dashboard(session)
+
+
+@admin_router.get("/eventos")
+async def eventos_admin(request: Request, session: Session = Depends(pegar_sessao)):
+    """
+    Stream SSE (text/event-stream) do painel do admin, substitui o polling de
+    /admin/dashboard/metrics e /admin/solicitacoes:
+    - 'metricas': snapshot completo, enviado ao conectar (e a cada reconexão)
+    - 'solicitacao': solicitação criada, aprovada ou rejeitada, com o delta das métricas
+    """
+    settings = request.app.state.settings
+    inscricao = barramento.inscrever({TOPICO_ADMIN})
+    try:
+        metricas = calcular_metricas_dashboard(session)
+    except Exception:
+        barramento.cancelar(inscricao)
+        raise
+    # A conexão pode ficar aberta por minutos: devolve a conexão do banco ao pool agora
+    session.close()
+
+    snapshot = Evento(inscricao.id_inicial, TOPICO_ADMIN, "metricas", metricas.model_dump(mode="json"))
+    return StreamingResponse(
+        transmitir_sse(request, inscricao, [snapshot], settings.sse_heartbeat, settings.sse_duracao_maxima),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+@admin_router.get("/busca", response_model=BuscaResponseSchema)
+async def busca_admin(
+    q: str = Query(..., min_length=1, max_length=150),
+    limite: int = Query(20, ge=1, le=100),
+    session: Session = Depends(pegar_sessao)
+):
+    """
+    Busca clientes (nome, CPF, e-mail), veículos (placa, chassi) e contratos (número) por
+    qualquer trecho com 3+ caracteres, usando o índice de busca, com os mais relevantes primeiro
+    """
+    resultados = buscar(session, q, limite)
+    return BuscaResponseSchema(termo=q, resultados=resultados, total=len(resultados))
+
+
 @admin_router.get("/solicitacoes", response_model=SolicitacoesResponseSchema)
-async def listar_solicitacoes_abertas(session: Session = Depends(pegar_sessao)):
+async def listar_solicitacoes_abertas(
+    ordenar: Literal["id", "score", "-score"] = "id",
+    score_minimo: Optional[int] = Query(None, ge=0, le=1000),
+    score_maximo: Optional[int] = Query(None, ge=0, le=1000),
+    session: Session = Depends(pegar_sessao)
+):
     """
     Lista todas as solicitações em aberto (contratos com status 'pendente')
     Retorna informações resumidas para o painel admin
+    Pode ordenar pelo score de risco ("score" = maior risco primeiro, "-score" = menor risco
+    primeiro) e filtrar por faixa de score; o score já vem calculado (índice em financeiro)
     """
-    contratos_pendentes = session.query(Contrato).filter(Contrato.status == "pendente").all()
+    # Uma única query com join (em vez de 3 consultas por contrato)
+    consulta = session.query(Contrato, Cliente, Veiculo, Financeiro).join(
+        Cliente, Cliente.id_cliente == Contrato.id_cliente
+    ).join(
+        Veiculo, Veiculo.id_veiculo == Contrato.id_veiculo
+    ).join(
+        Financeiro, Financeiro.id_contrato == Contrato.id_contrato
+    ).filter(Contrato.status == "pendente")
     
-    solicitacoes = []
-    for contrato in contratos_pendentes:
-        cliente = session.query(Cliente).filter(Cliente.id_cliente == contrato.id_cliente).first()
-        if not cliente:
-            continue
-        
-        veiculo = session.query(Veiculo).filter(Veiculo.id_veiculo == contrato.id_veiculo).first()
-        if not veiculo:
-            continue
-        
-        financeiro = session.query(Financeiro).filter(Financeiro.id_contrato == contrato.id_contrato).first()
-        if not financeiro:
-            continue
-        
-        solicitacao = SolicitacaoListaSchema(
+    if score_minimo is not None:
+        consulta = consulta.filter(Financeiro.score_risco >= score_minimo)
+    if score_maximo is not None:
+        consulta = consulta.filter(Financeiro.score_risco <= score_maximo)
+    
+    if ordenar == "score":
+        consulta = consulta.order_by(Financeiro.score_risco.asc().nulls_last(), Contrato.id_contrato)
+    elif ordenar == "-score":
+        consulta = consulta.order_by(Financeiro.score_risco.desc().nulls_last(), Contrato.id_contrato)
+    else:
+        consulta = consulta.order_by(Contrato.id_contrato)
+    linhas = consulta.all()
+    
+    solicitacoes = [
+        SolicitacaoListaSchema(
             id_contrato=contrato.id_contrato,
             numero_contrato=contrato.num_contrato,
             id_cliente=contrato.id_cliente,
@@ -95,9 +130,12 @@ async def listar_solicitacoes_abertas(session: Session = Depends(pegar_sessao)):
             valor_entrada=float(financeiro.valor_entrada),
             qtde_parcelas=financeiro.qtde_parcelas,
             status=contrato.status,
-            data_emissao=contrato.data_emissao
-        )
-        solicitacoes.append(solicitacao)
+            data_emissao=contrato.data_emissao,
+            score_risco=financeiro.score_risco,
+            comprometimento_renda=float(financeiro.comprometimento_renda) if financeiro.comprometimento_renda is not None else None,
+            ltv=float(financeiro.ltv) if financeiro.ltv is not None else None
+        ) for contrato, cliente, veiculo, financeiro in linhas
+    ]
     
     return SolicitacoesResponseSchema(
         solicitacoes=solicitacoes,
@@ -105,6 +143,29 @@ async def listar_solicitacoes_abertas(session: Session = Depends(pegar_sessao)):
     )
 
 
+@admin_router.post("/solicitacoes/recalcular-score", status_code=202, response_model=JobCriadoSchema)
+async def recalcular_score_solicitacoes(session: Session = Depends(pegar_sessao)):
+    """
+    Enfileira o recálculo do score de risco de todas as solicitações pendentes.
+    Responde 202 com o id do job; acompanhe em GET /admin/jobs/{id_job}
+    """
+    job = enfileirar_job(session, "recalcular_score")
+    session.commit()
+    return JobCriadoSchema(id_job=job.id_job, status=job.status, url_status=f"/admin/jobs/{job.id_job}")
+
+
+@admin_router.post("/contratos/repreciar", status_code=202, response_model=JobCriadoSchema)
+async def repreciar_contratos_ativos(dados: RepreciamentoSchema, session: Session = Depends(pegar_sessao)):
+    """
+    Enfileira o repreciamento das parcelas em aberto dos contratos ativos para a nova taxa
+    (só os contratos com taxa_anterior, se informada). O prazo é mantido.
+    Responde 202 com o id do job; acompanhe em GET /admin/jobs/{id_job}
+    """
+    job = enfileirar_job(session, "repreciar_contratos", dados.model_dump(exclude_none=True))
+    session.commit()
+    return JobCriadoSchema(id_job=job.id_job, status=job.status, url_status=f"/admin/jobs/{job.id_job}")
+
+
 @admin_router.get("/solicitacao/{id_contrato}", response_model=SolicitacaoDetalheSchema)
 async def detalhes_solicitacao(id_contrato: int, session: Session = Depends(pegar_sessao)):
     """
@@ -177,7 +238,14 @@ async def detalhes_solicitacao(id_contrato: int, session: Session = Depends(pega
         data_emissao=contrato.data_emissao,
         status=contrato.status,
         veiculo=veiculo_schema,
-        financeiro=financeiro_schema
+        financeiro=financeiro_schema,
+        avaliacao_risco=AvaliacaoRiscoSchema(
+            score_risco=financeiro.score_risco,
+            comprometimento_renda=float(financeiro.comprometimento_renda) if financeiro.comprometimento_renda is not None else None,
+            ltv=float(financeiro.ltv) if financeiro.ltv is not None else None,
+            exposicao=float(financeiro.exposicao) if financeiro.exposicao is not None else None,
+            renda_mensal=float(financeiro.renda_mensal) if financeiro.renda_mensal is not None else None
+        )
     )
 
 
@@ -188,24 +256,22 @@ async def aprovar_solicitacao(
     session: Session = Depends(pegar_sessao)
 ):
     """
-    Aprova uma solicitação, alterando o status do contrato para 'ativo'
+    Aprova uma solicitação, alterando o status do contrato de 'pendente' para 'ativo'
     """
-    contrato = session.query(Contrato).filter(Contrato.id_contrato == id_contrato).first()
-    if not contrato:
-        raise HTTPException(status_code=404, detail="Solicitação não encontrada")
-    
-    if contrato.status != "pendente":
-        raise HTTPException(status_code=400, detail=f"Solicitação já foi processada. Status atual: {contrato.status}")
+    motivo = dados.motivo if dados else None
+    id_cliente = transicionar_contrato(session, id_contrato, "pendente", "ativo", motivo)
+    notificar_solicitacao_aprovada(session, id_contrato)
+    notificar_status_solicitacao(session, id_cliente, id_contrato, "ativo", motivo)
+    registrar_status_solicitacao(session, id_cliente, id_contrato, "ativo", motivo)
     
     try:
-        contrato.status = "ativo"
         session.commit()
         
         return {
             "success": True,
             "message": "Solicitação aprovada com sucesso",
-            "id_contrato": contrato.id_contrato,
-            "status": contrato.status
+            "id_contrato": id_contrato,
+            "status": "ativo"
         }
     except Exception as e:
         session.rollback()
@@ -219,25 +285,23 @@ async def rejeitar_solicitacao(
     session: Session = Depends(pegar_sessao)
 ):
     """
-    Rejeita uma solicitação, alterando o status do contrato para 'rejeitado'
+    Rejeita uma solicitação, alterando o status do contrato de 'pendente' para 'rejeitado'
     """
-    contrato = session.query(Contrato).filter(Contrato.id_contrato == id_contrato).first()
-    if not contrato:
-        raise HTTPException(status_code=404, detail="Solicitação não encontrada")
-    
-    if contrato.status != "pendente":
-        raise HTTPException(status_code=400, detail=f"Solicitação já foi processada. Status atual: {contrato.status}")
+    motivo = dados.motivo if dados else None
+    id_cliente = transicionar_contrato(session, id_contrato, "pendente", "rejeitado", motivo)
+    notificar_solicitacao_rejeitada(session, id_contrato, motivo)
+    notificar_status_solicitacao(session, id_cliente, id_contrato, "rejeitado", motivo)
+    registrar_status_solicitacao(session, id_cliente, id_contrato, "rejeitado", motivo)
     
     try:
-        contrato.status = "rejeitado"
         session.commit()
         
         return {
             "success": True,
             "message": "Solicitação rejeitada com sucesso",
-            "id_contrato": contrato.id_contrato,
-            "status": contrato.status,
-            "motivo": dados.motivo if dados else None
+            "id_contrato": id_contrato,
+            "status": "rejeitado",
+            "motivo": motivo
         }
     except Exception as e:
         session.rollback()
@@ -250,34 +314,28 @@ async def listar_contratos_vigentes(session: Session = Depends(pegar_sessao)):
     Lista todos os contratos vigentes (status 'ativo')
     Retorna informações resumidas para o painel admin
     """
-    contratos_ativos = session.query(Contrato).filter(Contrato.status == "ativo").all()
+    # Uma única query com join (em vez de 3 consultas por contrato)
+    linhas = session.query(Contrato, Cliente.nome, Veiculo.marca, Veiculo.modelo, Financeiro.valor_total).join(
+        Cliente, Cliente.id_cliente == Contrato.id_cliente
+    ).join(
+        Veiculo, Veiculo.id_veiculo == Contrato.id_veiculo
+    ).join(
+        Financeiro, Financeiro.id_contrato == Contrato.id_contrato
+    ).filter(Contrato.status == "ativo").order_by(Contrato.id_contrato).all()
     
-    contratos = []
-    for contrato in contratos_ativos:
-        cliente = session.query(Cliente).filter(Cliente.id_cliente == contrato.id_cliente).first()
-        if not cliente:
-            continue
-        
-        veiculo = session.query(Veiculo).filter(Veiculo.id_veiculo == contrato.id_veiculo).first()
-        if not veiculo:
-            continue
-        
-        financeiro = session.query(Financeiro).filter(Financeiro.id_contrato == contrato.id_contrato).first()
-        if not financeiro:
-            continue
-        
-        contrato_item = ContratoListaSchema(
+    contratos = [
+        ContratoListaSchema(
             id_contrato=contrato.id_contrato,
             numero_contrato=contrato.num_contrato,
             id_cliente=contrato.id_cliente,
-            nome_cliente=cliente.nome,
-            marca_veiculo=veiculo.marca,
-            modelo_veiculo=veiculo.modelo,
-            valor_total=float(financeiro.valor_total),
+            nome_cliente=nome_cliente,
+            marca_veiculo=marca,
+            modelo_veiculo=modelo,
+            valor_total=float(valor_total),
             status=contrato.status,
             data_emissao=contrato.data_emissao
-        )
-        contratos.append(contrato_item)
+        ) for contrato, nome_cliente, marca, modelo, valor_total in linhas
+    ]
     
     return ContratosVigentesResponseSchema(
         contratos=contratos,
@@ -285,84 +343,145 @@ async def listar_contratos_vigentes(session: Session = Depends(pegar_sessao)):
     )
 
 
+@admin_router.post("/contrato/{id_contrato}/renegociacao", response_model=RenegociacaoResultadoSchema)
+async def renegociar(id_contrato: int, dados: RenegociacaoSchema, session: Session = Depends(pegar_sessao)):
+    """
+    Renegocia as parcelas em aberto de um contrato ativo e em dia: nova taxa, nova quantidade
+    de parcelas restantes e/ou novo sistema (Price ou SAC), a partir do saldo devedor atual.
+    Com 'simular', devolve o novo plano sem gravar
+    """
+    resultado = renegociar_contrato(
+        session, id_contrato, "renegociacao",
+        nova_taxa=dados.taxa_juros, novo_prazo=dados.qtde_parcelas, novo_sistema=dados.sistema, simular=dados.simular
+    )
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro ao renegociar contrato: {str(e)}")
+    return resultado
+
+
 @admin_router.get("/contrato/{id_contrato}", response_model=ContratoCompletoSchema)
-async def detalhes_contrato_admin(id_contrato: int, session: Session = Depends(pegar_sessao)):
+async def detalhes_contrato_admin(request: Request, id_contrato: int, session: Session = Depends(pegar_sessao)):
     """
     Retorna detalhes completos de um contrato específico
     Inclui dados do veículo, financeiro e todas as parcelas
+    A resposta vem do cache de contratos (envie 'Cache-Control: no-cache' para ignorá-lo)
     """
-    contrato = session.query(Contrato).filter(Contrato.id_contrato == id_contrato).first()
-    if not contrato:
-        raise HTTPException(status_code=404, detail="Contrato não encontrado")
-    
-    cliente = session.query(Cliente).filter(Cliente.id_cliente == contrato.id_cliente).first()
-    if not cliente:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    
-    veiculo = session.query(Veiculo).filter(Veiculo.id_veiculo == contrato.id_veiculo).first()
-    if not veiculo:
-        raise HTTPException(status_code=404, detail="Veículo não encontrado")
-    
-    financeiro = session.query(Financeiro).filter(Financeiro.id_contrato == contrato.id_contrato).first()
-    if not financeiro:
-        raise HTTPException(status_code=404, detail="Dados financeiros não encontrados")
-    
-    parcelas = session.query(Parcela).filter(Parcela.id_financeiro == financeiro.id_financeiro).order_by(Parcela.numero_parcela).all()
-    
-    parcelas_schema = [
-        ParcelaSchema(
-            id_parcela=p.id_parcela,
-            numero_parcela=p.numero_parcela,
-            valor_parcela=float(p.valor_parcela),
-            data_vencimento=p.data_vencimento,
-            data_pagamento=p.data_pagamento,
-            valor_pago=float(p.valor_pago) if p.valor_pago else None,
-            status=p.status
-        ) for p in parcelas
-    ]
-    
-    veiculo_schema = VeiculoCompletoSchema(
-        id_veiculo=veiculo.id_veiculo,
-        marca=veiculo.marca,
-        modelo=veiculo.modelo,
-        ano_fabricacao=veiculo.ano_fabricacao,
-        ano_modelo=veiculo.ano_modelo,
-        cor=veiculo.cor,
-        placa=veiculo.placa,
-        num_chassi=veiculo.num_chassi,
-        num_renavam=veiculo.num_renavam,
-        valor=float(veiculo.valor)
-    )
-    
-    financeiro_schema = FinanceiroCompletoSchema(
-        id_financeiro=financeiro.id_financeiro,
-        valor_total=float(financeiro.valor_total),
-        valor_entrada=float(financeiro.valor_entrada),
-        taxa_juros=float(financeiro.taxa_juros) if financeiro.taxa_juros else None,
-        qtde_parcelas=financeiro.qtde_parcelas,
-        data_primeiro_vencimento=financeiro.data_primeiro_vencimento,
-        status_pagamento=financeiro.status_pagamento,
-        data_criacao=financeiro.data_criacao,
-        parcelas=parcelas_schema
-    )
-    
-    cliente_schema = ClienteInfoSchema(
-        id_cliente=cliente.id_cliente,
-        nome=cliente.nome,
-        cpf=cliente.cpf,
-        email=cliente.email,
-        telefone=cliente.telefone,
-        renda=float(cliente.renda) if cliente.renda else None
+    return responder_contrato_cacheado(request, session, id_contrato)
+
+
+@admin_router.get("/cache/contratos", response_model=CacheEstatisticasSchema)
+async def estatisticas_cache_contratos():
+    """
+    Retorna hits, misses, hit ratio e tamanho atual do cache de contratos
+    """
+    return CacheEstatisticasSchema(**cache_contrato.estatisticas())
+
+
+@admin_router.post("/parcelas/recalcular-atrasos", status_code=202, response_model=JobCriadoSchema)
+async def recalcular_parcelas_atrasadas(session: Session = Depends(pegar_sessao)):
+    """
+    Enfileira a marcação das parcelas pendentes vencidas como 'atrasada'.
+    Responde 202 com o id do job; acompanhe em GET /admin/jobs/{id_job}
+    """
+    job = enfileirar_job(session, "recalcular_atrasos")
+    session.commit()
+    return JobCriadoSchema(id_job=job.id_job, status=job.status, url_status=f"/admin/jobs/{job.id_job}")
+
+
+@admin_router.post("/parcelas/lembretes-vencimento", status_code=202, response_model=JobCriadoSchema)
+async def enfileirar_lembretes(
+    dias: int = Query(LEMBRETE_DIAS_ANTECEDENCIA, ge=1, le=30),
+    session: Session = Depends(pegar_sessao)
+):
+    """
+    Enfileira o registro, na outbox, dos lembretes das parcelas que vencem nos próximos 'dias' dias.
+    Responde 202 com o id do job; acompanhe em GET /admin/jobs/{id_job}
+    """
+    job = enfileirar_job(session, "lembretes_vencimento", {"dias": dias})
+    session.commit()
+    return JobCriadoSchema(id_job=job.id_job, status=job.status, url_status=f"/admin/jobs/{job.id_job}")
+
+
+@admin_router.get("/jobs/{id_job}", response_model=JobSchema)
+async def detalhes_job(id_job: int, session: Session = Depends(pegar_sessao)):
+    """
+    Retorna status, progresso e resultado de um job em segundo plano
+    """
+    job = session.query(Job).filter(Job.id_job == id_job).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return montar_job_schema(job)
+
+
+@admin_router.post("/jobs/{id_job}/cancelar", response_model=JobSchema)
+async def cancelar_job_admin(id_job: int, session: Session = Depends(pegar_sessao)):
+    """
+    Cancela um job pendente ou pede o cancelamento de um job em execução
+    """
+    cancelar_job(session, id_job)
+    session.commit()
+    job = session.query(Job).filter(Job.id_job == id_job).first()
+    return montar_job_schema(job)
+
+
+@admin_router.get("/relatorios/aging", response_model=AgingRelatorioSchema)
+async def relatorio_aging(data_referencia: Optional[date] = None, session: Session = Depends(pegar_sessao)):
+    """
+    Parcelas em aberto de contratos ativos por faixa de atraso (a vencer, 1-30, 31-60, 61-90, 90+),
+    no total e por marca, ano do modelo e faixa de renda do cliente.
+    Sem data_referencia calcula a posição atual; com ela, lê o snapshot daquele dia
+    """
+    if data_referencia is None:
+        return calcular_aging(session)
+
+    relatorio = consultar_snapshot_aging(session, data_referencia)
+    if not relatorio:
+        raise HTTPException(status_code=404, detail="Nenhum snapshot de aging para esta data")
+    return relatorio
+
+
+@admin_router.get("/relatorios/aging/historico", response_model=List[AgingHistoricoSchema])
+async def relatorio_aging_historico(inicio: date, fim: date, session: Session = Depends(pegar_sessao)):
+    """
+    Série diária do aging (total por faixa de atraso) entre as datas, lida dos snapshots
+    """
+    if inicio > fim:
+        raise HTTPException(status_code=400, detail="A data de início deve ser anterior à data de fim")
+    return historico_aging(session, inicio, fim)
+
+
+@admin_router.post("/relatorios/aging/snapshot", status_code=202, response_model=JobCriadoSchema)
+async def gerar_snapshot_aging(session: Session = Depends(pegar_sessao)):
+    """
+    Enfileira a gravação do snapshot de aging do dia (normalmente feita pelo
+    agendamento noturno com python -m scripts.snapshot_aging)
+    """
+    job = enfileirar_job(session, "snapshot_aging")
+    session.commit()
+    return JobCriadoSchema(id_job=job.id_job, status=job.status, url_status=f"/admin/jobs/{job.id_job}")
+
+
+@admin_router.get("/relatorios/fluxo-caixa", response_model=FluxoCaixaSchema)
+async def projecao_fluxo_caixa(
+    meses: int = Query(72, ge=1, le=120),
+    taxa_inadimplencia: float = Query(0.005, ge=0, le=1),
+    taxa_inadimplencia_atrasados: float = Query(0.05, ge=0, le=1),
+    taxa_prepagamento: float = Query(0.01, ge=0, le=1),
+    taxa_recuperacao: float = Query(0.3, ge=0, le=1),
+    session: Session = Depends(pegar_sessao)
+):
+    """
+    Projeção mensal dos recebimentos das parcelas em aberto dos contratos ativos.
+    As taxas (mensais) definem o cenário: inadimplência dos contratos em dia e dos já
+    inadimplentes, pré-pagamento e recuperação das parcelas vencidas
+    """
+    cenario = CenarioFluxoCaixa(
+        taxa_inadimplencia=taxa_inadimplencia,
+        taxa_inadimplencia_atrasados=taxa_inadimplencia_atrasados,
+        taxa_prepagamento=taxa_prepagamento,
+        taxa_recuperacao=taxa_recuperacao,
     )
-    
-    return ContratoCompletoSchema(
-        id_contrato=contrato.id_contrato,
-        numero_contrato=contrato.num_contrato,
-        status=contrato.status,
-        id_cliente=contrato.id_cliente,
-        data_emissao=contrato.data_emissao,
-        vigencia_fim=contrato.vigencia_fim,
-        veiculo=veiculo_schema,
-        financeiro=financeiro_schema,
-        cliente=cliente_schema
-    )
\ No newline at end of file
+    return calcular_fluxo_caixa(session, meses, cenario)
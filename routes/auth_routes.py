@@ -1,38 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from models import Usuario, Cliente
-from dependencies import pegar_sessao, verificar_token
-from main import bcrypt_context, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, limiter
+from dependencies import pegar_sessao, verificar_token, limiter
+from config import Settings, obter_settings
 from schemas import LoginSchema
+from servicos.senhas import verificar_senha
+from servicos.metricas import logins_total
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def criar_token(id_usuario, duracao_token=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)):
+def criar_token(id_usuario, duracao_token=None, settings: Settings = None):
+    settings = settings or obter_settings()
+    duracao_token = duracao_token or timedelta(minutes=settings.access_token_expire_minutes)
     data_expiracao = datetime.now(timezone.utc) + duracao_token
     dic_info = {"sub": str(id_usuario), "exp": data_expiracao}
-    jwt_codificado = jwt.encode(dic_info, SECRET_KEY, ALGORITHM)
+    jwt_codificado = jwt.encode(dic_info, settings.secret_key, settings.algorithm)
     return jwt_codificado
 
-def autenticar_usuario(login, senha, session):
-    import bcrypt
+async def autenticar_usuario(login, senha, session):
     usuario = session.query(Usuario).filter(Usuario.login==login).first()
     
     if not usuario:
+        logins_total.inc("usuario_inexistente")
         return False
     
-    senha_bytes = senha.encode('utf-8')
-    hash_bytes = usuario.senha_hash.encode('utf-8')
+    # Devolve a conexão ao pool antes do bcrypt (~200ms): sem isso, logins simultâneos
+    # esgotam o pool enquanto esperam o hash
+    session.expunge(usuario)
+    session.rollback()
     
-    senha_ok = bcrypt.checkpw(senha_bytes, hash_bytes)
+    senha_ok = await verificar_senha(senha, usuario.senha_hash)
     
     if not senha_ok:
+        logins_total.inc("senha_invalida")
         return False
     
+    logins_total.inc("sucesso")
     return usuario
 
 
@@ -46,7 +53,7 @@ async def home():
 @auth_router.post("/login")
 @limiter.limit("5/minute")  
 async def login(request: Request, login_schema: LoginSchema, session: Session = Depends(pegar_sessao)):
-    usuario = autenticar_usuario(login_schema.login, login_schema.senha, session)
+    usuario = await autenticar_usuario(login_schema.login, login_schema.senha, session)
     
     if not usuario:
         raise HTTPException(status_code=400, detail="Usuário não encontrado ou credenciais inválidas")
@@ -56,8 +63,9 @@ async def login(request: Request, login_schema: LoginSchema, session: Session =
         if not cliente:
             raise HTTPException(status_code=400, detail="Cliente não encontrado para este usuário")
         
-        access_token = criar_token(usuario.id_usuario)
-        refresh_token = criar_token(usuario.id_usuario, duracao_token=timedelta(days=7))
+        settings = request.app.state.settings
+        access_token = criar_token(usuario.id_usuario, settings=settings)
+        refresh_token = criar_token(usuario.id_usuario, duracao_token=timedelta(days=7), settings=settings)
         
         return {
             "access_token": access_token,
@@ -72,7 +80,7 @@ async def login(request: Request, login_schema: LoginSchema, session: Session =
 @auth_router.post("/login-form")
 @limiter.limit("5/minute")  
 async def login_form(request: Request, dados_formulario: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(pegar_sessao)):
-    usuario = autenticar_usuario(dados_formulario.username, dados_formulario.password, session)
+    usuario = await autenticar_usuario(dados_formulario.username, dados_formulario.password, session)
     if not usuario:
         raise HTTPException(status_code=400, detail="Usuário não encontrado ou credenciais inválidas")
     else:
@@ -81,7 +89,7 @@ async def login_form(request: Request, dados_formulario: OAuth2PasswordRequestFo
         if not cliente:
             raise HTTPException(status_code=400, detail="Cliente não encontrado para este usuário")
         
-        access_token = criar_token(usuario.id_usuario)
+        access_token = criar_token(usuario.id_usuario, settings=request.app.state.settings)
         
         return {
             "access_token": access_token,
@@ -94,7 +102,7 @@ async def login_form(request: Request, dados_formulario: OAuth2PasswordRequestFo
 @auth_router.get("/refresh")
 @limiter.limit("10/minute")   
 async def use_refresh_token(request: Request, usuario: Usuario = Depends(verificar_token)):
-    access_token = criar_token(usuario.id_usuario)
+    access_token = criar_token(usuario.id_usuario, settings=request.app.state.settings)
     return {
         "access_token": access_token,
         "token_type": "Bearer"
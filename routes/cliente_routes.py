@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from dependencies import pegar_sessao, verificar_token
-from main import limiter
+from dependencies import pegar_sessao, verificar_token, limiter
 from schemas import (
     ClienteCompletoSchema, ContratoDetalhadoSchema, ContratosResponseSchema,
-    SolicitacaoCompletaSchema, ContratoCompletoSchema, VeiculoCompletoSchema,
-    FinanceiroCompletoSchema, ParcelaSchema, ClienteInfoSchema
+    SolicitacaoCompletaSchema, ContratoCompletoSchema, FipeReferenciaSchema, MinhaContaSchema,
+    SolicitacaoListaSchema, EventosClienteSchema, EventoSchema, AntecipacaoSchema, RenegociacaoResultadoSchema
 )
 from models import Contrato, Endereco, Usuario, Cliente, Financeiro, Veiculo, Parcela
-from main import bcrypt_context
+from servicos.cache_contrato import responder_contrato_cacheado
+from servicos.minha_conta import responder_minha_conta
+from servicos.painel_admin import notificar_solicitacao_criada
+from servicos.eventos import barramento, transmitir_sse
+from servicos.eventos_cliente import id_cliente_do_usuario, snapshot_contratos, topico_cliente
+from servicos.senhas import gerar_hash_senha
+from servicos.fipe import ano_calendario, obter_indice_fipe, resolver_referencia, valor_dentro_da_tolerancia
+from servicos.renegociacao import renegociar_contrato
+from servicos.score import avaliar_risco, aplicar_avaliacao, exposicao_cliente
 from datetime import date, timedelta
 from calendar import monthrange
+from typing import Optional
 import re
 
 cliente_router = APIRouter(prefix="/cliente", tags=["cliente"])
@@ -42,6 +51,10 @@ async def cadastrar_cliente_completo(
             session.rollback()
             raise HTTPException(status_code=400, detail="Email já cadastrado")
         
+        # Nada foi gravado ainda: libera a conexão do pool durante o bcrypt
+        session.rollback()
+        senha_hash = await gerar_hash_senha(dados.senha)
+        
         endereco = Endereco(
             logradouro=dados.logradouro,
             numero=dados.numero,
@@ -53,10 +66,6 @@ async def cadastrar_cliente_completo(
         session.add(endereco)
         session.flush() 
         
-        import bcrypt
-        senha_bytes = dados.senha.encode('utf-8')
-        senha_hash = bcrypt.hashpw(senha_bytes, bcrypt.gensalt()).decode('utf-8')
-        
         usuario = Usuario(
             id_perfil=1,  
             login=dados.login,
@@ -96,6 +105,86 @@ async def cadastrar_cliente_completo(
         raise HTTPException(status_code=400, detail=f"Erro no cadastro completo: {str(e)}")
 
 
+@cliente_router.get("/me", response_model=MinhaContaSchema)
+async def minha_conta(
+    request: Request,
+    usuario: Usuario = Depends(verificar_token),
+    session: Session = Depends(pegar_sessao)
+):
+    """
+    Visão "minha conta" do cliente do token: perfil, resumo dos contratos, próxima parcela
+    em aberto de cada um e saldo devedor total, num número fixo de queries.
+    Suporta GET condicional (ETag / If-None-Match -> 304)
+    """
+    return responder_minha_conta(request, session, usuario.id_usuario)
+
+
+@cliente_router.get("/eventos")
+async def eventos_cliente(
+    request: Request,
+    usuario: Usuario = Depends(verificar_token),
+    session: Session = Depends(pegar_sessao)
+):
+    """
+    Stream SSE (text/event-stream) das mudanças de status das solicitações do cliente do token:
+    - 'contratos': status atual de todos os contratos, enviado ao conectar (e a cada reconexão)
+    - 'status_solicitacao': aprovação ou rejeição, com o motivo informado pelo admin
+    """
+    settings = request.app.state.settings
+    id_cliente = id_cliente_do_usuario(session, usuario.id_usuario)
+    inscricao = barramento.inscrever({topico_cliente(id_cliente)})
+    try:
+        snapshot = snapshot_contratos(session, id_cliente, inscricao.id_inicial)
+    except Exception:
+        barramento.cancelar(inscricao)
+        raise
+    # A conexão pode ficar aberta por minutos: devolve a conexão do banco ao pool agora
+    session.close()
+
+    return StreamingResponse(
+        transmitir_sse(request, inscricao, [snapshot], settings.sse_heartbeat, settings.sse_duracao_maxima),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@cliente_router.get("/eventos/aguardar", response_model=EventosClienteSchema)
+async def aguardar_eventos_cliente(
+    desde: Optional[int] = Query(None, ge=0),
+    timeout: float = Query(25.0, gt=0, le=60),
+    usuario: Usuario = Depends(verificar_token),
+    session: Session = Depends(pegar_sessao)
+):
+    """
+    Long-poll, alternativa ao SSE para quem não consegue manter o stream aberto.
+    Sem 'desde' (ou com um 'desde' que o servidor não conhece mais) responde na hora com o
+    evento 'contratos'; com 'desde' espera até 'timeout' segundos por eventos posteriores.
+    Envie o 'ultimo_id' da resposta como 'desde' na próxima chamada.
+    """
+    id_cliente = id_cliente_do_usuario(session, usuario.id_usuario)
+
+    if desde is None or not barramento.historico_cobre(desde):
+        ultimo_id = barramento.ultimo_id()
+        snapshot = snapshot_contratos(session, id_cliente, ultimo_id)
+        return EventosClienteSchema(
+            eventos=[EventoSchema(id=snapshot.id, tipo=snapshot.tipo, dados=snapshot.dados)],
+            ultimo_id=ultimo_id
+        )
+
+    session.close()
+    inscricao = barramento.inscrever({topico_cliente(id_cliente)}, desde=desde)
+    try:
+        primeiro = await inscricao.proximo(timeout)
+        eventos = [primeiro, *inscricao.pendentes()] if primeiro else []
+    finally:
+        barramento.cancelar(inscricao)
+
+    return EventosClienteSchema(
+        eventos=[EventoSchema(id=e.id, tipo=e.tipo, dados=e.dados) for e in eventos],
+        ultimo_id=eventos[-1].id if eventos else max(desde, inscricao.id_inicial)
+    )
+
+
 @cliente_router.get("/contratos/{id_cliente}", response_model=ContratosResponseSchema, dependencies=[Depends(verificar_token)])
 async def contratos(id_cliente: int, session: Session = Depends(pegar_sessao)):
     """
@@ -107,29 +196,28 @@ async def contratos(id_cliente: int, session: Session = Depends(pegar_sessao)):
     - ID Financeiro
     - Data Emissão
     """
-    contratos = session.query(Contrato).filter(Contrato.id_cliente == id_cliente).all()
-    
-    if not contratos:
-        raise HTTPException(status_code=404, detail="Nenhum contrato encontrado para este cliente")
+    # Uma única query com join evita uma consulta ao financeiro por contrato
+    linhas = session.query(Contrato, Financeiro.id_financeiro).join(
+        Financeiro, Financeiro.id_contrato == Contrato.id_contrato
+    ).filter(Contrato.id_cliente == id_cliente).order_by(Contrato.id_contrato).all()
     
-    contratos_detalhados = []
-    
-    for contrato in contratos:
-        financeiro = session.query(Financeiro).filter(Financeiro.id_contrato == contrato.id_contrato).first()
-        
-        if financeiro:  
-            contrato_detalhado = ContratoDetalhadoSchema(
-                id_contrato=contrato.id_contrato,
-                numero_contrato=contrato.num_contrato,
-                status=contrato.status,
-                id_cliente=contrato.id_cliente,
-                id_veiculo=contrato.id_veiculo,
-                id_financeiro=financeiro.id_financeiro,
-                data_emissao=contrato.data_emissao
-            )
-            contratos_detalhados.append(contrato_detalhado)
+    contratos_detalhados = [
+        ContratoDetalhadoSchema(
+            id_contrato=contrato.id_contrato,
+            numero_contrato=contrato.num_contrato,
+            status=contrato.status,
+            id_cliente=contrato.id_cliente,
+            id_veiculo=contrato.id_veiculo,
+            id_financeiro=id_financeiro,
+            data_emissao=contrato.data_emissao,
+            motivo_status=contrato.motivo_status
+        ) for contrato, id_financeiro in linhas
+    ]
     
     if not contratos_detalhados:
+        possui_contratos = session.query(Contrato.id_contrato).filter(Contrato.id_cliente == id_cliente).first()
+        if not possui_contratos:
+            raise HTTPException(status_code=404, detail="Nenhum contrato encontrado para este cliente")
         raise HTTPException(status_code=404, detail="Nenhum contrato com dados financeiros encontrado para este cliente")
     
     return ContratosResponseSchema(
@@ -139,90 +227,43 @@ async def contratos(id_cliente: int, session: Session = Depends(pegar_sessao)):
 
 
 @cliente_router.get("/contrato/{id_contrato}", response_model=ContratoCompletoSchema, dependencies=[Depends(verificar_token)])
-async def detalhes_contrato(id_contrato: int, session: Session = Depends(pegar_sessao)):
+async def detalhes_contrato(request: Request, id_contrato: int, session: Session = Depends(pegar_sessao)):
     """
     Retorna informações completas de um contrato específico:
     - Dados do Contrato
     - Dados do Veículo
     - Dados Financeiros
     - Todas as Parcelas
+
+    A resposta vem do cache de contratos (envie 'Cache-Control: no-cache' para ignorá-lo)
     """
-    contrato = session.query(Contrato).filter(Contrato.id_contrato == id_contrato).first()
-    
-    if not contrato:
-        raise HTTPException(status_code=404, detail="Contrato não encontrado")
-    
-    cliente = session.query(Cliente).filter(Cliente.id_cliente == contrato.id_cliente).first()
-    if not cliente:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    
-    veiculo = session.query(Veiculo).filter(Veiculo.id_veiculo == contrato.id_veiculo).first()
-    if not veiculo:
-        raise HTTPException(status_code=404, detail="Veículo não encontrado para este contrato")
-    
-    financeiro = session.query(Financeiro).filter(Financeiro.id_contrato == contrato.id_contrato).first()
-    if not financeiro:
-        raise HTTPException(status_code=404, detail="Dados financeiros não encontrados para este contrato")
-    
-    parcelas = session.query(Parcela).filter(Parcela.id_financeiro == financeiro.id_financeiro).order_by(Parcela.numero_parcela).all()
-    
-    parcelas_schema = [
-        ParcelaSchema(
-            id_parcela=p.id_parcela,
-            numero_parcela=p.numero_parcela,
-            valor_parcela=float(p.valor_parcela),
-            data_vencimento=p.data_vencimento,
-            data_pagamento=p.data_pagamento,
-            valor_pago=float(p.valor_pago) if p.valor_pago else None,
-            status=p.status
-        ) for p in parcelas
-    ]
-    
-    financeiro_schema = FinanceiroCompletoSchema(
-        id_financeiro=financeiro.id_financeiro,
-        valor_total=float(financeiro.valor_total),
-        valor_entrada=float(financeiro.valor_entrada),
-        taxa_juros=float(financeiro.taxa_juros) if financeiro.taxa_juros else None,
-        qtde_parcelas=financeiro.qtde_parcelas,
-        data_primeiro_vencimento=financeiro.data_primeiro_vencimento,
-        status_pagamento=financeiro.status_pagamento,
-        data_criacao=financeiro.data_criacao,
-        parcelas=parcelas_schema
-    )
-    
-    veiculo_schema = VeiculoCompletoSchema(
-        id_veiculo=veiculo.id_veiculo,
-        marca=veiculo.marca,
-        modelo=veiculo.modelo,
-        ano_fabricacao=veiculo.ano_fabricacao,
-        ano_modelo=veiculo.ano_modelo,
-        cor=veiculo.cor,
-        placa=veiculo.placa,
-        num_chassi=veiculo.num_chassi,
-        num_renavam=veiculo.num_renavam,
-        valor=float(veiculo.valor)
-    )
-    
-    cliente_schema = ClienteInfoSchema(
-        id_cliente=cliente.id_cliente,
-        nome=cliente.nome,
-        cpf=cliente.cpf,
-        email=cliente.email,
-        telefone=cliente.telefone,
-        renda=float(cliente.renda) if cliente.renda else None
-    )
-    
-    return ContratoCompletoSchema(
-        id_contrato=contrato.id_contrato,
-        numero_contrato=contrato.num_contrato,
-        status=contrato.status,
-        id_cliente=contrato.id_cliente,
-        data_emissao=contrato.data_emissao,
-        vigencia_fim=contrato.vigencia_fim,
-        veiculo=veiculo_schema,
-        financeiro=financeiro_schema,
-        cliente=cliente_schema
+    return responder_contrato_cacheado(request, session, id_contrato)
+
+
+@cliente_router.post("/contrato/{id_contrato}/antecipacao", response_model=RenegociacaoResultadoSchema)
+async def antecipar_pagamento(
+    id_contrato: int,
+    dados: AntecipacaoSchema,
+    usuario: Usuario = Depends(verificar_token),
+    session: Session = Depends(pegar_sessao)
+):
+    """
+    Pagamento antecipado de um contrato ativo e em dia do cliente do token. O valor abate o
+    saldo devedor e as parcelas em aberto são recalculadas: 'prazo' reduz a quantidade,
+    'parcela' reduz o valor. Se o valor cobre o saldo, o contrato é quitado.
+    Com 'simular', devolve o novo plano sem gravar
+    """
+    id_cliente = id_cliente_do_usuario(session, usuario.id_usuario)
+    resultado = renegociar_contrato(
+        session, id_contrato, "antecipacao",
+        valor_antecipado=dados.valor, modo=dados.modo, simular=dados.simular, id_cliente=id_cliente
     )
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro ao registrar antecipação: {str(e)}")
+    return resultado
 
 
 def gerar_numero_contrato(session: Session) -> str:
@@ -247,24 +288,45 @@ def gerar_numero_contrato(session: Session) -> str:
     return f"{prefixo}-{novo_numero:04d}"
 
 
-def extrair_ano_do_codigo_fipe(ano_codigo: str) -> tuple[int, int]:
+def extrair_ano_do_codigo_fipe(ano_codigo: str) -> int:
     """
-    Extrai ano de fabricação e ano modelo do código FIPE.
-    O código FIPE geralmente vem como "2024-1" ou "2024" ou apenas o ano.
-    Retorna (ano_fabricacao, ano_modelo)
+    Extrai o ano modelo, como na FIPE, do código do ano selecionado.
+    O código vem como "2024-1" (ano-combustível), "2024" ou "32000-1" (zero km).
     """
     if not ano_codigo:
         raise ValueError("Código do ano não fornecido")
 
-    match = re.search(r'(\d{4})', str(ano_codigo))
+    match = re.match(r'\s*(\d+)', str(ano_codigo))
     if match:
-        ano = int(match.group(1))
-
-        return (ano, ano)
+        return int(match.group(1))
     
     raise ValueError(f"Não foi possível extrair o ano do código: {ano_codigo}")
 
 
+@cliente_router.get("/fipe/{codigo_fipe}/{ano_modelo}", response_model=FipeReferenciaSchema, dependencies=[Depends(verificar_token)])
+async def consultar_fipe(codigo_fipe: str, ano_modelo: int):
+    """
+    Consulta marca, modelo e valor de referência no índice FIPE local
+    (ano_modelo 32000 = zero km, como na tabela FIPE)
+    """
+    if obter_indice_fipe() is None:
+        raise HTTPException(status_code=503, detail="Tabela FIPE local não carregada")
+    
+    referencia = resolver_referencia(codigo_fipe, ano_modelo)
+    if not referencia:
+        raise HTTPException(status_code=404, detail="Veículo não encontrado na tabela FIPE")
+    
+    return FipeReferenciaSchema(
+        codigo_fipe=referencia.codigo_fipe,
+        ano_modelo=referencia.ano_modelo,
+        combustivel=referencia.combustivel,
+        marca=referencia.marca,
+        modelo=referencia.modelo,
+        valor=float(referencia.valor),
+        mes_referencia=referencia.mes_referencia
+    )
+
+
 @cliente_router.post("/solicitacao", dependencies=[Depends(verificar_token)])
 @limiter.limit("5/minute")
 async def criar_solicitacao_financiamento(
@@ -311,14 +373,32 @@ async def criar_solicitacao_financiamento(
             raise HTTPException(status_code=400, detail="RENAVAM já cadastrado")
         
         try:
-            ano_fabricacao, ano_modelo = extrair_ano_do_codigo_fipe(dados.anoSelecionado)
+            ano_fipe = extrair_ano_do_codigo_fipe(dados.anoSelecionado)
         except Exception as e:
             session.rollback()
             raise HTTPException(status_code=400, detail=f"Erro ao processar ano: {str(e)}")
         
+        # Com o índice FIPE local carregado, marca, modelo, ano e valor vêm da referência;
+        # sem referência válida a solicitação é recusada (o valor do frontend não é confiável)
+        referencia_fipe = None
+        if obter_indice_fipe() is not None:
+            codigo_fipe = dados.informacoesFipe.CodigoFipe if dados.informacoesFipe else None
+            referencia_fipe = resolver_referencia(codigo_fipe, ano_fipe)
+            if referencia_fipe is None:
+                session.rollback()
+                raise HTTPException(status_code=400, detail="Veículo não encontrado na tabela FIPE (código e ano)")
+            if not valor_dentro_da_tolerancia(dados.financeiro.valorVeiculo, referencia_fipe.valor):
+                session.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Valor do veículo acima do valor de referência FIPE ({float(referencia_fipe.valor):.2f})"
+                )
+            ano_fipe = referencia_fipe.ano_modelo
+        ano_fabricacao = ano_modelo = ano_calendario(ano_fipe)
+        
         veiculo = Veiculo(
-            marca=dados.marcaNome or "Não informado",
-            modelo=dados.modeloNome or "Não informado",
+            marca=referencia_fipe.marca if referencia_fipe else (dados.marcaNome or "Não informado"),
+            modelo=referencia_fipe.modelo if referencia_fipe else (dados.modeloNome or "Não informado"),
             ano_fabricacao=ano_fabricacao,
             ano_modelo=ano_modelo,
             cor=dados.veiculo.cor,
@@ -356,12 +436,19 @@ async def criar_solicitacao_financiamento(
             status_pagamento="em_dia",
             data_criacao=data_emissao
         )
-        session.add(financeiro)
-        session.flush()
         
         valor_parcela = float(dados.financeiro.valorParcela or (valor_total / dados.financeiro.parcelasSelecionadas))
         qtde_parcelas = int(dados.financeiro.parcelasSelecionadas)
         
+        # Pré-análise de risco: a renda informada na simulação tem prioridade sobre a do cadastro
+        financeiro.renda_mensal = dados.financeiro.rendaMensal or cliente.renda
+        aplicar_avaliacao(financeiro, avaliar_risco(
+            valor_parcela, financeiro.renda_mensal, dados.financeiro.valorVeiculo,
+            dados.financeiro.valorEntrada, exposicao_cliente(session, cliente.id_cliente)
+        ))
+        session.add(financeiro)
+        session.flush()
+        
         for i in range(1, qtde_parcelas + 1):
             meses_apos_primeiro = i - 1
             if meses_apos_primeiro == 0:
@@ -390,6 +477,22 @@ async def criar_solicitacao_financiamento(
             )
             session.add(parcela)
         
+        notificar_solicitacao_criada(session, SolicitacaoListaSchema(
+            id_contrato=contrato.id_contrato,
+            numero_contrato=num_contrato,
+            id_cliente=cliente.id_cliente,
+            nome_cliente=cliente.nome,
+            marca_veiculo=veiculo.marca,
+            modelo_veiculo=veiculo.modelo,
+            valor_veiculo=float(veiculo.valor),
+            valor_entrada=float(financeiro.valor_entrada),
+            qtde_parcelas=qtde_parcelas,
+            status=contrato.status,
+            data_emissao=data_emissao,
+            score_risco=financeiro.score_risco,
+            comprometimento_renda=float(financeiro.comprometimento_renda) if financeiro.comprometimento_renda is not None else None,
+            ltv=float(financeiro.ltv) if financeiro.ltv is not None else None
+        ))
         session.commit()
         
         return {
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from servicos.metricas import exportar_metricas
+
+metricas_router = APIRouter(tags=["metricas"])
+
+
+@metricas_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metricas(request: Request):
+    """
+    Métricas no formato de exposição do Prometheus.
+    Cada worker expõe os próprios valores (configure o scrape por worker/processo).
+    """
+    token = request.app.state.settings.metricas_token
+    if token and request.headers.get("authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=401, detail="Acesso Negado")
+    return PlainTextResponse(exportar_metricas(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional, Union
-from datetime import date
+from typing import Literal, Optional, Union
+from datetime import date, datetime
 
 class SimulacaoSchema(BaseModel):
     valor_veiculo: float
@@ -69,6 +69,7 @@ class ContratoDetalhadoSchema(BaseModel):
     id_veiculo: int
     id_financeiro: int
     data_emissao: date
+    motivo_status: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -88,6 +89,11 @@ class ParcelaSchema(BaseModel):
     data_pagamento: Optional[date] = None
     valor_pago: Optional[float] = None
     status: str
+    # Encargos por atraso na data da consulta (só parcelas em aberto vencidas)
+    dias_atraso: Optional[int] = None
+    valor_multa: Optional[float] = None
+    valor_juros: Optional[float] = None
+    valor_atualizado: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -101,6 +107,7 @@ class FinanceiroCompletoSchema(BaseModel):
     data_primeiro_vencimento: date
     status_pagamento: str
     data_criacao: date
+    valor_em_atraso_atualizado: float = 0.0
     parcelas: list[ParcelaSchema] = []
 
     class Config:
@@ -140,6 +147,7 @@ class ContratoCompletoSchema(BaseModel):
     id_cliente: int
     data_emissao: date
     vigencia_fim: Optional[date] = None
+    motivo_status: Optional[str] = None
     veiculo: VeiculoCompletoSchema
     financeiro: FinanceiroCompletoSchema
     cliente: ClienteInfoSchema  
@@ -156,6 +164,19 @@ class InformacoesFipeSchema(BaseModel):
     class Config:
         from_attributes = True
 
+class FipeReferenciaSchema(BaseModel):
+    """Schema com a referência de um veículo no índice FIPE local"""
+    codigo_fipe: str
+    ano_modelo: int
+    combustivel: Optional[str] = None
+    marca: str
+    modelo: str
+    valor: float
+    mes_referencia: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class VeiculoSchema(BaseModel):
     placa: str
     numChassi: str
@@ -228,6 +249,9 @@ class SolicitacaoListaSchema(BaseModel):
     qtde_parcelas: int
     status: str
     data_emissao: date
+    score_risco: Optional[int] = None
+    comprometimento_renda: Optional[float] = None
+    ltv: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -263,6 +287,17 @@ class ContratosVigentesResponseSchema(BaseModel):
     class Config:
         from_attributes = True
 
+class AvaliacaoRiscoSchema(BaseModel):
+    """Pré-análise de risco da solicitação (uso interno do admin)"""
+    score_risco: Optional[int] = None
+    comprometimento_renda: Optional[float] = None
+    ltv: Optional[float] = None
+    exposicao: Optional[float] = None
+    renda_mensal: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
 class SolicitacaoDetalheSchema(BaseModel):
     """Schema com detalhes completos de uma solicitação"""
     id_contrato: int
@@ -276,6 +311,7 @@ class SolicitacaoDetalheSchema(BaseModel):
     status: str
     veiculo: VeiculoCompletoSchema
     financeiro: FinanceiroCompletoSchema
+    avaliacao_risco: Optional[AvaliacaoRiscoSchema] = None
 
     class Config:
         from_attributes = True
@@ -284,6 +320,13 @@ class AprovarRejeitarSchema(BaseModel):
     """Schema para aprovar ou rejeitar solicitação"""
     motivo: Optional[str] = None
 
+    @field_validator('motivo')
+    @classmethod
+    def validar_motivo(cls, v):
+        if v is not None and len(v) > 255:
+            raise ValueError('motivo deve ter no máximo 255 caracteres')
+        return v
+
     class Config:
         from_attributes = True
 
@@ -294,6 +337,256 @@ class DashboardMetricasSchema(BaseModel):
     valor_total_financiado: float
     parcelas_em_atraso_qtd: int
     parcelas_em_atraso_valor: float
+    parcelas_em_atraso_valor_atualizado: float = 0.0
+
+    class Config:
+        from_attributes = True
+
+class CacheEstatisticasSchema(BaseModel):
+    """Schema com estatísticas do cache de contratos"""
+    hits: int
+    misses: int
+    hit_ratio: float
+    tamanho: int
+
+    class Config:
+        from_attributes = True
+
+class JobSchema(BaseModel):
+    """Schema com o estado de um job em segundo plano"""
+    id_job: int
+    tipo: str
+    status: str
+    progresso: int
+    mensagem: Optional[str] = None
+    resultado: Optional[dict] = None
+    erro: Optional[str] = None
+    criado_em: datetime
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class JobCriadoSchema(BaseModel):
+    """Resposta 202 das rotas que enfileiram um job"""
+    id_job: int
+    status: str
+    url_status: str
+
+    class Config:
+        from_attributes = True
+
+class AgingLinhaSchema(BaseModel):
+    """Parcelas em aberto de um grupo, por faixa de atraso"""
+    grupo: str
+    quantidades: dict[str, int]
+    valores: dict[str, float]
+
+    class Config:
+        from_attributes = True
+
+class AgingRelatorioSchema(BaseModel):
+    """Relatório de aging da carteira (atual ou de um snapshot)"""
+    data_referencia: date
+    origem: str
+    faixas: list[str]
+    total: AgingLinhaSchema
+    por_marca: list[AgingLinhaSchema]
+    por_ano_modelo: list[AgingLinhaSchema]
+    por_faixa_renda: list[AgingLinhaSchema]
+
+    class Config:
+        from_attributes = True
+
+class AgingHistoricoSchema(BaseModel):
+    """Um dia da série histórica do aging"""
+    data_referencia: date
+    quantidades: dict[str, int]
+    valores: dict[str, float]
+
+    class Config:
+        from_attributes = True
+
+class FluxoCaixaMesSchema(BaseModel):
+    """Entrada projetada de um mês"""
+    competencia: str
+    valor_contratual: float
+    valor_esperado: float
+    prepagamento: float
+    inadimplencia: float
+
+    class Config:
+        from_attributes = True
+
+class FluxoCaixaSchema(BaseModel):
+    """Projeção do fluxo de recebimentos da carteira ativa"""
+    data_referencia: date
+    horizonte_meses: int
+    cenario: dict[str, float]
+    valor_vencido: float
+    total_contratual: float
+    total_esperado: float
+    meses: list[FluxoCaixaMesSchema]
+
+    class Config:
+        from_attributes = True
+
+class BuscaResultadoSchema(BaseModel):
+    """Um resultado da busca do admin (cliente, veículo ou contrato)"""
+    tipo: str
+    id: int
+    id_cliente: Optional[int] = None
+    titulo: str
+    detalhe: Optional[str] = None
+    relevancia: float
+
+    class Config:
+        from_attributes = True
+
+class BuscaResponseSchema(BaseModel):
+    """Resposta da busca do admin"""
+    termo: str
+    resultados: list[BuscaResultadoSchema]
+    total: int
+
+    class Config:
+        from_attributes = True
+
+class EnderecoSchema(BaseModel):
+    logradouro: str
+    numero: Optional[str] = None
+    bairro: str
+    cidade: str
+    estado: str
+    cep: str
+
+    class Config:
+        from_attributes = True
+
+class ContratoResumoSchema(BaseModel):
+    """Resumo de um contrato na visão "minha conta" do cliente"""
+    id_contrato: int
+    numero_contrato: str
+    status: str
+    data_emissao: date
+    veiculo: str
+    placa: Optional[str] = None
+    valor_total: float
+    qtde_parcelas: int
+    parcelas_pagas: int
+    status_pagamento: Optional[str] = None
+    saldo_devedor: float
+    proxima_parcela: Optional[ParcelaSchema] = None
+
+    class Config:
+        from_attributes = True
+
+class MinhaContaSchema(BaseModel):
+    """Perfil, contratos e saldo em aberto do cliente logado"""
+    cliente: ClienteInfoSchema
+    endereco: EnderecoSchema
+    contratos: list[ContratoResumoSchema]
+    total_contratos: int
+    saldo_devedor_total: float
+
+    class Config:
+        from_attributes = True
+
+class EventoSchema(BaseModel):
+    """Evento entregue pelo long-poll (mesmo conteúdo do stream SSE)"""
+    id: int
+    tipo: str
+    dados: dict
+
+    class Config:
+        from_attributes = True
+
+class EventosClienteSchema(BaseModel):
+    """Resposta do long-poll: eventos novos e o id a enviar em 'desde' na próxima chamada"""
+    eventos: list[EventoSchema]
+    ultimo_id: int
+
+    class Config:
+        from_attributes = True
+
+class ParcelaPlanoSchema(BaseModel):
+    numero_parcela: int
+    valor_parcela: float
+    data_vencimento: date
+
+    class Config:
+        from_attributes = True
+
+class AntecipacaoSchema(BaseModel):
+    """Pagamento antecipado: 'prazo' reduz a quantidade de parcelas, 'parcela' reduz o valor"""
+    valor: float
+    modo: Literal["prazo", "parcela"] = "prazo"
+    simular: bool = False
+
+    @field_validator('valor')
+    @classmethod
+    def validar_valor(cls, v):
+        if v <= 0:
+            raise ValueError('valor deve ser maior que zero')
+        return v
 
     class Config:
-        from_attributes = True  
\ No newline at end of file
+        from_attributes = True
+
+class RenegociacaoSchema(BaseModel):
+    """Novas condições para as parcelas em aberto (campos omitidos continuam como estão)"""
+    taxa_juros: Optional[float] = None
+    qtde_parcelas: Optional[int] = None
+    sistema: Optional[Literal["price", "sac"]] = None
+    simular: bool = False
+
+    @field_validator('taxa_juros')
+    @classmethod
+    def validar_taxa(cls, v):
+        if v is not None and not 0 <= v <= 20:
+            raise ValueError('taxa_juros deve estar entre 0 e 20 (% ao mês)')
+        return v
+
+    @field_validator('qtde_parcelas')
+    @classmethod
+    def validar_qtde(cls, v):
+        if v is not None and not 1 <= v <= 120:
+            raise ValueError('qtde_parcelas deve estar entre 1 e 120')
+        return v
+
+    class Config:
+        from_attributes = True
+
+class RepreciamentoSchema(BaseModel):
+    """Nova taxa para os contratos ativos (só os de taxa_anterior, se informada)"""
+    taxa_juros: float
+    taxa_anterior: Optional[float] = None
+
+    @field_validator('taxa_juros')
+    @classmethod
+    def validar_taxa(cls, v):
+        if not 0 <= v <= 20:
+            raise ValueError('taxa_juros deve estar entre 0 e 20 (% ao mês)')
+        return v
+
+    class Config:
+        from_attributes = True
+
+class RenegociacaoResultadoSchema(BaseModel):
+    """Resultado (ou simulação) de uma antecipação ou renegociação"""
+    id_contrato: int
+    tipo: str
+    simulacao: bool
+    quitado: bool
+    valor_pago: float
+    saldo_anterior: float
+    saldo_novo: float
+    taxa_juros: float
+    sistema: str
+    parcelas_anteriores: int
+    parcelas_novas: int
+    parcelas: list[ParcelaPlanoSchema]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,39 @@
+"""
+Grava multa e juros de mora nas parcelas em aberto vencidas (colunas valor_multa,
+valor_juros e data_calculo_encargos da parcela). Feito para o agendamento noturno
+(cron), depois da virada do dia:
+
+    15 0 * * * cd /srv/aureus && python -m scripts.acumular_encargos
+
+Uso:
+    python -m scripts.acumular_encargos
+    python -m scripts.acumular_encargos --data 2025-10-31 --lote 100000
+"""
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from models import criar_engine
+from servicos.encargos import TAMANHO_LOTE_ENCARGOS, acumular_encargos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava multa e juros de mora das parcelas vencidas")
+    parser.add_argument("--data", type=date.fromisoformat, default=None, help="Data de referência (padrão: hoje)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_ENCARGOS, help="Faixa de id_parcela por UPDATE")
+    args = parser.parse_args()
+
+    engine = criar_engine(Settings.do_ambiente().database_url)
+    data_referencia = args.data or date.today()
+    inicio = time.perf_counter()
+    with sessionmaker(bind=engine)() as session:
+        atualizadas = acumular_encargos(session, data_referencia, args.lote)
+    engine.dispose()
+    print(f"encargos de {data_referencia}: {atualizadas} parcelas em {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Importa o dump mensal da tabela FIPE para o índice local.
+
+Uso:
+    python -m scripts.carregar_fipe tabela_fipe_202510.csv
+    python -m scripts.carregar_fipe tabela_fipe_202510.json --indice ./fipe.db
+"""
+import argparse
+import time
+
+from servicos.fipe import carregar_tabela_fipe, FIPE_INDICE_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa o dump da tabela FIPE para o índice local")
+    parser.add_argument("arquivo", help="Arquivo CSV ou JSON com a tabela FIPE do mês")
+    parser.add_argument("--indice", default=FIPE_INDICE_PATH, help="Caminho do índice SQLite gerado")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    total = carregar_tabela_fipe(args.arquivo, args.indice)
+    print(f"{total} registros importados em {time.perf_counter() - inicio:.2f}s -> {args.indice}")
+
+
+if __name__ == "__main__":
+    main()
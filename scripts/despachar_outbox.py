@@ -0,0 +1,56 @@
+"""
+Processo que drena a outbox (lembretes de vencimento, avisos de aprovação/rejeição) e
+entrega as mensagens ao remetente configurado. OUTBOX_DESTINO define o arquivo JSONL de
+saída (padrão: saída padrão); um provedor de e-mail/SMS implementa servicos.outbox.Remetente.
+Vários processos podem rodar juntos: a reserva de cada lote é atômica.
+
+Uso:
+    python -m scripts.despachar_outbox
+    python -m scripts.despachar_outbox --lote 500 --intervalo 2
+    python -m scripts.despachar_outbox --uma-vez
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from models import criar_engine
+from servicos.outbox import TAMANHO_LOTE_OUTBOX, criar_remetente, drenar_outbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Despacha as mensagens da outbox em lotes")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_OUTBOX, help="Mensagens reservadas por vez")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Espera (s) quando a outbox está vazia")
+    parser.add_argument("--uma-vez", action="store_true", help="Drena a outbox e termina")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    logger = logging.getLogger("aureus.outbox")
+    engine = criar_engine(Settings.do_ambiente().database_url)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    remetente = criar_remetente()
+
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+
+    while not parar.is_set():
+        try:
+            totais = drenar_outbox(session_factory, remetente, args.lote)
+        except Exception:
+            logger.exception("erro ao despachar a outbox")
+            totais = None
+        if totais and totais["lotes"]:
+            logger.info("outbox: %(enviadas)s enviadas, %(falhas)s falhas em %(lotes)s lote(s)", totais)
+        if args.uma_vez:
+            break
+        parar.wait(args.intervalo)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Gera uma carteira sintética consistente direto no banco, para testes de escala.
+
+Cria perfil, usuario, endereco, cliente, veiculo, contrato, financeiro e parcela com
+CPFs, placas (padrão Mercosul), chassis e RENAVAMs válidos e únicos. Usa COPY no
+Postgres e inserts em lote do SQLAlchemy Core nos demais bancos. Todos os usuários
+gerados compartilham um único hash de senha, então o bcrypt roda uma vez só.
+
+A mesma --semente (com o banco no mesmo estado inicial) gera exatamente os mesmos dados.
+
+Uso:
+    python -m scripts.gerar_dados --clientes 100000 --contratos 500000
+    python -m scripts.gerar_dados --database-url postgresql://... --clientes 1000000 --contratos 5000000 --parcelas 60
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import time
+from calendar import monthrange
+from datetime import date, timedelta
+
+import bcrypt
+from sqlalchemy import create_engine, func, insert, select, text
+
+from models import Base, Perfil, Usuario, Endereco, Cliente, Veiculo, Contrato, Financeiro, Parcela
+
+SENHA_PADRAO = "senha123"
+TAMANHO_LOTE = 20_000
+
+VEICULOS = [
+    ("Fiat", "Mobi Like 1.0"), ("Fiat", "Argo Drive 1.0"), ("Fiat", "Strada Freedom 1.3"),
+    ("Volkswagen", "Gol 1.0"), ("Volkswagen", "Polo Track 1.0"), ("Volkswagen", "T-Cross 200 TSI"),
+    ("Chevrolet", "Onix 1.0"), ("Chevrolet", "Tracker LT 1.0 Turbo"), ("Hyundai", "HB20 Comfort 1.0"),
+    ("Hyundai", "Creta Action 1.6"), ("Toyota", "Corolla XEi 2.0"), ("Toyota", "Hilux SRV 2.8"),
+    ("Renault", "Kwid Zen 1.0"), ("Jeep", "Renegade Longitude 1.3"), ("Honda", "HR-V EXL 1.5"),
+]
+CORES = ["Branco", "Prata", "Preto", "Cinza", "Vermelho", "Azul"]
+CIDADES = [("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"), ("Curitiba", "PR"),
+           ("Porto Alegre", "RS"), ("Salvador", "BA"), ("Recife", "PE"), ("Goiânia", "GO")]
+BAIRROS = ["Centro", "Jardim América", "Vila Nova", "Boa Vista", "Santa Cecília", "Liberdade"]
+PARCELAS_POSSIVEIS = (12, 24, 36, 48, 60, 72)
+
+ALFABETO_CHASSI = "0123456789ABCDEFGHJKLMNPRSTUVWXYZ"  # VIN não usa I, O e Q
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+# ========================
+# Documentos válidos e únicos (derivados do id, então nunca colidem)
+# ========================
+
+def gerar_cpf(n: int) -> str:
+    """CPF com dígitos verificadores válidos; ids diferentes geram CPFs diferentes"""
+    base = f"{(n * 7919 + 100_000_000) % 1_000_000_000:09d}"
+    digitos = [int(d) for d in base]
+    for tamanho in (9, 10):
+        soma = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos[:tamanho]))
+        resto = soma % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return "".join(str(d) for d in digitos)
+
+
+def gerar_placa(n: int) -> str:
+    """Placa no padrão Mercosul (LLLNLNN)"""
+    n, d2 = divmod(n, 100)
+    n, l4 = divmod(n, 26)
+    n, d1 = divmod(n, 10)
+    n, l3 = divmod(n, 26)
+    n, l2 = divmod(n, 26)
+    l1 = n % 26
+    return f"{LETRAS[l1]}{LETRAS[l2]}{LETRAS[l3]}{d1}{LETRAS[l4]}{d2:02d}"
+
+
+def gerar_chassi(n: int) -> str:
+    """Chassi de 17 caracteres (WMI 9BW + sequência em base 33)"""
+    sufixo = []
+    for _ in range(14):
+        n, resto = divmod(n, len(ALFABETO_CHASSI))
+        sufixo.append(ALFABETO_CHASSI[resto])
+    return "9BW" + "".join(reversed(sufixo))
+
+
+def gerar_renavam(n: int) -> str:
+    """RENAVAM de 11 dígitos com dígito verificador válido"""
+    base = f"{n:010d}"
+    soma = sum(int(d) * p for d, p in zip(reversed(base), (2, 3, 4, 5, 6, 7, 8, 9, 2, 3)))
+    digito = (soma * 10) % 11
+    return base + str(0 if digito == 10 else digito)
+
+
+def somar_meses(data: date, meses: int) -> date:
+    mes = data.month - 1 + meses
+    ano = data.year + mes // 12
+    mes = mes % 12 + 1
+    return date(ano, mes, min(data.day, monthrange(ano, mes)[1]))
+
+
+def valor_parcela_price(valor_financiado: float, taxa_mensal_pct: float, qtde: int) -> float:
+    taxa = taxa_mensal_pct / 100
+    return round(valor_financiado * taxa / (1 - (1 + taxa) ** -qtde), 2)
+
+
+# ========================
+# Escrita em lote (COPY no Postgres, executemany direto no driver no SQLite,
+# Core executemany nos demais)
+# ========================
+
+class Gravador:
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.usar_copy = conexao.dialect.name == "postgresql"
+        self.usar_driver = conexao.dialect.name == "sqlite"
+
+    def gravar(self, tabela, linhas: list):
+        if not linhas:
+            return
+        if self.usar_copy:
+            colunas = list(linhas[0].keys())
+            buffer = io.StringIO()
+            escritor = csv.writer(buffer)
+            for linha in linhas:
+                escritor.writerow(["" if linha[c] is None else linha[c] for c in colunas])
+            buffer.seek(0)
+            cursor = self.conexao.connection.dbapi_connection.cursor()
+            cursor.copy_expert(
+                f"COPY {tabela.name} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv, NULL '')", buffer
+            )
+        elif self.usar_driver:
+            # Evita o processamento de parâmetros do SQLAlchemy (a maior parte do custo por linha).
+            # Datas vão no mesmo formato ISO que o tipo Date do SQLAlchemy grava no SQLite.
+            colunas = list(linhas[0].keys())
+            marcadores = ", ".join("?" for _ in colunas)
+            self.conexao.exec_driver_sql(
+                f"INSERT INTO {tabela.name} ({', '.join(colunas)}) VALUES ({marcadores})",
+                [tuple(v.isoformat() if isinstance(v, date) else v for v in linha.values()) for linha in linhas]
+            )
+        else:
+            self.conexao.execute(insert(tabela), linhas)
+
+
+def _proximo_id(conexao, coluna) -> int:
+    return (conexao.execute(select(func.max(coluna))).scalar() or 0) + 1
+
+
+def _ajustar_sequencias(conexao):
+    """No Postgres, os ids explícitos não avançam as sequências SERIAL"""
+    if conexao.dialect.name != "postgresql":
+        return
+    for tabela, coluna in (("usuario", "id_usuario"), ("endereco", "id_endereco"), ("cliente", "id_cliente"),
+                           ("veiculo", "id_veiculo"), ("contrato", "id_contrato"),
+                           ("financeiro", "id_financeiro"), ("parcela", "id_parcela")):
+        conexao.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabela}', '{coluna}'), COALESCE(MAX({coluna}), 1)) FROM {tabela}"
+        ))
+
+
+def gerar_carteira(engine, clientes: int, contratos: int, parcelas: tuple = PARCELAS_POSSIVEIS,
+                   semente: int = 42, proporcao_pendentes: float = 0.1, proporcao_rejeitados: float = 0.03,
+                   taxa_inadimplencia: float = 0.05, tamanho_lote: int = TAMANHO_LOTE, hoje: date | None = None) -> dict:
+    """
+    Gera a carteira e retorna contagens e ids úteis (ex.: para o benchmark de carga).
+    Contratos pendentes são recentes e têm todas as parcelas futuras, como os criados pela API.
+    """
+    aleatorio = random.Random(semente)
+    hoje = hoje or date.today()
+    senha_hash = bcrypt.hashpw(SENHA_PADRAO.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    totais = {"usuario": 0, "endereco": 0, "cliente": 0, "veiculo": 0, "contrato": 0, "financeiro": 0, "parcela": 0}
+
+    with engine.connect() as conexao:
+        with conexao.begin():
+            for id_perfil, nome in ((1, "cliente"), (2, "admin")):
+                if not conexao.execute(select(Perfil.id_perfil).where(Perfil.id_perfil == id_perfil)).first():
+                    conexao.execute(insert(Perfil.__table__), [{"id_perfil": id_perfil, "nome": nome}])
+
+            id_usuario = _proximo_id(conexao, Usuario.id_usuario)
+            id_endereco = _proximo_id(conexao, Endereco.id_endereco)
+            id_cliente = _proximo_id(conexao, Cliente.id_cliente)
+            id_veiculo = _proximo_id(conexao, Veiculo.id_veiculo)
+            id_contrato = _proximo_id(conexao, Contrato.id_contrato)
+            id_financeiro = _proximo_id(conexao, Financeiro.id_financeiro)
+            id_parcela = _proximo_id(conexao, Parcela.id_parcela)
+
+        gravador = Gravador(conexao)
+
+        # Clientes (usuario + endereco + cliente)
+        for inicio in range(0, clientes, tamanho_lote):
+            usuarios, enderecos, linhas_cliente = [], [], []
+            for i in range(inicio, min(inicio + tamanho_lote, clientes)):
+                cidade, estado = aleatorio.choice(CIDADES)
+                usuarios.append({"id_usuario": id_usuario + i, "id_perfil": 1, "login": f"cliente{id_usuario + i}",
+                                 "senha_hash": senha_hash, "data_criacao": hoje - timedelta(days=aleatorio.randint(0, 1800))})
+                enderecos.append({"id_endereco": id_endereco + i, "logradouro": f"Rua {aleatorio.randint(1, 999)}",
+                                  "numero": str(aleatorio.randint(1, 3000)), "bairro": aleatorio.choice(BAIRROS),
+                                  "cidade": cidade, "estado": estado, "cep": f"{aleatorio.randint(1000000, 99999999):08d}"})
+                linhas_cliente.append({"id_cliente": id_cliente + i, "id_usuario": id_usuario + i,
+                                       "id_endereco": id_endereco + i, "nome": f"Cliente {id_cliente + i}",
+                                       "cpf": gerar_cpf(id_cliente + i), "email": f"cliente{id_cliente + i}@exemplo.com.br",
+                                       "telefone": f"119{aleatorio.randint(10000000, 99999999)}",
+                                       "renda": round(aleatorio.lognormvariate(8.5, 0.6), 2),
+                                       "data_cadastro": usuarios[-1]["data_criacao"]})
+            with conexao.begin():
+                gravador.gravar(Usuario.__table__, usuarios)
+                gravador.gravar(Endereco.__table__, enderecos)
+                gravador.gravar(Cliente.__table__, linhas_cliente)
+            totais["usuario"] += len(usuarios)
+            totais["endereco"] += len(enderecos)
+            totais["cliente"] += len(linhas_cliente)
+
+        # Contratos (veiculo + contrato + financeiro + parcelas)
+        ids_pendentes, ids_ativos = [], []
+        veiculos, linhas_contrato, financeiros, linhas_parcela = [], [], [], []
+
+        def descarregar():
+            with conexao.begin():
+                gravador.gravar(Veiculo.__table__, veiculos)
+                gravador.gravar(Contrato.__table__, linhas_contrato)
+                gravador.gravar(Financeiro.__table__, financeiros)
+                gravador.gravar(Parcela.__table__, linhas_parcela)
+            for nome, linhas in (("veiculo", veiculos), ("contrato", linhas_contrato),
+                                 ("financeiro", financeiros), ("parcela", linhas_parcela)):
+                totais[nome] += len(linhas)
+                linhas.clear()
+
+        for i in range(contratos):
+            marca, modelo = aleatorio.choice(VEICULOS)
+            ano = aleatorio.randint(hoje.year - 10, hoje.year)
+            valor_veiculo = round(aleatorio.uniform(30_000, 250_000), 2)
+            entrada = round(valor_veiculo * aleatorio.uniform(0.0, 0.4), 2)
+            taxa = round(aleatorio.uniform(0.99, 2.49), 2)
+            qtde = aleatorio.choice(parcelas)
+            valor_parcela = valor_parcela_price(valor_veiculo - entrada, taxa, qtde)
+
+            sorteio = aleatorio.random()
+            if sorteio < proporcao_pendentes:
+                status = "pendente"
+                emissao = hoje - timedelta(days=aleatorio.randint(0, 20))
+            elif sorteio < proporcao_pendentes + proporcao_rejeitados:
+                status = "rejeitado"
+                emissao = hoje - timedelta(days=aleatorio.randint(0, 365))
+            else:
+                status = "ativo"
+                emissao = hoje - timedelta(days=aleatorio.randint(0, qtde * 30))
+            inadimplente = status == "ativo" and aleatorio.random() < taxa_inadimplencia
+
+            ic = id_contrato + i
+            veiculos.append({"id_veiculo": id_veiculo + i, "marca": marca, "modelo": modelo, "ano_fabricacao": ano,
+                             "ano_modelo": ano, "cor": aleatorio.choice(CORES), "placa": gerar_placa(id_veiculo + i),
+                             "num_chassi": gerar_chassi(id_veiculo + i), "num_renavam": gerar_renavam(id_veiculo + i),
+                             "valor": valor_veiculo})
+            linhas_contrato.append({"id_contrato": ic, "id_cliente": id_cliente + aleatorio.randrange(clientes),
+                                    "id_veiculo": id_veiculo + i, "num_contrato": f"CT-{emissao.strftime('%Y%m%d')}-{ic:08d}",
+                                    "data_emissao": emissao, "vigencia_fim": somar_meses(emissao, qtde + 1), "status": status})
+            primeiro_vencimento = emissao + timedelta(days=30)
+            financeiros.append({"id_financeiro": id_financeiro + i, "id_contrato": ic,
+                                "valor_total": round(valor_parcela * qtde, 2), "valor_entrada": entrada,
+                                "taxa_juros": taxa, "qtde_parcelas": qtde, "data_primeiro_vencimento": primeiro_vencimento,
+                                "status_pagamento": "inadimplente" if inadimplente else "em_dia", "data_criacao": emissao})
+
+            atrasou = False
+            for n in range(1, qtde + 1):
+                vencimento = somar_meses(primeiro_vencimento, n - 1)
+                pago = status == "ativo" and vencimento < hoje and not atrasou
+                if pago and inadimplente and aleatorio.random() < 0.3:
+                    atrasou = True  # a partir daqui o cliente parou de pagar
+                    pago = False
+                linhas_parcela.append({
+                    "id_parcela": id_parcela, "id_financeiro": id_financeiro + i, "numero_parcela": n,
+                    "valor_parcela": valor_parcela, "data_vencimento": vencimento,
+                    "data_pagamento": vencimento - timedelta(days=aleatorio.randint(0, 5)) if pago else None,
+                    "valor_pago": valor_parcela if pago else None,
+                    "status": "paga" if pago else ("atrasada" if status == "ativo" and vencimento < hoje else "pendente"),
+                })
+                id_parcela += 1
+
+            (ids_pendentes if status == "pendente" else ids_ativos if status == "ativo" else []).append(ic)
+            if len(linhas_parcela) >= tamanho_lote:
+                descarregar()
+
+        descarregar()
+        with conexao.begin():
+            _ajustar_sequencias(conexao)
+            # Estatísticas para o planejador: sem elas o SQLite não sabe que filtrar contratos por
+            # cliente é mais seletivo que filtrar parcelas por status
+            conexao.exec_driver_sql("ANALYZE")
+
+    return {
+        "totais": totais,
+        "ids_cliente": list(range(id_cliente, id_cliente + clientes)),
+        "ids_contrato_ativo": ids_ativos,
+        "ids_contrato_pendente": ids_pendentes,
+        "id_usuario_cliente": id_usuario,
+        "login_cliente": f"cliente{id_usuario}",
+        "senha": SENHA_PADRAO,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para testes de escala")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./database.db"))
+    parser.add_argument("--clientes", type=int, default=10_000)
+    parser.add_argument("--contratos", type=int, default=50_000)
+    parser.add_argument("--parcelas", type=int, nargs="*", default=list(PARCELAS_POSSIVEIS),
+                        help="Quantidades de parcelas possíveis (ex.: --parcelas 60 para fixar em 60)")
+    parser.add_argument("--pendentes", type=float, default=0.1, help="Proporção de solicitações pendentes")
+    parser.add_argument("--inadimplencia", type=float, default=0.05, help="Proporção de contratos ativos em atraso")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE)
+    parser.add_argument("--criar-tabelas", action="store_true", help="Executa create_all antes de gerar")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if args.criar_tabelas:
+        Base.metadata.create_all(bind=engine)
+
+    inicio = time.perf_counter()
+    resultado = gerar_carteira(
+        engine, args.clientes, args.contratos, tuple(args.parcelas), semente=args.semente,
+        proporcao_pendentes=args.pendentes, taxa_inadimplencia=args.inadimplencia, tamanho_lote=args.lote
+    )
+    duracao = time.perf_counter() - inicio
+
+    total_linhas = sum(resultado["totais"].values())
+    for tabela, qtde in resultado["totais"].items():
+        print(f"{tabela:12} {qtde:>12,}")
+    print(f"{total_linhas:,} linhas em {duracao:.1f}s ({total_linhas / duracao * 60:,.0f} linhas/min)")
+
+
+if __name__ == "__main__":
+    main()
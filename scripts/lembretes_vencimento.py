@@ -0,0 +1,40 @@
+"""
+Registra na outbox os lembretes das parcelas pendentes que vencem nos próximos dias
+(o envio fica com scripts.despachar_outbox). Feito para o agendamento diário (cron);
+rodar de novo no mesmo dia não duplica lembretes:
+
+    0 8 * * * cd /srv/aureus && python -m scripts.lembretes_vencimento
+
+Uso:
+    python -m scripts.lembretes_vencimento
+    python -m scripts.lembretes_vencimento --dias 5 --data 2025-10-31
+"""
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from models import criar_engine
+from servicos.outbox import LEMBRETE_DIAS_ANTECEDENCIA, enfileirar_lembretes_vencimento
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registra os lembretes de vencimento na outbox")
+    parser.add_argument("--dias", type=int, default=LEMBRETE_DIAS_ANTECEDENCIA, help="Antecedência em dias")
+    parser.add_argument("--data", type=date.fromisoformat, default=None, help="Data de referência (padrão: hoje)")
+    args = parser.parse_args()
+
+    engine = criar_engine(Settings.do_ambiente().database_url)
+    data_referencia = args.data or date.today()
+    inicio = time.perf_counter()
+    with sessionmaker(bind=engine)() as session:
+        registrados = enfileirar_lembretes_vencimento(session, args.dias, data_referencia)
+        session.commit()
+    engine.dispose()
+    print(f"lembretes de {data_referencia} (+{args.dias} dias): {registrados} registrados em {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
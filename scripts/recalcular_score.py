@@ -0,0 +1,35 @@
+"""
+Recalcula o score de risco de todas as solicitações pendentes (ex.: depois de mudar os
+pesos em servicos/score.py). Também disponível como job: POST /admin/solicitacoes/recalcular-score.
+
+Uso:
+    python -m scripts.recalcular_score
+    python -m scripts.recalcular_score --lote 20000
+"""
+import argparse
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from models import criar_engine
+from servicos.score import recalcular_scores_pendentes, TAMANHO_LOTE_SCORE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula o score de risco das solicitações pendentes")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_SCORE, help="Solicitações por lote")
+    args = parser.parse_args()
+
+    engine = criar_engine(Settings.do_ambiente().database_url)
+    inicio = time.perf_counter()
+    with sessionmaker(bind=engine)() as session:
+        total = recalcular_scores_pendentes(
+            session, args.lote, lambda feitas, total: print(f"{feitas}/{total}", flush=True)
+        )
+    engine.dispose()
+    print(f"{total} solicitações reavaliadas em {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
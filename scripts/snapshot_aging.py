@@ -0,0 +1,38 @@
+"""
+Grava o snapshot diário do aging da carteira (tabela aging_snapshot).
+Feito para o agendamento noturno (cron), depois da virada do dia:
+
+    5 0 * * * cd /srv/aureus && python -m scripts.snapshot_aging
+
+Uso:
+    python -m scripts.snapshot_aging
+    python -m scripts.snapshot_aging --data 2025-10-31
+"""
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from models import criar_engine
+from servicos.aging import gravar_snapshot_aging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava o snapshot diário do aging da carteira")
+    parser.add_argument("--data", type=date.fromisoformat, default=None, help="Data de referência (padrão: hoje)")
+    args = parser.parse_args()
+
+    engine = criar_engine(Settings.do_ambiente().database_url)
+    data_referencia = args.data or date.today()
+    inicio = time.perf_counter()
+    with sessionmaker(bind=engine)() as session:
+        linhas = gravar_snapshot_aging(session, data_referencia)
+        session.commit()
+    engine.dispose()
+    print(f"snapshot de {data_referencia}: {linhas} linhas em {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
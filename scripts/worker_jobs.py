@@ -0,0 +1,45 @@
+"""
+Processo dedicado aos jobs em segundo plano (exportações, recálculos, arquivamento...).
+Use com JOBS_WORKERS=0 na API para tirar os jobs dos workers que atendem requisições.
+
+Uso:
+    python -m scripts.worker_jobs
+    python -m scripts.worker_jobs --workers 4 --intervalo 0.5
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from models import criar_engine
+from servicos.jobs import WorkerJobs, TAREFAS
+import servicos.tarefas  # registra as tarefas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa os jobs em segundo plano da API Aureus")
+    parser.add_argument("--workers", type=int, default=2, help="Threads consumindo a fila")
+    parser.add_argument("--intervalo", type=float, default=1.0, help="Espera (s) quando a fila está vazia")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    settings = Settings.do_ambiente()
+    engine = criar_engine(settings.database_url)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+
+    pool = WorkerJobs(session_factory, args.workers, args.intervalo).iniciar()
+    logging.getLogger("aureus.jobs").info("%s worker(s) ativos; tarefas: %s", args.workers, ", ".join(sorted(TAREFAS)))
+    parar.wait()
+    pool.parar()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
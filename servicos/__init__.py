@@ -0,0 +1 @@
+# Servicos package
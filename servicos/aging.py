@@ -0,0 +1,165 @@
+from datetime import date, timedelta
+
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from models import AgingSnapshot, Cliente, Contrato, Financeiro, Parcela, Veiculo
+from schemas import AgingHistoricoSchema, AgingLinhaSchema, AgingRelatorioSchema
+
+# Faixas de atraso em dias (limite superior de cada faixa); o que passar da última é "90_mais"
+FAIXAS_ATRASO = ["a_vencer", "1_30", "31_60", "61_90", "90_mais"]
+LIMITES_ATRASO = [(30, "1_30"), (60, "31_60"), (90, "61_90")]
+
+# Faixas de renda mensal do cliente (limite superior exclusivo)
+LIMITES_RENDA = [(3000, "ate_3000"), (6000, "3000_6000"), (10000, "6000_10000")]
+
+
+def _expressao_faixa_atraso(hoje: date):
+    """
+    Faixa por dias de atraso, comparando o vencimento com datas de corte
+    (portável entre SQLite e PostgreSQL e aproveita o índice em data_vencimento)
+    """
+    return case(
+        (Parcela.data_vencimento >= hoje, "a_vencer"),
+        *[(Parcela.data_vencimento >= hoje - timedelta(days=dias), faixa) for dias, faixa in LIMITES_ATRASO],
+        else_="90_mais",
+    )
+
+
+def _expressao_faixa_renda():
+    return case(
+        (Cliente.renda.is_(None), "nao_informada"),
+        *[(Cliente.renda < limite, faixa) for limite, faixa in LIMITES_RENDA],
+        else_="10000_mais",
+    )
+
+
+def consulta_aging(hoje: date):
+    """
+    Uma única query agrupada: parcelas em aberto (pendentes ou atrasadas) de contratos ativos,
+    por marca, ano do modelo, faixa de renda e faixa de atraso. As faixas são calculadas em
+    uma subquery para o GROUP BY usar colunas, e não repetir os CASE com parâmetros
+    (o PostgreSQL não reconhece como a mesma expressão).
+    """
+    parcelas = (
+        select(
+            Veiculo.marca,
+            Veiculo.ano_modelo,
+            _expressao_faixa_renda().label("faixa_renda"),
+            _expressao_faixa_atraso(hoje).label("faixa_atraso"),
+            Parcela.valor_parcela,
+        )
+        .select_from(Parcela)
+        .join(Financeiro, Financeiro.id_financeiro == Parcela.id_financeiro)
+        .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato)
+        .join(Veiculo, Veiculo.id_veiculo == Contrato.id_veiculo)
+        .join(Cliente, Cliente.id_cliente == Contrato.id_cliente)
+        .where(Contrato.status == "ativo", Parcela.status.in_(("pendente", "atrasada")))
+        .subquery()
+    )
+    return (
+        select(
+            parcelas.c.marca,
+            parcelas.c.ano_modelo,
+            parcelas.c.faixa_renda,
+            parcelas.c.faixa_atraso,
+            func.count().label("qtde_parcelas"),
+            func.sum(parcelas.c.valor_parcela).label("valor"),
+        )
+        .group_by(parcelas.c.marca, parcelas.c.ano_modelo, parcelas.c.faixa_renda, parcelas.c.faixa_atraso)
+    )
+
+
+def _linha_vazia(grupo: str) -> AgingLinhaSchema:
+    return AgingLinhaSchema(
+        grupo=grupo,
+        quantidades={faixa: 0 for faixa in FAIXAS_ATRASO},
+        valores={faixa: 0.0 for faixa in FAIXAS_ATRASO},
+    )
+
+
+def montar_relatorio_aging(linhas, data_referencia: date, origem: str) -> AgingRelatorioSchema:
+    """Consolida as linhas agrupadas (da query ou do snapshot) no total e nas três visões"""
+    total = _linha_vazia("total")
+    visoes = {"marca": {}, "ano_modelo": {}, "faixa_renda": {}}
+
+    for marca, ano_modelo, faixa_renda, faixa_atraso, qtde, valor in linhas:
+        valor = float(valor or 0)
+        chaves = {"marca": marca, "ano_modelo": str(ano_modelo), "faixa_renda": faixa_renda}
+        for linha in [total] + [visoes[v].setdefault(chave, _linha_vazia(chave)) for v, chave in chaves.items()]:
+            linha.quantidades[faixa_atraso] += qtde
+            linha.valores[faixa_atraso] = round(linha.valores[faixa_atraso] + valor, 2)
+
+    def ordenar(visao):
+        return [visao[chave] for chave in sorted(visao)]
+
+    return AgingRelatorioSchema(
+        data_referencia=data_referencia,
+        origem=origem,
+        faixas=FAIXAS_ATRASO,
+        total=total,
+        por_marca=ordenar(visoes["marca"]),
+        por_ano_modelo=ordenar(visoes["ano_modelo"]),
+        por_faixa_renda=ordenar(visoes["faixa_renda"]),
+    )
+
+
+def calcular_aging(session: Session, hoje: date | None = None) -> AgingRelatorioSchema:
+    hoje = hoje or date.today()
+    return montar_relatorio_aging(session.execute(consulta_aging(hoje)).all(), hoje, "atual")
+
+
+def gravar_snapshot_aging(session: Session, hoje: date | None = None) -> int:
+    """
+    Grava o aging do dia na tabela aging_snapshot com um INSERT ... SELECT (sem trazer as
+    linhas para o Python). Refazer o snapshot do mesmo dia substitui o anterior.
+    O commit fica por conta de quem chama. Retorna o número de linhas gravadas.
+    """
+    hoje = hoje or date.today()
+    session.execute(delete(AgingSnapshot).where(AgingSnapshot.data_referencia == hoje))
+    consulta = consulta_aging(hoje).subquery()
+    resultado = session.execute(
+        insert(AgingSnapshot).from_select(
+            ["data_referencia", "marca", "ano_modelo", "faixa_renda", "faixa_atraso", "qtde_parcelas", "valor"],
+            select(literal(hoje, AgingSnapshot.data_referencia.type), *consulta.c),
+        )
+    )
+    return resultado.rowcount
+
+
+def consultar_snapshot_aging(session: Session, data_referencia: date) -> AgingRelatorioSchema | None:
+    linhas = session.execute(
+        select(
+            AgingSnapshot.marca, AgingSnapshot.ano_modelo, AgingSnapshot.faixa_renda,
+            AgingSnapshot.faixa_atraso, AgingSnapshot.qtde_parcelas, AgingSnapshot.valor,
+        ).where(AgingSnapshot.data_referencia == data_referencia)
+    ).all()
+    if not linhas:
+        return None
+    return montar_relatorio_aging(linhas, data_referencia, "snapshot")
+
+
+def historico_aging(session: Session, inicio: date, fim: date) -> list[AgingHistoricoSchema]:
+    """Tendência diária por faixa de atraso, lida só dos snapshots"""
+    linhas = session.execute(
+        select(
+            AgingSnapshot.data_referencia,
+            AgingSnapshot.faixa_atraso,
+            func.sum(AgingSnapshot.qtde_parcelas),
+            func.sum(AgingSnapshot.valor),
+        )
+        .where(AgingSnapshot.data_referencia.between(inicio, fim))
+        .group_by(AgingSnapshot.data_referencia, AgingSnapshot.faixa_atraso)
+        .order_by(AgingSnapshot.data_referencia)
+    ).all()
+
+    por_data = {}
+    for data_referencia, faixa_atraso, qtde, valor in linhas:
+        ponto = por_data.setdefault(data_referencia, AgingHistoricoSchema(
+            data_referencia=data_referencia,
+            quantidades={faixa: 0 for faixa in FAIXAS_ATRASO},
+            valores={faixa: 0.0 for faixa in FAIXAS_ATRASO},
+        ))
+        ponto.quantidades[faixa_atraso] = int(qtde)
+        ponto.valores[faixa_atraso] = round(float(valor), 2)
+    return list(por_data.values())
@@ -0,0 +1,182 @@
+"""
+Busca do painel admin por nome, CPF, e-mail, placa, chassi ou número do contrato.
+
+- SQLite: tabela FTS5 'busca_fts' com tokenizador trigram (casa qualquer trecho de 3+
+  caracteres), mantida por triggers em cliente, veiculo e contrato.
+- PostgreSQL: índices GIN com pg_trgm direto nas colunas; a busca usa ILIKE, que esses
+  índices atendem, e ordena por similarity().
+
+O índice é criado junto com as tabelas (Base.metadata.create_all) ou pela migração.
+"""
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from models import Base
+from schemas import BuscaResultadoSchema
+
+TAMANHO_MINIMO_BUSCA = 3  # trigramas: termos menores não usam o índice
+
+# rowid na FTS = id * 4 + código do tipo, para as triggers acharem a linha sem varrer a tabela
+CODIGOS_TIPO = {"cliente": 1, "veiculo": 2, "contrato": 3}
+
+_TEXTO_SQLITE = {
+    "cliente": (
+        "NEW.id_cliente * 4 + 1, 'cliente', NEW.id_cliente, NEW.id_cliente, NEW.nome, "
+        "NEW.cpf || ' · ' || NEW.email, NEW.nome || ' ' || NEW.cpf || ' ' || NEW.email"
+    ),
+    "veiculo": (
+        "NEW.id_veiculo * 4 + 2, 'veiculo', NEW.id_veiculo, NULL, COALESCE(NEW.placa, NEW.num_chassi), "
+        "NEW.marca || ' ' || NEW.modelo || ' ' || NEW.ano_modelo || ' · ' || NEW.num_chassi, "
+        "COALESCE(NEW.placa, '') || ' ' || NEW.num_chassi"
+    ),
+    "contrato": (
+        "NEW.id_contrato * 4 + 3, 'contrato', NEW.id_contrato, NEW.id_cliente, NEW.num_contrato, "
+        "NEW.status, NEW.num_contrato"
+    ),
+}
+_ID_TABELA = {"cliente": "id_cliente", "veiculo": "id_veiculo", "contrato": "id_contrato"}
+
+_INDICES_POSTGRES = {
+    "ix_busca_cliente_nome": ("cliente", "nome"),
+    "ix_busca_cliente_cpf": ("cliente", "cpf"),
+    "ix_busca_cliente_email": ("cliente", "email"),
+    "ix_busca_veiculo_placa": ("veiculo", "placa"),
+    "ix_busca_veiculo_chassi": ("veiculo", "num_chassi"),
+    "ix_busca_contrato_num": ("contrato", "num_contrato"),
+}
+
+
+def _criar_fts_sqlite(conexao) -> None:
+    colunas = "tipo UNINDEXED, id_registro UNINDEXED, id_cliente UNINDEXED, titulo UNINDEXED, detalhe UNINDEXED, texto"
+    try:
+        conexao.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS busca_fts USING fts5({colunas}, tokenize='trigram remove_diacritics 1')"
+        )
+    except Exception:
+        # remove_diacritics só existe a partir do SQLite 3.45
+        conexao.exec_driver_sql(f"CREATE VIRTUAL TABLE IF NOT EXISTS busca_fts USING fts5({colunas}, tokenize='trigram')")
+
+    for tabela, valores in _TEXTO_SQLITE.items():
+        id_coluna = _ID_TABELA[tabela]
+        codigo = CODIGOS_TIPO[tabela]
+        inserir = f"INSERT INTO busca_fts(rowid, tipo, id_registro, id_cliente, titulo, detalhe, texto) VALUES ({valores});"
+        remover = f"DELETE FROM busca_fts WHERE rowid = OLD.{id_coluna} * 4 + {codigo};"
+        conexao.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS busca_{tabela}_ai AFTER INSERT ON {tabela} BEGIN {inserir} END")
+        conexao.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS busca_{tabela}_au AFTER UPDATE ON {tabela} BEGIN {remover} {inserir} END")
+        conexao.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS busca_{tabela}_ad AFTER DELETE ON {tabela} BEGIN {remover} END")
+
+
+def _criar_indices_postgres(conexao) -> None:
+    conexao.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for nome, (tabela, coluna) in _INDICES_POSTGRES.items():
+        conexao.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} USING gin ({coluna} gin_trgm_ops)")
+
+
+def criar_indice_busca(conexao) -> None:
+    """Cria o índice de busca do banco da conexão (idempotente)"""
+    if conexao.dialect.name == "sqlite":
+        _criar_fts_sqlite(conexao)
+    elif conexao.dialect.name == "postgresql":
+        _criar_indices_postgres(conexao)
+
+
+def remover_indice_busca(conexao) -> None:
+    """Remove o índice de busca (triggers e FTS no SQLite, índices trigram no PostgreSQL)"""
+    if conexao.dialect.name == "sqlite":
+        for tabela in _TEXTO_SQLITE:
+            for sufixo in ("ai", "au", "ad"):
+                conexao.exec_driver_sql(f"DROP TRIGGER IF EXISTS busca_{tabela}_{sufixo}")
+        conexao.exec_driver_sql("DROP TABLE IF EXISTS busca_fts")
+    elif conexao.dialect.name == "postgresql":
+        for nome in _INDICES_POSTGRES:
+            conexao.exec_driver_sql(f"DROP INDEX IF EXISTS {nome}")
+
+
+def popular_indice_busca(conexao) -> None:
+    """Reconstrói a FTS do SQLite a partir das tabelas (o PostgreSQL indexa as colunas direto)"""
+    if conexao.dialect.name != "sqlite":
+        return
+    conexao.exec_driver_sql("DELETE FROM busca_fts")
+    for tabela, valores in _TEXTO_SQLITE.items():
+        conexao.exec_driver_sql(
+            f"INSERT INTO busca_fts(rowid, tipo, id_registro, id_cliente, titulo, detalhe, texto) "
+            f"SELECT {valores.replace('NEW.', '')} FROM {tabela}"
+        )
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _criar_indice_apos_create_all(metadata, conexao, **kw):
+    criar_indice_busca(conexao)
+
+
+def variantes_termo(termo: str) -> list[str]:
+    """
+    CPF e placa ficam gravados sem pontuação, mas o número do contrato tem hífens
+    ("CT-20251027-0001"): busca o termo como digitado e, se for um documento com pontuação,
+    também compacto ("123.456.789-01" -> "12345678901", "abc-1234" -> "abc1234").
+    """
+    termo = termo.strip()
+    compacto = re.sub(r"[.\-/\s]", "", termo)
+    if compacto != termo and compacto.isalnum() and re.search(r"\d", compacto) and len(compacto) >= TAMANHO_MINIMO_BUSCA:
+        return [termo, compacto]
+    return [termo]
+
+
+_BUSCA_POSTGRES = """
+    SELECT * FROM (
+        SELECT 'cliente' AS tipo, id_cliente AS id_registro, id_cliente, nome AS titulo,
+               cpf || ' · ' || email AS detalhe,
+               GREATEST(similarity(nome, :termo), similarity(cpf, :compacto), similarity(email, :termo)) AS relevancia
+        FROM cliente WHERE nome ILIKE :padrao OR email ILIKE :padrao OR cpf ILIKE :padrao_compacto
+        UNION ALL
+        SELECT 'veiculo', id_veiculo, NULL, COALESCE(placa, num_chassi),
+               marca || ' ' || modelo || ' ' || ano_modelo || ' · ' || num_chassi,
+               GREATEST(similarity(COALESCE(placa, ''), :compacto), similarity(num_chassi, :compacto))
+        FROM veiculo WHERE placa ILIKE :padrao_compacto OR num_chassi ILIKE :padrao_compacto
+        UNION ALL
+        SELECT 'contrato', id_contrato, id_cliente, num_contrato, status, similarity(num_contrato, :termo)
+        FROM contrato WHERE num_contrato ILIKE :padrao
+    ) resultados
+    ORDER BY relevancia DESC
+    LIMIT :limite
+"""
+
+_BUSCA_SQLITE = """
+    SELECT tipo, id_registro, id_cliente, titulo, detalhe, -rank AS relevancia
+    FROM busca_fts WHERE busca_fts MATCH :consulta
+    ORDER BY rank
+    LIMIT :limite
+"""
+
+
+def buscar(session: Session, termo: str, limite: int = 20) -> list[BuscaResultadoSchema]:
+    variantes = variantes_termo(termo)
+    if len(variantes[0]) < TAMANHO_MINIMO_BUSCA:
+        raise HTTPException(status_code=400, detail=f"Informe ao menos {TAMANHO_MINIMO_BUSCA} caracteres")
+
+    dialeto = session.get_bind().dialect.name
+    if dialeto == "sqlite":
+        # Frases entre aspas: o trigram casa o trecho em qualquer posição
+        consulta = " OR ".join('"' + variante.replace('"', '""') + '"' for variante in variantes)
+        linhas = session.execute(text(_BUSCA_SQLITE), {"consulta": consulta, "limite": limite}).all()
+    elif dialeto == "postgresql":
+        def padrao(valor):
+            return "%" + re.sub(r"([\\%_])", r"\\\1", valor) + "%"
+        compacto = variantes[-1]
+        linhas = session.execute(text(_BUSCA_POSTGRES), {
+            "termo": variantes[0], "compacto": compacto,
+            "padrao": padrao(variantes[0]), "padrao_compacto": padrao(compacto), "limite": limite
+        }).all()
+    else:
+        raise HTTPException(status_code=501, detail="Busca não disponível para este banco de dados")
+
+    return [
+        BuscaResultadoSchema(
+            tipo=tipo, id=id_registro, id_cliente=id_cliente, titulo=titulo, detalhe=detalhe,
+            relevancia=round(float(relevancia), 4)
+        )
+        for tipo, id_registro, id_cliente, titulo, detalhe, relevancia in linhas
+    ]
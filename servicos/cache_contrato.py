@@ -0,0 +1,238 @@
+import os
+import threading
+from datetime import date
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from models import Contrato, Cliente, Veiculo, Financeiro, Parcela
+from servicos.contrato_completo import montar_contrato_completo
+from servicos.instrumentacao import medir
+
+CACHE_CONTRATO_CAPACIDADE = int(os.getenv("CACHE_CONTRATO_CAPACIDADE", "5000"))
+
+
+class BackendCache(ABC):
+    """
+    Interface de armazenamento do cache de contratos.
+    Um store compartilhado (ex.: Redis) deve implementar estes métodos para
+    que a invalidação de um worker seja vista pelos demais.
+    """
+
+    @abstractmethod
+    def obter(self, chave: int) -> bytes | None:
+        ...
+
+    @abstractmethod
+    def gravar(self, chave: int, valor: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def remover(self, chave: int) -> None:
+        ...
+
+    @abstractmethod
+    def limpar(self) -> None:
+        ...
+
+    @abstractmethod
+    def tamanho(self) -> int:
+        ...
+
+
+class BackendLRU(BackendCache):
+    """Backend padrão: LRU em memória do processo, protegido por lock"""
+
+    def __init__(self, capacidade: int = CACHE_CONTRATO_CAPACIDADE):
+        self.capacidade = capacidade
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            valor = self._dados.get(chave)
+            if valor is not None:
+                self._dados.move_to_end(chave)
+            return valor
+
+    def gravar(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = valor
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.capacidade:
+                self._dados.popitem(last=False)
+
+    def remover(self, chave):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+    def tamanho(self):
+        return len(self._dados)
+
+
+class CacheContrato:
+    """
+    Cache do ContratoCompletoSchema serializado, com chave id_contrato.
+
+    A cada invalidação a geração da chave é incrementada; uma leitura que
+    começou antes da invalidação não grava o valor (evita repopular o cache
+    com dados antigos quando leitura e escrita acontecem ao mesmo tempo).
+
+    O contrato traz os encargos de atraso calculados para o dia da consulta,
+    então o cache inteiro é descartado na virada do dia.
+    """
+
+    def __init__(self, backend: BackendCache | None = None):
+        self.backend = backend or BackendLRU()
+        self.hits = 0
+        self.misses = 0
+        self._geracoes = {}
+        self._dia = date.today()
+        self._lock = threading.Lock()
+
+    def _verificar_virada_do_dia(self) -> None:
+        hoje = date.today()
+        if hoje != self._dia:
+            with self._lock:
+                if hoje != self._dia:
+                    self._dia = hoje
+                    self.backend.limpar()
+
+    def geracao(self, id_contrato: int) -> tuple:
+        return self._dia, self._geracoes.get(id_contrato, 0)
+
+    def obter(self, id_contrato: int) -> bytes | None:
+        self._verificar_virada_do_dia()
+        valor = self.backend.obter(id_contrato)
+        if valor is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return valor
+
+    def gravar(self, id_contrato: int, valor: bytes, geracao: tuple) -> None:
+        if self.geracao(id_contrato) == geracao:
+            self.backend.gravar(id_contrato, valor)
+
+    def invalidar(self, ids_contrato) -> None:
+        with self._lock:
+            for id_contrato in ids_contrato:
+                self._geracoes[id_contrato] = self._geracoes.get(id_contrato, 0) + 1
+                self.backend.remover(id_contrato)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._geracoes.clear()
+            self.backend.limpar()
+            self.hits = 0
+            self.misses = 0
+
+    def estatisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "tamanho": self.backend.tamanho(),
+        }
+
+
+cache_contrato = CacheContrato()
+
+
+def ignorar_cache(request: Request) -> bool:
+    """O cliente pode pular o cache com 'Cache-Control: no-cache'"""
+    return "no-cache" in request.headers.get("cache-control", "").lower()
+
+
+def responder_contrato_cacheado(request: Request, session: Session, id_contrato: int) -> Response:
+    """
+    Devolve o JSON do contrato a partir do cache ou monta a partir do banco.
+    Mesmo quando o cache é ignorado, o valor novo é gravado para as próximas leituras.
+    """
+    if not ignorar_cache(request):
+        corpo = cache_contrato.obter(id_contrato)
+        if corpo is not None:
+            return Response(content=corpo, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    geracao = cache_contrato.geracao(id_contrato)
+    contrato = montar_contrato_completo(session, id_contrato)
+    with medir("serializacao"):
+        corpo = contrato.model_dump_json().encode()
+    cache_contrato.gravar(id_contrato, corpo, geracao)
+    return Response(content=corpo, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+# ========================
+# Invalidação por eventos da sessão
+# ========================
+
+def _contratos_afetados(session: Session) -> set:
+    """Descobre quais contratos foram afetados pelas mudanças do flush atual"""
+    ids = set()
+    ids_financeiro = set()
+    ids_veiculo = set()
+    ids_cliente = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Contrato):
+            ids.add(obj.id_contrato)
+        elif isinstance(obj, Financeiro):
+            ids.add(obj.id_contrato)
+        elif isinstance(obj, Parcela):
+            ids_financeiro.add(obj.id_financeiro)
+        elif isinstance(obj, Veiculo):
+            ids_veiculo.add(obj.id_veiculo)
+        elif isinstance(obj, Cliente):
+            ids_cliente.add(obj.id_cliente)
+
+    conexao = session.connection()
+    if ids_financeiro:
+        ids.update(conexao.execute(
+            select(Financeiro.id_contrato).where(Financeiro.id_financeiro.in_(ids_financeiro))
+        ).scalars())
+    if ids_veiculo:
+        ids.update(conexao.execute(
+            select(Contrato.id_contrato).where(Contrato.id_veiculo.in_(ids_veiculo))
+        ).scalars())
+    if ids_cliente:
+        ids.update(conexao.execute(
+            select(Contrato.id_contrato).where(Contrato.id_cliente.in_(ids_cliente))
+        ).scalars())
+
+    ids.discard(None)
+    return ids
+
+
+def marcar_contratos_alterados(session: Session, ids) -> None:
+    """
+    Agenda a invalidação dos contratos para o commit da sessão.
+    UPDATEs em massa (ex.: servicos.estado_contrato) não passam pelo flush e chamam esta função.
+    """
+    session.info.setdefault("contratos_alterados", set()).update(ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_contratos_alterados(session, flush_context):
+    ids = _contratos_afetados(session)
+    if ids:
+        marcar_contratos_alterados(session, ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(session):
+    ids = session.info.pop("contratos_alterados", None)
+    if ids:
+        cache_contrato.invalidar(ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_apos_rollback(session):
+    session.info.pop("contratos_alterados", None)
@@ -0,0 +1,110 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from servicos.instrumentacao import medicoes_atuais
+from servicos.metricas import Contador, registrar_metrica
+
+logger = logging.getLogger("aureus.consultas_lentas")
+
+consultas_lentas_total = Contador(
+    "aureus_db_consultas_lentas_total", "Statements acima do limite do log de consultas lentas", ("rota",)
+)
+registrar_metrica(consultas_lentas_total)
+
+# Máximo de EXPLAINs aguardando execução; acima disso o plano é descartado
+MAX_EXPLAINS_PENDENTES = 100
+
+# Marca a thread que está rodando um EXPLAIN, para o próprio EXPLAIN não ser registrado
+_thread_explain = threading.local()
+
+
+class LogConsultasLentas:
+    """
+    Registra no logger 'aureus.consultas_lentas' todo statement que passar de limite_ms,
+    com parâmetros, rota que originou a query e duração.
+
+    Com capturar_explain=True o plano (EXPLAIN, ou EXPLAIN QUERY PLAN no SQLite) é obtido
+    em uma thread separada, com outra conexão do pool, para não atrasar a requisição.
+    """
+
+    def __init__(self, engine, limite_ms: float, capturar_explain: bool = False):
+        self.engine = engine
+        self.limite = limite_ms / 1000
+        self.capturar_explain = capturar_explain
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain") if capturar_explain else None
+        self._pendentes = 0
+        self._lock = threading.Lock()
+
+    def registrar(self):
+        event.listen(self.engine, "before_cursor_execute", self._antes)
+        event.listen(self.engine, "after_cursor_execute", self._depois)
+        return self
+
+    def remover(self):
+        event.remove(self.engine, "before_cursor_execute", self._antes)
+        event.remove(self.engine, "after_cursor_execute", self._depois)
+        if self._executor:
+            self._executor.shutdown(wait=True)
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        # Guardado no contexto de execução (como em servicos/instrumentacao.py): não sobra nada
+        # na conexão quando o statement falha
+        if context is None or getattr(_thread_explain, "ativo", False):
+            return
+        context.aureus_inicio_consulta_lenta = time.perf_counter()
+
+    def _depois(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, "aureus_inicio_consulta_lenta", None)
+        if inicio is None or getattr(_thread_explain, "ativo", False):
+            return
+        duracao = time.perf_counter() - inicio
+        if duracao < self.limite:
+            return
+
+        medicoes = medicoes_atuais.get()
+        rota = medicoes.rota if medicoes is not None else None
+        consultas_lentas_total.inc(rota or "fora_de_requisicao")
+
+        registro = {
+            "duracao_ms": round(duracao * 1000, 2),
+            "rota": rota,
+            "statement": statement,
+            "parametros": repr(parameters)[:500],
+        }
+
+        if self.capturar_explain and not executemany and self._explicavel(statement) and self._reservar():
+            self._executor.submit(self._registrar_com_explain, registro, statement, parameters)
+        else:
+            logger.warning(json.dumps(registro, ensure_ascii=False))
+
+    @staticmethod
+    def _explicavel(statement: str) -> bool:
+        # Só SELECTs: EXPLAIN de escrita é seguro, mas o plano raramente ajuda aqui
+        return statement.lstrip().upper().startswith(("SELECT", "WITH"))
+
+    def _reservar(self) -> bool:
+        with self._lock:
+            if self._pendentes >= MAX_EXPLAINS_PENDENTES:
+                return False
+            self._pendentes += 1
+            return True
+
+    def _registrar_com_explain(self, registro, statement, parameters):
+        _thread_explain.ativo = True
+        try:
+            prefixo = "EXPLAIN QUERY PLAN" if self.engine.dialect.name == "sqlite" else "EXPLAIN"
+            with self.engine.connect() as conexao:
+                linhas = conexao.exec_driver_sql(f"{prefixo} {statement}", parameters).fetchall()
+            registro["explain"] = [" ".join(str(coluna) for coluna in linha) for linha in linhas]
+        except Exception as erro:
+            registro["explain_erro"] = str(erro)
+        finally:
+            _thread_explain.ativo = False
+            with self._lock:
+                self._pendentes -= 1
+        logger.warning(json.dumps(registro, ensure_ascii=False))
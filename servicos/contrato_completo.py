@@ -0,0 +1,109 @@
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from models import Contrato, Cliente, Veiculo, Financeiro, Parcela
+from schemas import (
+    ContratoCompletoSchema, VeiculoCompletoSchema, FinanceiroCompletoSchema,
+    ParcelaSchema, ClienteInfoSchema
+)
+from servicos.encargos import STATUS_EM_ABERTO, calcular_encargos
+
+
+def montar_contrato_completo(session: Session, id_contrato: int) -> ContratoCompletoSchema:
+    """
+    Monta o ContratoCompletoSchema de um contrato (cliente, veículo, financeiro e parcelas).
+    Usado pelas rotas de detalhe do cliente e do admin.
+    """
+    contrato = session.query(Contrato).filter(Contrato.id_contrato == id_contrato).first()
+    if not contrato:
+        raise HTTPException(status_code=404, detail="Contrato não encontrado")
+
+    cliente = session.query(Cliente).filter(Cliente.id_cliente == contrato.id_cliente).first()
+    if not cliente:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+
+    veiculo = session.query(Veiculo).filter(Veiculo.id_veiculo == contrato.id_veiculo).first()
+    if not veiculo:
+        raise HTTPException(status_code=404, detail="Veículo não encontrado para este contrato")
+
+    financeiro = session.query(Financeiro).filter(Financeiro.id_contrato == contrato.id_contrato).first()
+    if not financeiro:
+        raise HTTPException(status_code=404, detail="Dados financeiros não encontrados para este contrato")
+
+    parcelas = session.query(Parcela).filter(Parcela.id_financeiro == financeiro.id_financeiro).order_by(Parcela.numero_parcela).all()
+
+    # Encargos calculados na data da consulta, numa passada pelas parcelas em aberto
+    em_aberto = [p for p in parcelas if p.status in STATUS_EM_ABERTO]
+    encargos = dict(zip(
+        (p.id_parcela for p in em_aberto),
+        calcular_encargos([p.valor_parcela for p in em_aberto], [p.data_vencimento for p in em_aberto], date.today())
+    ))
+
+    parcelas_schema = []
+    valor_em_atraso_atualizado = 0.0
+    for p in parcelas:
+        dias, multa, juros = encargos.get(p.id_parcela, (0, 0.0, 0.0))
+        atualizado = round(float(p.valor_parcela) + multa + juros, 2) if dias else None
+        valor_em_atraso_atualizado += atualizado or 0.0
+        parcelas_schema.append(ParcelaSchema(
+            id_parcela=p.id_parcela,
+            numero_parcela=p.numero_parcela,
+            valor_parcela=float(p.valor_parcela),
+            data_vencimento=p.data_vencimento,
+            data_pagamento=p.data_pagamento,
+            valor_pago=float(p.valor_pago) if p.valor_pago else None,
+            status=p.status,
+            dias_atraso=dias or None,
+            valor_multa=multa if dias else None,
+            valor_juros=juros if dias else None,
+            valor_atualizado=atualizado
+        ))
+
+    financeiro_schema = FinanceiroCompletoSchema(
+        id_financeiro=financeiro.id_financeiro,
+        valor_total=float(financeiro.valor_total),
+        valor_entrada=float(financeiro.valor_entrada),
+        taxa_juros=float(financeiro.taxa_juros) if financeiro.taxa_juros else None,
+        qtde_parcelas=financeiro.qtde_parcelas,
+        data_primeiro_vencimento=financeiro.data_primeiro_vencimento,
+        status_pagamento=financeiro.status_pagamento,
+        data_criacao=financeiro.data_criacao,
+        valor_em_atraso_atualizado=round(valor_em_atraso_atualizado, 2),
+        parcelas=parcelas_schema
+    )
+
+    veiculo_schema = VeiculoCompletoSchema(
+        id_veiculo=veiculo.id_veiculo,
+        marca=veiculo.marca,
+        modelo=veiculo.modelo,
+        ano_fabricacao=veiculo.ano_fabricacao,
+        ano_modelo=veiculo.ano_modelo,
+        cor=veiculo.cor,
+        placa=veiculo.placa,
+        num_chassi=veiculo.num_chassi,
+        num_renavam=veiculo.num_renavam,
+        valor=float(veiculo.valor)
+    )
+
+    cliente_schema = ClienteInfoSchema(
+        id_cliente=cliente.id_cliente,
+        nome=cliente.nome,
+        cpf=cliente.cpf,
+        email=cliente.email,
+        telefone=cliente.telefone,
+        renda=float(cliente.renda) if cliente.renda else None
+    )
+
+    return ContratoCompletoSchema(
+        id_contrato=contrato.id_contrato,
+        numero_contrato=contrato.num_contrato,
+        status=contrato.status,
+        id_cliente=contrato.id_cliente,
+        data_emissao=contrato.data_emissao,
+        vigencia_fim=contrato.vigencia_fim,
+        motivo_status=contrato.motivo_status,
+        veiculo=veiculo_schema,
+        financeiro=financeiro_schema,
+        cliente=cliente_schema
+    )
@@ -0,0 +1,102 @@
+import os
+from datetime import date
+
+from sqlalchemy import Numeric, and_, case, cast, func, literal, select, update
+from sqlalchemy.orm import Session
+
+from models import Parcela
+
+# Encargos por atraso: multa fixa sobre a parcela e juros de mora pro rata die (mês de 30 dias)
+MULTA_ATRASO_PCT = float(os.getenv("MULTA_ATRASO_PCT", "2.0"))
+JUROS_MORA_MENSAL_PCT = float(os.getenv("JUROS_MORA_MENSAL_PCT", "1.0"))
+TAMANHO_LOTE_ENCARGOS = 50_000
+
+STATUS_EM_ABERTO = ("pendente", "atrasada")
+
+
+def calcular_encargos(
+    valores,
+    vencimentos,
+    hoje: date,
+    multa_pct: float = MULTA_ATRASO_PCT,
+    juros_mensal_pct: float = JUROS_MORA_MENSAL_PCT,
+) -> list[tuple[int, float, float]]:
+    """
+    (dias_atraso, multa, juros) de cada parcela, numa única passada pelas colunas de valores e
+    vencimentos (parcelas ainda não vencidas saem com zeros). É a mesma fórmula de
+    expressoes_encargos(), usada no lote e nos agregados do banco.
+    """
+    multa = multa_pct / 100
+    juros_dia = juros_mensal_pct / 100 / 30
+    ordinal_hoje = hoje.toordinal()
+    resultado = []
+    for valor, vencimento in zip(valores, vencimentos):
+        dias = ordinal_hoje - vencimento.toordinal()
+        if dias > 0:
+            valor = float(valor)
+            resultado.append((dias, round(valor * multa, 2), round(valor * juros_dia * dias, 2)))
+        else:
+            resultado.append((0, 0.0, 0.0))
+    return resultado
+
+
+def dias_atraso(hoje: date, dialeto: str):
+    """Expressão SQL com os dias entre o vencimento e 'hoje'"""
+    if dialeto == "sqlite":
+        return func.julianday(hoje.isoformat()) - func.julianday(Parcela.data_vencimento)
+    # PostgreSQL: date - date já é o número de dias
+    return literal(hoje) - Parcela.data_vencimento
+
+
+def expressoes_encargos(
+    hoje: date,
+    dialeto: str,
+    multa_pct: float = MULTA_ATRASO_PCT,
+    juros_mensal_pct: float = JUROS_MORA_MENSAL_PCT,
+):
+    """(multa, juros) como expressões SQL sobre a tabela parcela, para parcelas vencidas antes de 'hoje'"""
+    # cast para numeric: no PostgreSQL não existe round(double precision, int)
+    multa = func.round(cast(Parcela.valor_parcela * (multa_pct / 100), Numeric), 2)
+    juros = func.round(cast(Parcela.valor_parcela * (juros_mensal_pct / 100 / 30) * dias_atraso(hoje, dialeto), Numeric), 2)
+    return multa, juros
+
+
+def filtro_vencidas(hoje: date):
+    return and_(Parcela.status.in_(STATUS_EM_ABERTO), Parcela.data_vencimento < hoje)
+
+
+def valor_atualizado_sql(hoje: date, dialeto: str):
+    """valor_parcela + multa + juros para as vencidas, valor nominal para as demais (para SUM em relatórios)"""
+    multa, juros = expressoes_encargos(hoje, dialeto)
+    return case((Parcela.data_vencimento < hoje, Parcela.valor_parcela + multa + juros), else_=Parcela.valor_parcela)
+
+
+def acumular_encargos(session: Session, hoje: date | None = None, tamanho_lote: int = TAMANHO_LOTE_ENCARGOS, progresso=None) -> int:
+    """
+    Grava multa, juros e a data do cálculo nas parcelas em aberto vencidas (lote noturno).
+    Cada faixa de id_parcela é um único UPDATE com as expressões de expressoes_encargos(),
+    então o cálculo acontece dentro do banco, sem trazer as linhas para o Python.
+    Commita por faixa; 'progresso(processadas, total)' é chamado a cada faixa, se informado.
+    """
+    hoje = hoje or date.today()
+    dialeto = session.get_bind().dialect.name
+    menor, maior = session.execute(
+        select(func.min(Parcela.id_parcela), func.max(Parcela.id_parcela)).where(filtro_vencidas(hoje))
+    ).one()
+    if menor is None:
+        return 0
+
+    multa, juros = expressoes_encargos(hoje, dialeto)
+    atualizadas = 0
+    for inicio in range(menor, maior + 1, tamanho_lote):
+        resultado = session.execute(
+            update(Parcela)
+            .where(filtro_vencidas(hoje), Parcela.id_parcela >= inicio, Parcela.id_parcela < inicio + tamanho_lote)
+            .values(valor_multa=multa, valor_juros=juros, data_calculo_encargos=hoje)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        atualizadas += resultado.rowcount
+        if progresso:
+            progresso(min(inicio + tamanho_lote, maior + 1) - menor, maior + 1 - menor)
+    return atualizadas
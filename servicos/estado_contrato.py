@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models import Contrato
+from servicos.cache_contrato import marcar_contratos_alterados
+
+# Transições permitidas: status atual -> status de destino
+TRANSICOES = {
+    "pendente": {"ativo", "rejeitado", "cancelado"},
+    "ativo": {"quitado", "cancelado"},
+}
+
+
+def transicao_permitida(de: str, para: str) -> bool:
+    return para in TRANSICOES.get(de, set())
+
+
+def transicionar_contrato(session: Session, id_contrato: int, de: str, para: str, motivo: str | None = None) -> int:
+    """
+    Muda o status do contrato de 'de' para 'para' com um único
+    UPDATE ... WHERE status = :de (compare-and-set). Se duas requisições disputarem o mesmo
+    contrato, só uma altera a linha; a outra recebe 400 com o status atual.
+    O motivo é gravado no mesmo UPDATE e o id_cliente volta pelo RETURNING (para notificar o cliente).
+    O commit fica por conta de quem chama.
+    """
+    if not transicao_permitida(de, para):
+        raise ValueError(f"Transição não prevista: {de} -> {para}")
+
+    id_cliente = session.execute(
+        update(Contrato)
+        .where(Contrato.id_contrato == id_contrato, Contrato.status == de)
+        .values(status=para, motivo_status=motivo)
+        .returning(Contrato.id_cliente)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if id_cliente is not None:
+        marcar_contratos_alterados(session, {id_contrato})
+        return id_cliente
+
+    # Só no caminho de erro: descobre se o contrato não existe ou se o status é outro
+    status_atual = session.execute(
+        select(Contrato.status).where(Contrato.id_contrato == id_contrato)
+    ).scalar_one_or_none()
+    if status_atual is None:
+        raise HTTPException(status_code=404, detail="Contrato não encontrado")
+    raise HTTPException(
+        status_code=400,
+        detail=f"Transição de '{de}' para '{para}' não permitida. Status atual: {status_atual}"
+    )
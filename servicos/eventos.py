@@ -0,0 +1,192 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+CAPACIDADE_FILA = 256
+# Eventos recentes guardados para reenviar a quem reconecta (Last-Event-ID / long-poll com 'desde')
+CAPACIDADE_HISTORICO = 1000
+
+
+@dataclass(frozen=True)
+class Evento:
+    id: int
+    topico: str
+    tipo: str
+    dados: dict
+
+    def formatar_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.tipo}\ndata: {json.dumps(self.dados, default=str)}\n\n"
+
+
+class Inscricao:
+    """
+    Fila de eventos de um consumidor (ex.: uma conexão SSE), presa ao event loop em que foi criada.
+    Um consumidor lento perde os eventos mais antigos em vez de segurar quem publica.
+    """
+
+    def __init__(self, topicos, loop: asyncio.AbstractEventLoop, capacidade: int):
+        self.topicos = frozenset(topicos)
+        self.loop = loop
+        self.fila = asyncio.Queue(maxsize=capacidade)
+        self.descartados = 0
+        # Último id publicado no momento da inscrição: tudo depois dele chega pela fila
+        self.id_inicial = 0
+
+    def _entregar(self, evento: Evento) -> None:
+        if self.fila.full():
+            self.fila.get_nowait()
+            self.descartados += 1
+        self.fila.put_nowait(evento)
+
+    async def proximo(self, timeout: float) -> Evento | None:
+        """Próximo evento, ou None se nada chegou dentro do timeout"""
+        try:
+            return await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def pendentes(self) -> list[Evento]:
+        """Esvazia a fila sem esperar"""
+        eventos = []
+        while not self.fila.empty():
+            eventos.append(self.fila.get_nowait())
+        return eventos
+
+
+class BarramentoEventos:
+    """
+    Pub/sub em memória do processo. publicar() pode ser chamado de qualquer thread
+    (rotas, workers de jobs): a entrega é agendada no loop de cada inscrição.
+    Com vários workers, cada processo só vê os eventos publicados nele mesmo;
+    um backend compartilhado (ex.: Redis pub/sub) deve manter esta interface.
+
+    Os ids são sequenciais no processo. inscrever(desde=n) reenfileira os eventos do histórico
+    com id > n; a inscrição e a publicação usam o mesmo lock, então nenhum evento é perdido
+    ou entregue duas vezes entre o reenvio e os eventos novos.
+    """
+
+    def __init__(self, capacidade_historico: int = CAPACIDADE_HISTORICO):
+        self._inscricoes = set()
+        self._ids = itertools.count(1)
+        self._historico = deque(maxlen=capacidade_historico)
+        self._ultimo_id = 0
+        self._lock = threading.Lock()
+
+    def inscrever(
+        self,
+        topicos,
+        loop: asyncio.AbstractEventLoop | None = None,
+        capacidade: int = CAPACIDADE_FILA,
+        desde: int | None = None,
+    ) -> Inscricao:
+        inscricao = Inscricao(topicos, loop or asyncio.get_running_loop(), capacidade)
+        with self._lock:
+            self._inscricoes.add(inscricao)
+            inscricao.id_inicial = self._ultimo_id
+            if desde is not None:
+                for evento in self._historico:
+                    if evento.id > desde and evento.topico in inscricao.topicos:
+                        inscricao.loop.call_soon_threadsafe(inscricao._entregar, evento)
+        return inscricao
+
+    def cancelar(self, inscricao: Inscricao) -> None:
+        with self._lock:
+            self._inscricoes.discard(inscricao)
+
+    def publicar(self, topico: str, tipo: str, dados: dict) -> Evento:
+        with self._lock:
+            evento = Evento(next(self._ids), topico, tipo, dados)
+            self._historico.append(evento)
+            self._ultimo_id = evento.id
+            mortas = []
+            for inscricao in self._inscricoes:
+                if topico not in inscricao.topicos:
+                    continue
+                try:
+                    inscricao.loop.call_soon_threadsafe(inscricao._entregar, evento)
+                except RuntimeError:
+                    # Loop já encerrado: a conexão morreu sem cancelar a inscrição
+                    mortas.append(inscricao)
+            self._inscricoes.difference_update(mortas)
+        return evento
+
+    def ultimo_id(self) -> int:
+        return self._ultimo_id
+
+    def historico_cobre(self, desde: int) -> bool:
+        """
+        Indica se o histórico ainda tem tudo o que veio depois de 'desde'. Falso quando os eventos
+        já saíram do histórico ou o id é de outro processo (reinício, outro worker).
+        """
+        with self._lock:
+            if desde > self._ultimo_id:
+                return False
+            return not self._historico or desde >= self._historico[0].id - 1
+
+    def total_inscritos(self) -> int:
+        return len(self._inscricoes)
+
+
+barramento = BarramentoEventos()
+
+
+# ========================
+# Publicação após o commit
+# ========================
+
+def publicar_apos_commit(session: Session, topico: str, tipo: str, dados: dict) -> None:
+    """Agenda o evento para o commit da sessão; um rollback o descarta (como a invalidação do cache)"""
+    session.info.setdefault("eventos_pendentes", []).append((topico, tipo, dados))
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_apos_commit(session):
+    for topico, tipo, dados in session.info.pop("eventos_pendentes", ()):
+        barramento.publicar(topico, tipo, dados)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_eventos_apos_rollback(session):
+    session.info.pop("eventos_pendentes", None)
+
+
+# ========================
+# Server-Sent Events
+# ========================
+
+async def transmitir_sse(
+    request: Request,
+    inscricao: Inscricao,
+    eventos_iniciais=(),
+    heartbeat: float = 15.0,
+    duracao_maxima: float | None = None,
+):
+    """
+    Gerador do corpo text/event-stream. Uma conexão ociosa é só uma task esperando na fila
+    (sem thread nem conexão de banco); o comentário de heartbeat mantém proxies sem fechar a conexão.
+    Ao atingir duracao_maxima o stream termina e o EventSource do navegador reconecta sozinho.
+    """
+    fim = time.monotonic() + duracao_maxima if duracao_maxima else None
+    try:
+        yield "retry: 3000\n\n"
+        for evento in eventos_iniciais:
+            yield evento.formatar_sse()
+
+        while True:
+            espera = heartbeat if fim is None else min(heartbeat, fim - time.monotonic())
+            if espera <= 0:
+                break
+            evento = await inscricao.proximo(espera)
+            if await request.is_disconnected():
+                break
+            yield evento.formatar_sse() if evento else ": keep-alive\n\n"
+    finally:
+        barramento.cancelar(inscricao)
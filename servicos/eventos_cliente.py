@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from models import Cliente, Contrato
+from servicos.eventos import Evento, publicar_apos_commit
+
+
+def topico_cliente(id_cliente: int) -> str:
+    return f"cliente:{id_cliente}"
+
+
+def id_cliente_do_usuario(session: Session, id_usuario: int) -> int:
+    id_cliente = session.query(Cliente.id_cliente).filter(Cliente.id_usuario == id_usuario).scalar()
+    if id_cliente is None:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    return id_cliente
+
+
+def snapshot_contratos(session: Session, id_cliente: int, id_evento: int) -> Evento:
+    """
+    Evento 'contratos' com o status atual de todos os contratos do cliente. É enviado ao
+    conectar, então eventos perdidos enquanto o app estava desconectado não fazem falta.
+    O id é o último id publicado antes da consulta: quem continuar dali não perde nada.
+    """
+    linhas = session.query(
+        Contrato.id_contrato, Contrato.num_contrato, Contrato.status, Contrato.motivo_status
+    ).filter(Contrato.id_cliente == id_cliente).order_by(Contrato.id_contrato).all()
+    return Evento(id_evento, topico_cliente(id_cliente), "contratos", {
+        "contratos": [
+            {"id_contrato": id_contrato, "numero_contrato": numero, "status": status, "motivo": motivo}
+            for id_contrato, numero, status, motivo in linhas
+        ]
+    })
+
+
+def notificar_status_solicitacao(session: Session, id_cliente: int, id_contrato: int, status: str, motivo: str | None) -> None:
+    publicar_apos_commit(session, topico_cliente(id_cliente), "status_solicitacao", {
+        "id_contrato": id_contrato,
+        "status": status,
+        "motivo": motivo,
+        "data": datetime.now().isoformat(timespec="seconds"),
+    })
@@ -0,0 +1,193 @@
+import csv
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+FIPE_INDICE_PATH = os.getenv("FIPE_INDICE_PATH", "./fipe.db")
+# Diferença máxima aceita entre o valor informado e o valor de referência FIPE (0.05 = 5%)
+FIPE_TOLERANCIA = float(os.getenv("FIPE_TOLERANCIA", "0.05"))
+
+# Na tabela FIPE o ano 32000 representa veículo zero km
+ANO_ZERO_KM = 32000
+
+
+@dataclass(frozen=True)
+class ReferenciaFipe:
+    codigo_fipe: str
+    ano_modelo: int
+    combustivel: str | None
+    marca: str
+    modelo: str
+    valor: Decimal
+    mes_referencia: str | None
+
+
+def converter_valor_fipe(valor) -> Decimal:
+    """Converte 'R$ 45.678,90' (formato da FIPE) ou 45678.9 em Decimal"""
+    if isinstance(valor, (int, float, Decimal)):
+        return Decimal(str(valor))
+    texto = str(valor).replace("R$", "").strip()
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        return Decimal(texto)
+    except InvalidOperation:
+        raise ValueError(f"Valor FIPE inválido: {valor}")
+
+
+def normalizar_codigo_fipe(codigo: str) -> str:
+    """Aceita '001004-9' ou '0010049' e devolve sempre '001004-9'"""
+    digitos = "".join(c for c in str(codigo) if c.isdigit())
+    if len(digitos) != 7:
+        raise ValueError(f"Código FIPE inválido: {codigo}")
+    return f"{digitos[:6]}-{digitos[6]}"
+
+
+def _ler_registros(caminho_arquivo: str):
+    """
+    Lê o dump mensal da FIPE em CSV (separado por ';' ou ',') ou JSON (lista de objetos).
+    Colunas esperadas: CodigoFipe, Marca, Modelo, AnoModelo, Combustivel, Valor, MesReferencia
+    """
+    if caminho_arquivo.endswith(".json"):
+        with open(caminho_arquivo, encoding="utf-8") as arquivo:
+            yield from json.load(arquivo)
+        return
+
+    with open(caminho_arquivo, encoding="utf-8", newline="") as arquivo:
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=";,")
+        yield from csv.DictReader(arquivo, dialect=dialeto)
+
+
+def carregar_tabela_fipe(caminho_arquivo: str, caminho_indice: str = FIPE_INDICE_PATH) -> int:
+    """
+    Importa o dump da FIPE para um índice SQLite compacto (tabela WITHOUT ROWID
+    com chave primária (codigo_fipe, ano_modelo)). O índice é montado em um arquivo
+    temporário e trocado de forma atômica, então leitores nunca veem um índice pela metade.
+    Retorna a quantidade de registros importados.
+    """
+    temporario = caminho_indice + ".tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+
+    conexao = sqlite3.connect(temporario)
+    try:
+        conexao.execute("PRAGMA journal_mode = OFF")
+        conexao.execute("PRAGMA synchronous = OFF")
+        conexao.execute("""
+            CREATE TABLE fipe (
+                codigo_fipe TEXT NOT NULL,
+                ano_modelo INTEGER NOT NULL,
+                combustivel TEXT,
+                marca TEXT NOT NULL,
+                modelo TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                mes_referencia TEXT,
+                PRIMARY KEY (codigo_fipe, ano_modelo)
+            ) WITHOUT ROWID
+        """)
+
+        linhas = (
+            (
+                normalizar_codigo_fipe(r["CodigoFipe"]),
+                int(r["AnoModelo"]),
+                r.get("Combustivel") or None,
+                r["Marca"].strip(),
+                r["Modelo"].strip(),
+                str(converter_valor_fipe(r["Valor"])),
+                r.get("MesReferencia") or None,
+            )
+            for r in _ler_registros(caminho_arquivo)
+        )
+        conexao.executemany("INSERT OR REPLACE INTO fipe VALUES (?, ?, ?, ?, ?, ?, ?)", linhas)
+        conexao.commit()
+        total = conexao.execute("SELECT COUNT(*) FROM fipe").fetchone()[0]
+    finally:
+        conexao.close()
+
+    os.replace(temporario, caminho_indice)
+    return total
+
+
+class IndiceFipe:
+    """
+    Consulta somente leitura no índice FIPE local.
+    As consultas mais recentes ficam em um LRU em memória, então buscas repetidas
+    custam microssegundos e não abrem transação no SQLite.
+    """
+
+    def __init__(self, caminho_indice: str):
+        self.caminho_indice = caminho_indice
+        self._conexao = sqlite3.connect(
+            f"file:{caminho_indice}?mode=ro", uri=True, check_same_thread=False
+        )
+        self.buscar = lru_cache(maxsize=50_000)(self._buscar)
+
+    def _buscar(self, codigo_fipe: str, ano_modelo: int) -> ReferenciaFipe | None:
+        linha = self._conexao.execute(
+            "SELECT codigo_fipe, ano_modelo, combustivel, marca, modelo, valor, mes_referencia "
+            "FROM fipe WHERE codigo_fipe = ? AND ano_modelo = ?",
+            (normalizar_codigo_fipe(codigo_fipe), int(ano_modelo)),
+        ).fetchone()
+        if linha is None:
+            return None
+        return ReferenciaFipe(
+            codigo_fipe=linha[0],
+            ano_modelo=linha[1],
+            combustivel=linha[2],
+            marca=linha[3],
+            modelo=linha[4],
+            valor=Decimal(linha[5]),
+            mes_referencia=linha[6],
+        )
+
+    def fechar(self):
+        self._conexao.close()
+
+
+_indice = None
+
+
+def obter_indice_fipe() -> IndiceFipe | None:
+    """Abre o índice sob demanda. Retorna None se ainda não foi gerado."""
+    global _indice
+    if _indice is None and os.path.exists(FIPE_INDICE_PATH):
+        _indice = IndiceFipe(FIPE_INDICE_PATH)
+    return _indice
+
+
+def definir_indice_fipe(indice: IndiceFipe | None):
+    """Troca o índice em uso (após recarga do dump mensal ou nos testes)"""
+    global _indice
+    if _indice is not None and _indice is not indice:
+        _indice.fechar()
+    _indice = indice
+
+
+def ano_calendario(ano_modelo: int) -> int:
+    """Ano a gravar no veículo: o zero km (32000 na FIPE) vira o ano corrente"""
+    return date.today().year if ano_modelo == ANO_ZERO_KM else ano_modelo
+
+
+def valor_dentro_da_tolerancia(valor_informado: float, valor_referencia: Decimal) -> bool:
+    limite = float(valor_referencia) * (1 + FIPE_TOLERANCIA)
+    return float(valor_informado) <= limite
+
+
+def resolver_referencia(codigo_fipe: str | None, ano_modelo: int) -> ReferenciaFipe | None:
+    """
+    Busca a referência FIPE de um veículo. Retorna None quando o índice não existe,
+    o código é inválido ou o par (código, ano) não está no dump do mês.
+    """
+    indice = obter_indice_fipe()
+    if indice is None or not codigo_fipe:
+        return None
+    try:
+        return indice.buscar(codigo_fipe, ano_modelo)
+    except ValueError:
+        return None
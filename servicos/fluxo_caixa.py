@@ -0,0 +1,112 @@
+from dataclasses import dataclass, asdict
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models import Contrato, Financeiro, Parcela
+from schemas import FluxoCaixaMesSchema, FluxoCaixaSchema
+
+HORIZONTE_PADRAO = 72
+
+
+@dataclass
+class CenarioFluxoCaixa:
+    """Premissas mensais da projeção"""
+    taxa_inadimplencia: float = 0.005             # contratos em dia que deixam de pagar, por mês
+    taxa_inadimplencia_atrasados: float = 0.05    # idem, para contratos já inadimplentes
+    taxa_prepagamento: float = 0.01               # contratos que quitam o saldo antecipadamente, por mês
+    taxa_recuperacao: float = 0.3                 # fração das parcelas vencidas recebida no mês atual
+
+
+def agregar_vencimentos(session: Session) -> list:
+    """
+    Soma as parcelas em aberto dos contratos ativos por data de vencimento e situação do
+    contrato (em dia/inadimplente). O agrupamento é feito no banco, pela coluna crua (sem
+    funções de data por linha): voltam alguns milhares de linhas, qualquer que seja o
+    tamanho da carteira, e o Python só distribui as datas nos meses.
+    """
+    inadimplente = Financeiro.status_pagamento == "inadimplente"
+    return session.execute(
+        select(Parcela.data_vencimento, inadimplente, func.sum(Parcela.valor_parcela))
+        .select_from(Parcela)
+        .join(Financeiro, Financeiro.id_financeiro == Parcela.id_financeiro)
+        .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato)
+        .where(Contrato.status == "ativo", Parcela.status.in_(("pendente", "atrasada")))
+        .group_by(Parcela.data_vencimento, Financeiro.status_pagamento)
+    ).all()
+
+
+def _competencia(hoje: date, deslocamento: int) -> str:
+    mes = hoje.month - 1 + deslocamento
+    return f"{hoje.year + mes // 12}-{mes % 12 + 1:02d}"
+
+
+def projetar_fluxo_caixa(linhas, hoje: date, horizonte: int = HORIZONTE_PADRAO,
+                         cenario: CenarioFluxoCaixa | None = None) -> FluxoCaixaSchema:
+    """
+    Projeta a entrada esperada por mês a partir dos totais agregados.
+
+    Para cada grupo (em dia/inadimplente) a carteira "sobrevive" mês a mês:
+    no mês k recebe a parcela contratual se o contrato ainda estiver ativo e não entrar em
+    inadimplência, e recebe o saldo dos meses seguintes dos contratos que pré-pagam.
+    As parcelas já vencidas entram no mês atual com a taxa de recuperação. Como as taxas
+    são iguais para todos os contratos do grupo, a conta sobre os totais é a mesma que
+    contrato a contrato.
+    """
+    cenario = cenario or CenarioFluxoCaixa()
+    mes_atual = hoje.year * 12 + hoje.month
+
+    contratual = {False: [0.0] * horizonte, True: [0.0] * horizonte}
+    vencido = 0.0
+    for data_vencimento, inadimplente, valor in linhas:
+        valor = float(valor or 0)
+        if data_vencimento < hoje:
+            vencido += valor
+            continue
+        deslocamento = data_vencimento.year * 12 + data_vencimento.month - mes_atual
+        if 0 <= deslocamento < horizonte:
+            contratual[bool(inadimplente)][deslocamento] += valor
+
+    esperado = [0.0] * horizonte
+    perdas = [0.0] * horizonte
+    prepagamentos = [0.0] * horizonte
+    for inadimplente, fluxo in contratual.items():
+        taxa_default = cenario.taxa_inadimplencia_atrasados if inadimplente else cenario.taxa_inadimplencia
+        saldo_futuro = sum(fluxo)
+        sobrevivencia = 1.0
+        for k, valor in enumerate(fluxo):
+            saldo_futuro = max(0.0, saldo_futuro - valor)
+            esperado[k] += valor * sobrevivencia * (1 - taxa_default)
+            perdas[k] += valor * sobrevivencia * taxa_default
+            prepagamentos[k] += saldo_futuro * sobrevivencia * cenario.taxa_prepagamento
+            sobrevivencia *= max(0.0, 1 - taxa_default - cenario.taxa_prepagamento)
+
+    recuperado = vencido * cenario.taxa_recuperacao
+    meses = []
+    for k in range(horizonte):
+        valor_contratual = contratual[False][k] + contratual[True][k]
+        entrada = esperado[k] + prepagamentos[k] + (recuperado if k == 0 else 0.0)
+        meses.append(FluxoCaixaMesSchema(
+            competencia=_competencia(hoje, k),
+            valor_contratual=round(valor_contratual, 2),
+            valor_esperado=round(entrada, 2),
+            prepagamento=round(prepagamentos[k], 2),
+            inadimplencia=round(perdas[k], 2),
+        ))
+
+    return FluxoCaixaSchema(
+        data_referencia=hoje,
+        horizonte_meses=horizonte,
+        cenario=asdict(cenario),
+        valor_vencido=round(vencido, 2),
+        total_contratual=round(sum(m.valor_contratual for m in meses), 2),
+        total_esperado=round(sum(m.valor_esperado for m in meses), 2),
+        meses=meses,
+    )
+
+
+def calcular_fluxo_caixa(session: Session, horizonte: int = HORIZONTE_PADRAO,
+                         cenario: CenarioFluxoCaixa | None = None, hoje: date | None = None) -> FluxoCaixaSchema:
+    hoje = hoje or date.today()
+    return projetar_fluxo_caixa(agregar_vencimentos(session), hoje, horizonte, cenario)
@@ -0,0 +1,71 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class MedicoesRequisicao:
+    """Acumula os tempos (em segundos) de uma requisição por categoria"""
+
+    __slots__ = ("inicio", "scope", "db", "db_queries", "hash", "serializacao")
+
+    def __init__(self, scope: dict | None = None):
+        self.inicio = time.perf_counter()
+        self.scope = scope
+        self.db = 0.0
+        self.db_queries = 0
+        self.hash = 0.0
+        self.serializacao = 0.0
+
+    @property
+    def rota(self) -> str | None:
+        """Template da rota atendida (preenchido pelo roteador do FastAPI)"""
+        rota = self.scope.get("route") if self.scope else None
+        return rota.path if rota is not None else None
+
+
+medicoes_atuais: ContextVar[MedicoesRequisicao | None] = ContextVar("medicoes_atuais", default=None)
+
+
+@contextmanager
+def medir(categoria: str):
+    """
+    Soma o tempo do bloco na categoria ('hash' ou 'serializacao') da requisição atual.
+    Fora de uma requisição não faz nada além de executar o bloco.
+    """
+    medicoes = medicoes_atuais.get()
+    if medicoes is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(medicoes, categoria, getattr(medicoes, categoria) + time.perf_counter() - inicio)
+
+
+# ========================
+# Hooks do SQLAlchemy (valem para qualquer engine, inclusive a de testes)
+# ========================
+
+# O início de cada statement fica no contexto de execução, que morre com o statement:
+# um statement que falha (after_cursor_execute não dispara) não deixa resto na conexão do pool.
+# Statements internos sem contexto (context=None) não são medidos.
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_executar(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.aureus_inicio_query = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_de_executar(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "aureus_inicio_query", None)
+    if inicio is None:
+        return
+    medicoes = medicoes_atuais.get()
+    if medicoes is not None:
+        medicoes.db += time.perf_counter() - inicio
+        medicoes.db_queries += 1
@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models import Job
+from schemas import JobSchema
+
+logger = logging.getLogger("aureus.jobs")
+
+# Tarefas registradas: tipo -> função(contexto, **parametros) -> dict | None
+TAREFAS = {}
+
+# Job "executando" sem heartbeat há mais que isso é considerado órfão (worker morreu)
+LIMITE_HEARTBEAT = timedelta(minutes=5)
+# Enquanto a tarefa roda, o heartbeat é renovado nesse intervalo (bem abaixo do limite)
+INTERVALO_HEARTBEAT = timedelta(minutes=1)
+
+
+class JobCancelado(Exception):
+    """Levantada por ContextoJob.progresso quando o cancelamento foi pedido"""
+
+
+def tarefa(tipo: str):
+    """
+    Registra uma função como tarefa de job:
+
+        @tarefa("recalcular_atrasos")
+        def recalcular_atrasos(contexto, tamanho_lote=5000):
+            ...
+            contexto.progresso(50, "metade")
+            return {"parcelas_atualizadas": n}
+    """
+    def registrar(funcao):
+        TAREFAS[tipo] = funcao
+        return funcao
+    return registrar
+
+
+def enfileirar_job(session: Session, tipo: str, parametros: dict | None = None) -> Job:
+    """Cria o job como 'pendente' (o commit fica por conta de quem chama)"""
+    if tipo not in TAREFAS:
+        raise ValueError(f"Tipo de job desconhecido: {tipo}")
+    job = Job(tipo=tipo, criado_em=datetime.now(), parametros=json.dumps(parametros or {}))
+    session.add(job)
+    session.flush()
+    return job
+
+
+def cancelar_job(session: Session, id_job: int) -> str:
+    """
+    Cancela um job pendente na hora; se já estiver executando, pede o cancelamento,
+    que a tarefa atende na próxima chamada de contexto.progresso(). Retorna o novo status.
+    O commit fica por conta de quem chama.
+    """
+    agora = datetime.now()
+    resultado = session.execute(
+        update(Job).where(Job.id_job == id_job, Job.status == "pendente")
+        .values(status="cancelado", concluido_em=agora)
+    )
+    if resultado.rowcount == 1:
+        return "cancelado"
+
+    resultado = session.execute(
+        update(Job).where(Job.id_job == id_job, Job.status == "executando").values(cancelar=True)
+    )
+    if resultado.rowcount == 1:
+        return "executando"
+
+    status_atual = session.execute(select(Job.status).where(Job.id_job == id_job)).scalar_one_or_none()
+    if status_atual is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    raise HTTPException(status_code=400, detail=f"Job já foi finalizado. Status atual: {status_atual}")
+
+
+def montar_job_schema(job: Job) -> JobSchema:
+    return JobSchema(
+        id_job=job.id_job,
+        tipo=job.tipo,
+        status=job.status,
+        progresso=job.progresso,
+        mensagem=job.mensagem,
+        resultado=json.loads(job.resultado) if job.resultado else None,
+        erro=job.erro,
+        criado_em=job.criado_em,
+        iniciado_em=job.iniciado_em,
+        concluido_em=job.concluido_em
+    )
+
+
+class ContextoJob:
+    """Passado para a tarefa: identifica o job e reporta progresso"""
+
+    def __init__(self, session_factory, id_job: int, worker: str = "local"):
+        self.session_factory = session_factory
+        self.id_job = id_job
+        self.worker = worker
+
+    def progresso(self, percentual: float, mensagem: str | None = None) -> None:
+        """
+        Grava o progresso (0 a 100) em uma transação própria, para aparecer no polling
+        imediatamente, e levanta JobCancelado se o cancelamento foi pedido ou se o job
+        não é mais deste worker (foi devolvido para a fila como órfão).
+        """
+        valores = {"progresso": max(0, min(100, int(percentual))), "heartbeat": datetime.now()}
+        if mensagem is not None:
+            valores["mensagem"] = mensagem[:255]
+        with self.session_factory() as session:
+            resultado = session.execute(
+                update(Job).where(Job.id_job == self.id_job, Job.worker == self.worker).values(**valores)
+            )
+            cancelar = session.execute(select(Job.cancelar).where(Job.id_job == self.id_job)).scalar_one()
+            session.commit()
+        if resultado.rowcount == 0:
+            logger.warning("job %s não é mais do worker %s; interrompendo", self.id_job, self.worker)
+            raise JobCancelado()
+        if cancelar:
+            raise JobCancelado()
+
+
+def reservar_job(session: Session, worker: str) -> Job | None:
+    """
+    Reserva o job pendente mais antigo com compare-and-set (UPDATE ... WHERE status='pendente'):
+    se dois workers escolherem o mesmo job, só um consegue e o outro tenta o próximo.
+    """
+    while True:
+        id_job = session.execute(
+            select(Job.id_job).where(Job.status == "pendente").order_by(Job.id_job).limit(1)
+        ).scalar_one_or_none()
+        if id_job is None:
+            session.rollback()
+            return None
+
+        agora = datetime.now()
+        resultado = session.execute(
+            update(Job).where(Job.id_job == id_job, Job.status == "pendente")
+            .values(status="executando", worker=worker, iniciado_em=agora, heartbeat=agora)
+        )
+        session.commit()
+        if resultado.rowcount == 1:
+            return session.get(Job, id_job)
+
+
+def _finalizar(session_factory, id_job: int, worker: str, status: str, resultado: dict | None = None, erro: str | None = None):
+    valores = {"status": status, "concluido_em": datetime.now(), "erro": erro}
+    if status == "concluido":
+        valores["progresso"] = 100
+    if resultado is not None:
+        valores["resultado"] = json.dumps(resultado, default=str)
+    with session_factory() as session:
+        # Só quem ainda é dono do job finaliza: uma execução devolvida para a fila não sobrescreve a outra
+        atualizado = session.execute(
+            update(Job).where(Job.id_job == id_job, Job.worker == worker).values(**valores)
+        ).rowcount
+        session.commit()
+    if not atualizado:
+        logger.warning("job %s não é mais do worker %s; resultado '%s' descartado", id_job, worker, status)
+
+
+def _manter_heartbeat(session_factory, id_job: int, worker: str, parar: threading.Event, intervalo: float) -> None:
+    """Renova o heartbeat do job enquanto a tarefa roda, mesmo que ela nunca chame progresso()"""
+    while not parar.wait(intervalo):
+        try:
+            with session_factory() as session:
+                session.execute(
+                    update(Job).where(Job.id_job == id_job, Job.worker == worker, Job.status == "executando")
+                    .values(heartbeat=datetime.now())
+                )
+                session.commit()
+        except Exception:
+            logger.exception("erro ao renovar o heartbeat do job %s", id_job)
+
+
+def executar_proximo_job(
+    session_factory,
+    worker: str = "local",
+    intervalo_heartbeat: float = INTERVALO_HEARTBEAT.total_seconds(),
+) -> int | None:
+    """
+    Reserva e executa um job. Retorna o id executado ou None se a fila estava vazia.
+    Uma thread renova o heartbeat a cada intervalo_heartbeat segundos enquanto a tarefa roda,
+    para um job longo não ser tomado por órfão (recuperar_jobs_orfaos) e executado duas vezes.
+    """
+    with session_factory() as session:
+        job = reservar_job(session, worker)
+        if job is None:
+            return None
+        id_job, tipo, parametros = job.id_job, job.tipo, json.loads(job.parametros or "{}")
+
+    funcao = TAREFAS.get(tipo)
+    parar_heartbeat = threading.Event()
+    heartbeat = threading.Thread(
+        target=_manter_heartbeat, args=(session_factory, id_job, worker, parar_heartbeat, intervalo_heartbeat),
+        name=f"heartbeat-job-{id_job}", daemon=True
+    )
+    heartbeat.start()
+    try:
+        if funcao is None:
+            raise ValueError(f"Tipo de job desconhecido: {tipo}")
+        resultado = funcao(ContextoJob(session_factory, id_job, worker), **parametros)
+    except JobCancelado:
+        status, resultado, erro = "cancelado", None, None
+        logger.info("job %s (%s) cancelado", id_job, tipo)
+    except Exception as excecao:
+        status, resultado, erro = "falhou", None, str(excecao)
+        logger.exception("job %s (%s) falhou", id_job, tipo)
+    else:
+        status, erro = "concluido", None
+    finally:
+        parar_heartbeat.set()
+        heartbeat.join()
+    _finalizar(session_factory, id_job, worker, status, resultado=resultado, erro=erro)
+    return id_job
+
+
+def recuperar_jobs_orfaos(session_factory, limite: timedelta = LIMITE_HEARTBEAT) -> int:
+    """Devolve para a fila os jobs cujo worker parou de dar sinal (ex.: processo morto)"""
+    with session_factory() as session:
+        resultado = session.execute(
+            update(Job).where(Job.status == "executando", Job.heartbeat < datetime.now() - limite)
+            .values(status="pendente", worker=None)
+        )
+        session.commit()
+        return resultado.rowcount
+
+
+class WorkerJobs:
+    """
+    Pool de threads que consome a tabela de jobs. Roda no lifespan da API (JOBS_WORKERS)
+    ou em um processo separado (python -m scripts.worker_jobs). Vários processos podem
+    consumir a mesma tabela: a reserva é atômica.
+    """
+
+    def __init__(self, session_factory, quantidade: int = 1, intervalo: float = 1.0):
+        self.session_factory = session_factory
+        self.quantidade = quantidade
+        self.intervalo = intervalo
+        self.nome = f"{socket.gethostname()}:{os.getpid()}"
+        self._parar = threading.Event()
+        self._threads = []
+
+    def iniciar(self) -> "WorkerJobs":
+        for i in range(self.quantidade):
+            thread = threading.Thread(target=self._executar, args=(f"{self.nome}/{i}",), name=f"worker-jobs-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def parar(self, timeout: float = 10.0) -> None:
+        """Para de reservar jobs e espera os que estão em execução terminarem (até o timeout)"""
+        self._parar.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _recuperar_orfaos(self) -> None:
+        try:
+            recuperados = recuperar_jobs_orfaos(self.session_factory)
+        except Exception:
+            logger.exception("erro ao recuperar jobs órfãos")
+            return
+        if recuperados:
+            logger.warning("%s job(s) órfão(s) devolvido(s) para a fila", recuperados)
+
+    def _executar(self, worker: str) -> None:
+        # A thread /0 de cada processo recupera órfãos na subida e depois a cada LIMITE_HEARTBEAT,
+        # para os jobs de um processo que morreu voltarem à fila sem esperar um reinício.
+        # Feito na thread (e não no iniciar) para não atrasar o startup da API
+        recupera_orfaos = worker.endswith("/0")
+        proxima_recuperacao = time.monotonic()
+        while not self._parar.is_set():
+            if recupera_orfaos and time.monotonic() >= proxima_recuperacao:
+                self._recuperar_orfaos()
+                proxima_recuperacao = time.monotonic() + LIMITE_HEARTBEAT.total_seconds()
+            try:
+                executou = executar_proximo_job(self.session_factory, worker)
+            except Exception:
+                logger.exception("erro no worker de jobs")
+                executou = None
+            if executou is None:
+                self._parar.wait(self.intervalo)
@@ -0,0 +1,221 @@
+import threading
+from bisect import bisect_left
+
+# Buckets de latência (segundos), no padrão dos clientes Prometheus
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _PorThread:
+    """
+    Guarda um dicionário por thread. A gravação nunca pega lock (cada thread só
+    escreve no próprio dicionário); a leitura no /metrics soma os dicionários de todas as threads.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._todos = []
+        self._lock = threading.Lock()
+
+    def local(self) -> dict:
+        dados = getattr(self._local, "dados", None)
+        if dados is None:
+            dados = {}
+            self._local.dados = dados
+            with self._lock:  # só na primeira gravação de cada thread
+                self._todos.append(dados)
+        return dados
+
+    def copias(self) -> list:
+        with self._lock:
+            todos = list(self._todos)
+        return [dados.copy() for dados in todos]
+
+    def limpar(self):
+        with self._lock:
+            for dados in self._todos:
+                dados.clear()
+
+
+class Contador:
+    def __init__(self, nome: str, ajuda: str, labels: tuple = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.labels = labels
+        self._valores = _PorThread()
+
+    def inc(self, *valores_labels, valor: float = 1):
+        dados = self._valores.local()
+        dados[valores_labels] = dados.get(valores_labels, 0) + valor
+
+    def valores(self) -> dict:
+        total = {}
+        for dados in self._valores.copias():
+            for chave, valor in dados.items():
+                total[chave] = total.get(chave, 0) + valor
+        return total
+
+    def exportar(self, tipo: str = "counter") -> list:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {tipo}"]
+        for chave, valor in sorted(self.valores().items()):
+            linhas.append(f"{self.nome}{_formatar_labels(self.labels, chave)} {_formatar_numero(valor)}")
+        return linhas
+
+    def limpar(self):
+        self._valores.limpar()
+
+
+class GaugeAcumulado(Contador):
+    """Gauge incrementado e decrementado (ex.: requisições em andamento)"""
+
+    def dec(self, *valores_labels, valor: float = 1):
+        self.inc(*valores_labels, valor=-valor)
+
+    def exportar(self, tipo: str = "gauge") -> list:
+        return super().exportar(tipo)
+
+
+class GaugeFuncao:
+    """Gauge calculado no momento da coleta (ex.: conexões do pool em uso)"""
+
+    def __init__(self, nome: str, ajuda: str, funcao):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.funcao = funcao
+
+    def exportar(self) -> list:
+        valor = self.funcao()
+        if valor is None:
+            return []
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} gauge", f"{self.nome} {_formatar_numero(valor)}"]
+
+
+class Histograma:
+    def __init__(self, nome: str, ajuda: str, labels: tuple = (), buckets: tuple = BUCKETS_LATENCIA):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.labels = labels
+        self.buckets = buckets
+        self._valores = _PorThread()
+
+    def observar(self, valor: float, *valores_labels):
+        dados = self._valores.local()
+        serie = dados.get(valores_labels)
+        if serie is None:
+            # contagens por bucket (+Inf no final), soma e total
+            serie = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            dados[valores_labels] = serie
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+        serie[2] += 1
+
+    def exportar(self) -> list:
+        agregado = {}
+        for dados in self._valores.copias():
+            for chave, (contagens, soma, total) in dados.items():
+                atual = agregado.setdefault(chave, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                for i, contagem in enumerate(contagens):
+                    atual[0][i] += contagem
+                atual[1] += soma
+                atual[2] += total
+
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        for chave, (contagens, soma, total) in sorted(agregado.items()):
+            acumulado = 0
+            limites = [_formatar_numero(b) for b in self.buckets] + ["+Inf"]
+            for limite, contagem in zip(limites, contagens):
+                acumulado += contagem
+                labels = _formatar_labels(self.labels + ("le",), chave + (limite,))
+                linhas.append(f"{self.nome}_bucket{labels} {acumulado}")
+            labels = _formatar_labels(self.labels, chave)
+            linhas.append(f"{self.nome}_sum{labels} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{labels} {total}")
+        return linhas
+
+    def limpar(self):
+        self._valores.limpar()
+
+
+def _formatar_labels(nomes: tuple, valores: tuple) -> str:
+    if not nomes:
+        return ""
+    pares = []
+    for nome, valor in zip(nomes, valores):
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pares.append(f'{nome}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+def _formatar_numero(valor) -> str:
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+# ========================
+# Métricas da aplicação
+# ========================
+
+requisicoes_total = Contador(
+    "aureus_http_requisicoes_total", "Total de requisições HTTP por rota, método e status",
+    ("metodo", "rota", "status")
+)
+latencia_requisicao = Histograma(
+    "aureus_http_latencia_segundos", "Latência das requisições HTTP por rota e método", ("metodo", "rota")
+)
+requisicoes_em_andamento = GaugeAcumulado(
+    "aureus_http_requisicoes_em_andamento", "Requisições HTTP sendo processadas"
+)
+rate_limit_rejeicoes = Contador(
+    "aureus_rate_limit_rejeicoes_total", "Requisições rejeitadas pelo rate limiter", ("rota",)
+)
+logins_total = Contador("aureus_logins_total", "Tentativas de login por resultado", ("resultado",))
+bcrypt_fila = GaugeAcumulado(
+    "aureus_bcrypt_fila", "Operações de bcrypt aguardando ou em execução"
+)
+admissao_em_execucao = GaugeAcumulado(
+    "aureus_admissao_em_execucao", "Requisições admitidas em execução por classe de rota", ("classe",)
+)
+admissao_fila = GaugeAcumulado(
+    "aureus_admissao_fila", "Requisições aguardando vaga na fila de admissão por classe de rota", ("classe",)
+)
+admissao_rejeicoes = Contador(
+    "aureus_admissao_rejeicoes_total", "Requisições descartadas (503) pelo controle de admissão", ("classe",)
+)
+admissao_espera = Histograma(
+    "aureus_admissao_espera_segundos", "Tempo de espera na fila de admissão por classe de rota", ("classe",)
+)
+
+_metricas = [
+    requisicoes_total, latencia_requisicao, requisicoes_em_andamento, rate_limit_rejeicoes, logins_total, bcrypt_fila,
+    admissao_em_execucao, admissao_fila, admissao_rejeicoes, admissao_espera,
+]
+
+
+def registrar_metrica(metrica):
+    """Registra (ou substitui, se já existir uma com o mesmo nome) uma métrica no /metrics"""
+    _metricas[:] = [m for m in _metricas if m.nome != metrica.nome]
+    _metricas.append(metrica)
+
+
+def registrar_gauges_pool(engine):
+    """Gauges do pool do SQLAlchemy (apenas para pools com tamanho, como o QueuePool)"""
+    pool = engine.pool
+
+    def medir(metodo):
+        return lambda: getattr(pool, metodo)() if hasattr(pool, metodo) else None
+
+    def medir_overflow():
+        # QueuePool.overflow() é (conexões abertas - pool_size): negativo enquanto o pool não enche
+        return max(0, pool.overflow()) if hasattr(pool, "overflow") else None
+
+    registrar_metrica(GaugeFuncao("aureus_db_pool_tamanho", "Tamanho configurado do pool", medir("size")))
+    registrar_metrica(GaugeFuncao("aureus_db_pool_em_uso", "Conexões do pool em uso", medir("checkedout")))
+    registrar_metrica(GaugeFuncao("aureus_db_pool_overflow", "Conexões de overflow abertas", medir_overflow))
+
+
+def exportar_metricas() -> str:
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+    linhas = []
+    for metrica in _metricas:
+        linhas.extend(metrica.exportar())
+    return "\n".join(linhas) + "\n"
@@ -0,0 +1,116 @@
+import hashlib
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from models import Cliente, Contrato, Endereco, Financeiro, Parcela, Veiculo
+from schemas import (
+    ClienteInfoSchema, ContratoResumoSchema, EnderecoSchema, MinhaContaSchema, ParcelaSchema
+)
+from servicos.instrumentacao import medir
+
+STATUS_EM_ABERTO = ("pendente", "atrasada")
+
+
+def montar_minha_conta(session: Session, id_usuario: int) -> MinhaContaSchema:
+    """
+    Monta a visão "minha conta" do cliente logado em duas queries, qualquer que seja
+    o número de contratos: perfil + endereço e contratos com veículo, financeiro,
+    saldo em aberto e próxima parcela (agregados num subselect por financeiro).
+    """
+    linha = session.query(Cliente, Endereco).join(
+        Endereco, Endereco.id_endereco == Cliente.id_endereco
+    ).filter(Cliente.id_usuario == id_usuario).first()
+    if not linha:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    cliente, endereco = linha
+
+    em_aberto = Parcela.status.in_(STATUS_EM_ABERTO)
+    resumo_parcelas = session.query(
+        Parcela.id_financeiro.label("id_financeiro"),
+        func.min(case((em_aberto, Parcela.numero_parcela))).label("proxima"),
+        func.coalesce(func.sum(case((em_aberto, Parcela.valor_parcela), else_=0)), 0).label("saldo"),
+        func.count(case((Parcela.status == "paga", 1))).label("pagas"),
+    ).join(
+        Financeiro, Financeiro.id_financeiro == Parcela.id_financeiro
+    ).join(
+        Contrato, Contrato.id_contrato == Financeiro.id_contrato
+    ).filter(Contrato.id_cliente == cliente.id_cliente).group_by(Parcela.id_financeiro).subquery()
+
+    # A próxima parcela é buscada pela chave única (id_financeiro, numero_parcela)
+    linhas = session.query(
+        Contrato, Veiculo, Financeiro, resumo_parcelas.c.saldo, resumo_parcelas.c.pagas, Parcela
+    ).join(
+        Veiculo, Veiculo.id_veiculo == Contrato.id_veiculo
+    ).join(
+        Financeiro, Financeiro.id_contrato == Contrato.id_contrato
+    ).outerjoin(
+        resumo_parcelas, resumo_parcelas.c.id_financeiro == Financeiro.id_financeiro
+    ).outerjoin(
+        Parcela, and_(
+            Parcela.id_financeiro == Financeiro.id_financeiro,
+            Parcela.numero_parcela == resumo_parcelas.c.proxima,
+        )
+    ).filter(Contrato.id_cliente == cliente.id_cliente).order_by(Contrato.id_contrato).all()
+
+    contratos = []
+    saldo_total = 0.0
+    for contrato, veiculo, financeiro, saldo, pagas, proxima in linhas:
+        saldo = float(saldo or 0)
+        saldo_total += saldo
+        contratos.append(ContratoResumoSchema(
+            id_contrato=contrato.id_contrato,
+            numero_contrato=contrato.num_contrato,
+            status=contrato.status,
+            data_emissao=contrato.data_emissao,
+            veiculo=f"{veiculo.marca} {veiculo.modelo}",
+            placa=veiculo.placa,
+            valor_total=float(financeiro.valor_total),
+            qtde_parcelas=financeiro.qtde_parcelas,
+            parcelas_pagas=pagas or 0,
+            status_pagamento=financeiro.status_pagamento,
+            saldo_devedor=round(saldo, 2),
+            proxima_parcela=ParcelaSchema(
+                id_parcela=proxima.id_parcela,
+                numero_parcela=proxima.numero_parcela,
+                valor_parcela=float(proxima.valor_parcela),
+                data_vencimento=proxima.data_vencimento,
+                data_pagamento=proxima.data_pagamento,
+                valor_pago=float(proxima.valor_pago) if proxima.valor_pago else None,
+                status=proxima.status
+            ) if proxima else None
+        ))
+
+    return MinhaContaSchema(
+        cliente=ClienteInfoSchema(
+            id_cliente=cliente.id_cliente,
+            nome=cliente.nome,
+            cpf=cliente.cpf,
+            email=cliente.email,
+            telefone=cliente.telefone,
+            renda=float(cliente.renda) if cliente.renda else None
+        ),
+        endereco=EnderecoSchema.model_validate(endereco),
+        contratos=contratos,
+        total_contratos=len(contratos),
+        saldo_devedor_total=round(saldo_total, 2)
+    )
+
+
+def responder_minha_conta(request: Request, session: Session, id_usuario: int) -> Response:
+    """
+    Responde com ETag (hash do corpo): se o app enviar o mesmo valor em If-None-Match,
+    devolve 304 sem corpo. Os dados são lidos de qualquer forma (o saldo e a próxima
+    parcela mudam sem passar pelo cliente), o ganho está no tráfego e no parse do app.
+    """
+    conta = montar_minha_conta(session, id_usuario)
+    with medir("serializacao"):
+        corpo = conta.model_dump_json().encode()
+    etag = f'"{hashlib.sha256(corpo).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    enviados = [valor.strip() for valor in request.headers.get("if-none-match", "").split(",")]
+    if etag in enviados or f"W/{etag}" in enviados or "*" in enviados:
+        return Response(status_code=304, headers=headers)
+    return Response(content=corpo, media_type="application/json", headers=headers)
@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from models import Cliente, Contrato, Financeiro, Outbox, Parcela
+
+logger = logging.getLogger("aureus.outbox")
+
+TAMANHO_LOTE_OUTBOX = 100
+MAX_TENTATIVAS_OUTBOX = int(os.getenv("OUTBOX_MAX_TENTATIVAS", "6"))
+# Espera antes da n-ésima nova tentativa: base * 2^(n-1), limitada a uma hora
+BACKOFF_BASE_OUTBOX = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+BACKOFF_MAXIMO_OUTBOX = 3600.0
+# Mensagem "enviando" há mais que isso voltou para a fila (despachante morreu no meio do lote)
+LIMITE_RESERVA_OUTBOX = timedelta(minutes=5)
+LEMBRETE_DIAS_ANTECEDENCIA = int(os.getenv("LEMBRETE_DIAS_ANTECEDENCIA", "3"))
+
+
+# ========================
+# Registro (na transação de quem chama)
+# ========================
+
+def registrar_mensagem(
+    session: Session,
+    tipo: str,
+    destinatario: str,
+    dados: dict,
+    chave: str | None = None,
+    canal: str = "email",
+) -> None:
+    """
+    Adiciona a mensagem à outbox na transação da sessão: ela só existe se a alteração
+    que a originou for commitada, e o envio (lento, sujeito a falhas) fica fora da requisição.
+    """
+    agora = datetime.now()
+    session.add(Outbox(
+        tipo=tipo, canal=canal, destinatario=destinatario, payload=json.dumps(dados, default=str),
+        chave=chave, status="pendente", tentativas=0, proxima_tentativa=agora, criado_em=agora
+    ))
+
+
+def registrar_status_solicitacao(session: Session, id_cliente: int, id_contrato: int, status: str, motivo: str | None) -> None:
+    """Aviso ao cliente da aprovação ou rejeição da solicitação"""
+    nome, email, numero = session.query(Cliente.nome, Cliente.email, Contrato.num_contrato).join(
+        Contrato, Contrato.id_cliente == Cliente.id_cliente
+    ).filter(Contrato.id_contrato == id_contrato).one()
+    registrar_mensagem(session, "status_solicitacao", email, {
+        "nome": nome,
+        "id_contrato": id_contrato,
+        "numero_contrato": numero,
+        "status": status,
+        "motivo": motivo,
+    }, chave=f"status_solicitacao:{id_contrato}:{status}")
+
+
+def enfileirar_lembretes_vencimento(
+    session: Session,
+    dias: int = LEMBRETE_DIAS_ANTECEDENCIA,
+    hoje: date | None = None,
+    tamanho_lote: int = 1000,
+) -> int:
+    """
+    Registra um lembrete para cada parcela pendente de contrato ativo que vence nos próximos
+    'dias' dias. A busca usa o índice (status, data_vencimento) da parcela; a chave
+    lembrete_vencimento:<parcela>:<vencimento> evita lembrete repetido se a rotina rodar
+    de novo no mesmo dia (e gera um novo se o vencimento mudar numa renegociação).
+    Os lembretes entram com um INSERT em lote por bloco; o commit fica por conta de quem chama.
+    """
+    hoje = hoje or date.today()
+    linhas = session.execute(
+        select(
+            Parcela.id_parcela, Parcela.numero_parcela, Parcela.valor_parcela, Parcela.data_vencimento,
+            Contrato.id_contrato, Contrato.num_contrato, Cliente.nome, Cliente.email
+        )
+        .join(Financeiro, Financeiro.id_financeiro == Parcela.id_financeiro)
+        .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato)
+        .join(Cliente, Cliente.id_cliente == Contrato.id_cliente)
+        .where(
+            Parcela.status == "pendente",
+            Parcela.data_vencimento > hoje,
+            Parcela.data_vencimento <= hoje + timedelta(days=dias),
+            Contrato.status == "ativo",
+        )
+        .order_by(Parcela.id_parcela)
+    ).all()
+
+    agora = datetime.now()
+    registrados = 0
+    for inicio in range(0, len(linhas), tamanho_lote):
+        lote = {f"lembrete_vencimento:{linha.id_parcela}:{linha.data_vencimento.isoformat()}": linha
+                for linha in linhas[inicio:inicio + tamanho_lote]}
+        existentes = set(session.execute(select(Outbox.chave).where(Outbox.chave.in_(lote))).scalars())
+        novos = [
+            {
+                "tipo": "lembrete_vencimento",
+                "canal": "email",
+                "destinatario": linha.email,
+                "payload": json.dumps({
+                    "nome": linha.nome,
+                    "id_contrato": linha.id_contrato,
+                    "numero_contrato": linha.num_contrato,
+                    "numero_parcela": linha.numero_parcela,
+                    "valor_parcela": float(linha.valor_parcela),
+                    "data_vencimento": linha.data_vencimento.isoformat(),
+                }),
+                "chave": chave,
+                "status": "pendente",
+                "tentativas": 0,
+                "proxima_tentativa": agora,
+                "criado_em": agora,
+            }
+            for chave, linha in lote.items() if chave not in existentes
+        ]
+        if novos:
+            session.execute(insert(Outbox), novos)
+            registrados += len(novos)
+    return registrados
+
+
+# ========================
+# Envio
+# ========================
+
+class Remetente(ABC):
+    """
+    Interface de envio da outbox. Um provedor de e-mail/SMS implementa enviar();
+    se tiver API de envio em lote, sobrescreve enviar_lote().
+    """
+
+    @abstractmethod
+    def enviar(self, mensagem: dict) -> None:
+        """Envia uma mensagem ({id_outbox, tipo, canal, destinatario, dados}); levanta exceção se falhar"""
+
+    def enviar_lote(self, mensagens: list[dict]) -> dict[int, str]:
+        """Envia o lote e retorna o erro de cada mensagem que falhou (id_outbox -> erro)"""
+        erros = {}
+        for mensagem in mensagens:
+            try:
+                self.enviar(mensagem)
+            except Exception as erro:
+                erros[mensagem["id_outbox"]] = str(erro) or erro.__class__.__name__
+        return erros
+
+
+class RemetenteArquivo(Remetente):
+    """Grava cada mensagem como uma linha JSON num arquivo ou, com destino "-", na saída padrão"""
+
+    def __init__(self, destino: str = "-"):
+        self.destino = destino
+        self._lock = threading.Lock()
+
+    def enviar(self, mensagem: dict) -> None:
+        self.enviar_lote([mensagem])
+
+    def enviar_lote(self, mensagens: list[dict]) -> dict[int, str]:
+        linhas = "".join(json.dumps(mensagem, default=str, ensure_ascii=False) + "\n" for mensagem in mensagens)
+        with self._lock:
+            if self.destino == "-":
+                sys.stdout.write(linhas)
+                sys.stdout.flush()
+            else:
+                with open(self.destino, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(linhas)
+        return {}
+
+
+def criar_remetente() -> Remetente:
+    """Remetente configurado por OUTBOX_DESTINO (arquivo JSONL; padrão: saída padrão)"""
+    return RemetenteArquivo(os.getenv("OUTBOX_DESTINO", "-"))
+
+
+def calcular_backoff(tentativas: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_OUTBOX * 2 ** (tentativas - 1), BACKOFF_MAXIMO_OUTBOX))
+
+
+def reservar_lote(session: Session, tamanho_lote: int = TAMANHO_LOTE_OUTBOX, agora: datetime | None = None) -> list[dict]:
+    """
+    Reserva até tamanho_lote mensagens prontas para envio com compare-and-set em lote
+    (UPDATE ... WHERE status='pendente' RETURNING): vários despachantes podem drenar a
+    mesma outbox, e cada mensagem vai para um só. No PostgreSQL a subconsulta pula as linhas
+    que outro despachante está reservando (FOR UPDATE SKIP LOCKED): sem isso o segundo esperaria
+    o primeiro e, relida a condição, voltaria com um lote vazio, encerrando drenar_outbox antes da hora.
+    """
+    agora = agora or datetime.now()
+    ids = select(Outbox.id_outbox).where(
+        Outbox.status == "pendente", Outbox.proxima_tentativa <= agora
+    ).order_by(Outbox.proxima_tentativa, Outbox.id_outbox).limit(tamanho_lote).with_for_update(skip_locked=True)
+    linhas = session.execute(
+        update(Outbox)
+        .where(Outbox.id_outbox.in_(ids.scalar_subquery()), Outbox.status == "pendente")
+        .values(status="enviando", reservado_em=agora)
+        .returning(Outbox.id_outbox, Outbox.tipo, Outbox.canal, Outbox.destinatario, Outbox.payload, Outbox.tentativas)
+        .execution_options(synchronize_session=False)
+    ).all()
+    session.commit()
+    return [
+        {
+            "id_outbox": linha.id_outbox,
+            "tipo": linha.tipo,
+            "canal": linha.canal,
+            "destinatario": linha.destinatario,
+            "dados": json.loads(linha.payload),
+            "tentativas": linha.tentativas,
+        }
+        for linha in sorted(linhas, key=lambda linha: linha.id_outbox)
+    ]
+
+
+def despachar_lote(session_factory, remetente: Remetente, tamanho_lote: int = TAMANHO_LOTE_OUTBOX) -> dict:
+    """
+    Reserva um lote, envia (sem transação aberta) e grava o resultado com dois UPDATEs:
+    enviadas num só; as que falharam voltam para 'pendente' com backoff exponencial,
+    ou ficam 'falhou' depois de MAX_TENTATIVAS_OUTBOX tentativas.
+    """
+    with session_factory() as session:
+        mensagens = reservar_lote(session, tamanho_lote)
+    if not mensagens:
+        return {"enviadas": 0, "falhas": 0, "descartadas": 0}
+
+    envio = [{chave: valor for chave, valor in mensagem.items() if chave != "tentativas"} for mensagem in mensagens]
+    try:
+        erros = remetente.enviar_lote(envio)
+    except Exception as erro:
+        logger.exception("falha no envio do lote da outbox")
+        erros = {mensagem["id_outbox"]: str(erro) or erro.__class__.__name__ for mensagem in mensagens}
+
+    agora = datetime.now()
+    enviadas = [mensagem["id_outbox"] for mensagem in mensagens if mensagem["id_outbox"] not in erros]
+    falhas = []
+    for mensagem in mensagens:
+        if mensagem["id_outbox"] not in erros:
+            continue
+        tentativas = mensagem["tentativas"] + 1
+        falhas.append({
+            "id_outbox": mensagem["id_outbox"],
+            "status": "falhou" if tentativas >= MAX_TENTATIVAS_OUTBOX else "pendente",
+            "tentativas": tentativas,
+            "proxima_tentativa": agora + calcular_backoff(tentativas),
+            "erro": erros[mensagem["id_outbox"]][:1000],
+        })
+
+    with session_factory() as session:
+        if enviadas:
+            session.execute(
+                update(Outbox).where(Outbox.id_outbox.in_(enviadas))
+                .values(status="enviado", enviado_em=agora, tentativas=Outbox.tentativas + 1, erro=None)
+                .execution_options(synchronize_session=False)
+            )
+        if falhas:
+            session.execute(update(Outbox), falhas)
+        session.commit()
+
+    descartadas = sum(1 for falha in falhas if falha["status"] == "falhou")
+    if falhas:
+        logger.warning("outbox: %s falha(s) no lote, %s sem novas tentativas", len(falhas), descartadas)
+    return {"enviadas": len(enviadas), "falhas": len(falhas), "descartadas": descartadas}
+
+
+def recuperar_reservas_orfas(session_factory, limite: timedelta = LIMITE_RESERVA_OUTBOX) -> int:
+    """Devolve para a fila as mensagens reservadas por um despachante que parou no meio do lote"""
+    with session_factory() as session:
+        resultado = session.execute(
+            update(Outbox).where(Outbox.status == "enviando", Outbox.reservado_em < datetime.now() - limite)
+            .values(status="pendente", reservado_em=None)
+        )
+        session.commit()
+        return resultado.rowcount
+
+
+def drenar_outbox(session_factory, remetente: Remetente, tamanho_lote: int = TAMANHO_LOTE_OUTBOX, progresso=None) -> dict:
+    """Despacha lotes até não haver mensagem pronta; 'progresso(totais)' é chamado a cada lote, se informado"""
+    recuperar_reservas_orfas(session_factory)
+    totais = {"enviadas": 0, "falhas": 0, "descartadas": 0, "lotes": 0}
+    while True:
+        resultado = despachar_lote(session_factory, remetente, tamanho_lote)
+        if not resultado["enviadas"] and not resultado["falhas"]:
+            return totais
+        totais["lotes"] += 1
+        for chave, valor in resultado.items():
+            totais[chave] += valor
+        if progresso:
+            progresso(totais)
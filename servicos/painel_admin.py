@@ -0,0 +1,95 @@
+from datetime import date
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import Contrato, Financeiro, Parcela
+from schemas import DashboardMetricasSchema, SolicitacaoListaSchema
+from servicos.encargos import valor_atualizado_sql
+from servicos.eventos import publicar_apos_commit
+
+TOPICO_ADMIN = "admin"
+
+
+def calcular_metricas_dashboard(session: Session) -> DashboardMetricasSchema:
+    """
+    Métricas do dashboard do admin:
+    - Solicitações pendentes
+    - Contratos ativos
+    - Valor total financiado
+    - Parcelas em atraso (quantidade e valor)
+    """
+    solicitacoes_pendentes = session.query(func.count(Contrato.id_contrato)).filter(Contrato.status == "pendente").scalar()
+    contratos_ativos = session.query(func.count(Contrato.id_contrato)).filter(Contrato.status == "ativo").scalar()
+
+    # Valor total financiado (soma de todos os financeiros de contratos ativos)
+    valor_total_financiado = session.query(func.sum(Financeiro.valor_total)).join(
+        Contrato, Financeiro.id_contrato == Contrato.id_contrato
+    ).filter(Contrato.status == "ativo").scalar() or 0.0
+
+    # Parcelas em atraso, agregadas no banco (valor nominal e com multa e juros até hoje)
+    hoje = date.today()
+    dialeto = session.get_bind().dialect.name
+    parcelas_em_atraso_qtd, parcelas_em_atraso_valor, parcelas_em_atraso_valor_atualizado = session.query(
+        func.count(Parcela.id_parcela),
+        func.coalesce(func.sum(Parcela.valor_parcela), 0),
+        func.coalesce(func.sum(valor_atualizado_sql(hoje, dialeto)), 0)
+    ).join(
+        Financeiro, Parcela.id_financeiro == Financeiro.id_financeiro
+    ).join(
+        Contrato, Financeiro.id_contrato == Contrato.id_contrato
+    ).filter(
+        Contrato.status == "ativo"
+    ).filter(
+        (Parcela.status == "atrasada") |
+        ((Parcela.status == "pendente") & (Parcela.data_vencimento < hoje))
+    ).one()
+
+    return DashboardMetricasSchema(
+        solicitacoes_pendentes=solicitacoes_pendentes,
+        contratos_ativos=contratos_ativos,
+        valor_total_financiado=float(valor_total_financiado),
+        parcelas_em_atraso_qtd=parcelas_em_atraso_qtd,
+        parcelas_em_atraso_valor=float(parcelas_em_atraso_valor),
+        parcelas_em_atraso_valor_atualizado=float(parcelas_em_atraso_valor_atualizado)
+    )
+
+
+# ========================
+# Eventos do stream do admin
+# ========================
+# Cada evento "solicitacao" traz o delta das métricas, para o painel atualizar os
+# contadores sem consultar o banco; o snapshot completo vai no início de cada conexão.
+
+def notificar_solicitacao_criada(session: Session, solicitacao: SolicitacaoListaSchema) -> None:
+    publicar_apos_commit(session, TOPICO_ADMIN, "solicitacao", {
+        "acao": "criada",
+        "id_contrato": solicitacao.id_contrato,
+        "status": solicitacao.status,
+        "solicitacao": solicitacao.model_dump(mode="json"),
+        "delta_metricas": {"solicitacoes_pendentes": 1},
+    })
+
+
+def notificar_solicitacao_aprovada(session: Session, id_contrato: int) -> None:
+    valor_total = session.query(Financeiro.valor_total).filter(Financeiro.id_contrato == id_contrato).scalar()
+    publicar_apos_commit(session, TOPICO_ADMIN, "solicitacao", {
+        "acao": "aprovada",
+        "id_contrato": id_contrato,
+        "status": "ativo",
+        "delta_metricas": {
+            "solicitacoes_pendentes": -1,
+            "contratos_ativos": 1,
+            "valor_total_financiado": float(valor_total or 0),
+        },
+    })
+
+
+def notificar_solicitacao_rejeitada(session: Session, id_contrato: int, motivo: str | None = None) -> None:
+    publicar_apos_commit(session, TOPICO_ADMIN, "solicitacao", {
+        "acao": "rejeitada",
+        "id_contrato": id_contrato,
+        "status": "rejeitado",
+        "motivo": motivo,
+        "delta_metricas": {"solicitacoes_pendentes": -1},
+    })
@@ -0,0 +1,110 @@
+import sqlite3
+import time
+
+from sqlalchemy import event
+
+from servicos.instrumentacao import MedicoesRequisicao, medicoes_atuais
+from servicos.metricas import Contador, registrar_metrica
+
+prazos_excedidos_total = Contador(
+    "aureus_db_prazo_excedido_total", "Statements interrompidos pelo prazo da requisição", ("rota",)
+)
+registrar_metrica(prazos_excedidos_total)
+
+# No SQLite o progress handler é chamado a cada tantas instruções da VM (fração de milissegundo)
+INSTRUCOES_PROGRESSO_SQLITE = 10_000
+
+# SQLSTATE query_canceled do PostgreSQL (statement_timeout)
+PG_QUERY_CANCELED = "57014"
+
+
+class PrazoExcedido(Exception):
+    """A requisição passou do prazo da rota; respondida com 504 (ver main.create_app)"""
+
+
+def eh_timeout(erro: BaseException) -> bool:
+    """Indica se o erro do driver é um statement cancelado por tempo (PostgreSQL) ou interrompido (SQLite)"""
+    if isinstance(erro, sqlite3.OperationalError):
+        return str(erro) == "interrupted"
+    return (getattr(erro, "pgcode", None) or getattr(erro, "sqlstate", None)) == PG_QUERY_CANCELED
+
+
+class PrazosConsultas:
+    """
+    Propaga o prazo de cada requisição para o banco. O prazo conta desde a chegada da
+    requisição (inclui a fila de admissão) e vem de prazos_rotas, pelo template da rota,
+    ou de prazo_padrao. Fora de requisições (jobs, scripts) nada é limitado.
+
+    - PostgreSQL: SET LOCAL statement_timeout com o tempo restante no início de cada transação;
+    - SQLite: progress handler na conexão, que interrompe o statement quando o prazo vence;
+    - em ambos, um statement que começaria depois do prazo nem é enviado ao banco.
+
+    O statement interrompido vira PrazoExcedido (504) e conta em aureus_db_prazo_excedido_total.
+    """
+
+    def __init__(self, engine, prazo_padrao: float | None, prazos_rotas: dict | None = None):
+        self.engine = engine
+        self.prazo_padrao = prazo_padrao
+        self.prazos_rotas = dict(prazos_rotas or {})
+        self._sqlite = engine.dialect.name == "sqlite"
+
+    def registrar(self):
+        if self._sqlite:
+            event.listen(self.engine, "checkout", self._instalar_progress_handler)
+        else:
+            event.listen(self.engine, "begin", self._definir_statement_timeout)
+        event.listen(self.engine, "before_cursor_execute", self._verificar_prazo)
+        event.listen(self.engine, "handle_error", self._converter_timeout)
+        return self
+
+    def remover(self):
+        if self._sqlite:
+            event.remove(self.engine, "checkout", self._instalar_progress_handler)
+        else:
+            event.remove(self.engine, "begin", self._definir_statement_timeout)
+        event.remove(self.engine, "before_cursor_execute", self._verificar_prazo)
+        event.remove(self.engine, "handle_error", self._converter_timeout)
+
+    def limite(self, medicoes: MedicoesRequisicao | None) -> float | None:
+        """Instante (perf_counter) em que a requisição atual estoura o prazo, ou None"""
+        if medicoes is None:
+            return None
+        prazo = self.prazos_rotas.get(medicoes.rota, self.prazo_padrao)
+        return medicoes.inicio + prazo if prazo else None
+
+    def _instalar_progress_handler(self, dbapi_connection, connection_record, connection_proxy):
+        dbapi_connection.set_progress_handler(self._prazo_vencido, INSTRUCOES_PROGRESSO_SQLITE)
+
+    def _prazo_vencido(self) -> int:
+        # Roda na thread que executa o statement, então enxerga o contexto da requisição
+        limite = self.limite(medicoes_atuais.get())
+        return 1 if limite is not None and time.perf_counter() > limite else 0
+
+    def _definir_statement_timeout(self, conn):
+        limite = self.limite(medicoes_atuais.get())
+        if limite is None:
+            return
+        restante_ms = max(int((limite - time.perf_counter()) * 1000), 1)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SET LOCAL statement_timeout = {restante_ms}")
+        finally:
+            cursor.close()
+
+    def _verificar_prazo(self, conn, cursor, statement, parameters, context, executemany):
+        medicoes = medicoes_atuais.get()
+        limite = self.limite(medicoes)
+        if limite is not None and time.perf_counter() > limite:
+            prazos_excedidos_total.inc(medicoes.rota or "desconhecida")
+            raise PrazoExcedido(f"prazo da rota {medicoes.rota} excedido")
+
+    def _converter_timeout(self, contexto):
+        if not eh_timeout(contexto.original_exception):
+            return
+        medicoes = medicoes_atuais.get()
+        if medicoes is None:
+            # statement_timeout configurado fora da aplicação: mantém o erro original
+            prazos_excedidos_total.inc("fora_de_requisicao")
+            return
+        prazos_excedidos_total.inc(medicoes.rota or "desconhecida")
+        raise PrazoExcedido(f"statement interrompido pelo prazo da rota {medicoes.rota}") from contexto.original_exception
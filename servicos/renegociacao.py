@@ -0,0 +1,334 @@
+import math
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from models import Contrato, Financeiro, Parcela, Renegociacao
+from schemas import ParcelaPlanoSchema, RenegociacaoResultadoSchema
+from servicos.cache_contrato import marcar_contratos_alterados
+from servicos.estado_contrato import transicionar_contrato
+
+TAMANHO_LOTE_REPRECIAMENTO = 500
+
+
+# ========================
+# Cálculo (funções puras)
+# ========================
+
+def somar_meses(data: date, meses: int) -> date:
+    """Mesmo dia 'meses' depois, limitado ao último dia do mês (como na criação das parcelas)"""
+    ano, mes = divmod(data.month - 1 + meses, 12)
+    ano += data.year
+    mes += 1
+    return date(ano, mes, min(data.day, monthrange(ano, mes)[1]))
+
+
+def saldo_devedor(valores_em_aberto: list[float], taxa_mensal_pct: float) -> float:
+    """Valor presente das parcelas em aberto à taxa do contrato (a primeira vence em um período)"""
+    taxa = taxa_mensal_pct / 100
+    return round(sum(valor / (1 + taxa) ** k for k, valor in enumerate(valores_em_aberto, start=1)), 2)
+
+
+def calcular_parcelas(saldo: float, taxa_mensal_pct: float, qtde: int, sistema: str) -> list[float]:
+    """Valores das 'qtde' parcelas que amortizam 'saldo' pelo sistema Price ou SAC"""
+    taxa = taxa_mensal_pct / 100
+    if sistema == "sac":
+        amortizacao = saldo / qtde
+        return [round(amortizacao + (saldo - amortizacao * k) * taxa, 2) for k in range(qtde)]
+    if taxa == 0:
+        return [round(saldo / qtde, 2)] * qtde
+    return [round(saldo * taxa / (1 - (1 + taxa) ** -qtde), 2)] * qtde
+
+
+def prazo_para_parcela(saldo: float, taxa_mensal_pct: float, valor_parcela: float) -> int:
+    """Menor número de parcelas Price de até 'valor_parcela' que amortiza 'saldo'"""
+    taxa = taxa_mensal_pct / 100
+    if taxa == 0:
+        return max(1, math.ceil(saldo / valor_parcela - 1e-9))
+    return max(1, math.ceil(-math.log(1 - saldo * taxa / valor_parcela) / math.log(1 + taxa) - 1e-9))
+
+
+@dataclass
+class PlanoRenegociacao:
+    saldo_anterior: float
+    saldo_novo: float
+    valor_pago: float
+    taxa_juros: float
+    sistema: str
+    parcelas_anteriores: int
+    # (numero_parcela, valor, data_vencimento) das parcelas em aberto depois da operação
+    parcelas: list = field(default_factory=list)
+
+    @property
+    def quitado(self) -> bool:
+        return not self.parcelas
+
+
+def planejar(
+    valores_em_aberto: list[float],
+    primeiro_numero: int,
+    data_primeiro_vencimento: date,
+    taxa_juros: float,
+    sistema: str,
+    valor_antecipado: float = 0.0,
+    modo: str = "prazo",
+    nova_taxa: float | None = None,
+    novo_prazo: int | None = None,
+    novo_sistema: str | None = None,
+) -> PlanoRenegociacao:
+    """
+    Recalcula as parcelas em aberto a partir do saldo devedor.
+    - Antecipação: o valor pago abate o saldo; 'prazo' mantém o valor da parcela (Price) ou a
+      amortização (SAC) e reduz a quantidade, 'parcela' mantém a quantidade e reduz o valor.
+    - Renegociação: nova taxa, nova quantidade de parcelas restantes e/ou novo sistema.
+    A numeração continua de 'primeiro_numero' e os vencimentos seguem o calendário do contrato.
+    """
+    qtde_atual = len(valores_em_aberto)
+    saldo_anterior = saldo_devedor(valores_em_aberto, taxa_juros)
+    if valor_antecipado > saldo_anterior + 0.005:
+        raise HTTPException(status_code=400, detail=f"Valor maior que o saldo devedor ({saldo_anterior:.2f})")
+
+    saldo = round(saldo_anterior - valor_antecipado, 2)
+    taxa = taxa_juros if nova_taxa is None else nova_taxa
+    sistema_novo = novo_sistema or sistema
+    plano = PlanoRenegociacao(saldo_anterior, saldo, round(valor_antecipado, 2), taxa, sistema_novo, qtde_atual)
+    if saldo <= 0:
+        plano.saldo_novo = 0.0
+        return plano
+
+    if novo_prazo is not None:
+        qtde = novo_prazo
+    elif valor_antecipado > 0 and modo == "prazo":
+        if sistema_novo == "sac":
+            qtde = math.ceil(saldo / (saldo_anterior / qtde_atual) - 1e-9)
+        else:
+            qtde = prazo_para_parcela(saldo, taxa, valores_em_aberto[0])
+    else:
+        qtde = qtde_atual
+
+    plano.parcelas = [
+        (primeiro_numero + k, valor, somar_meses(data_primeiro_vencimento, primeiro_numero + k - 1))
+        for k, valor in enumerate(calcular_parcelas(saldo, taxa, qtde, sistema_novo))
+    ]
+    return plano
+
+
+# ========================
+# Aplicação no banco
+# ========================
+
+def _parcelas_em_aberto(session: Session, ids_financeiro) -> dict:
+    """id_financeiro -> [(id_parcela, numero, valor, vencimento, status)] em ordem, numa única query"""
+    abertas = {}
+    linhas = session.execute(
+        select(Parcela.id_financeiro, Parcela.id_parcela, Parcela.numero_parcela, Parcela.valor_parcela,
+               Parcela.data_vencimento, Parcela.status)
+        .where(Parcela.id_financeiro.in_(ids_financeiro), Parcela.status.in_(("pendente", "atrasada")))
+        .order_by(Parcela.id_financeiro, Parcela.numero_parcela)
+    ).all()
+    for id_financeiro, *parcela in linhas:
+        abertas.setdefault(id_financeiro, []).append(tuple(parcela))
+    return abertas
+
+
+def _verificar_em_dia(abertas: list, hoje: date) -> None:
+    if not abertas:
+        raise HTTPException(status_code=400, detail="Contrato sem parcelas em aberto")
+    if any(status == "atrasada" or vencimento < hoje for _, _, _, vencimento, status in abertas):
+        raise HTTPException(status_code=400, detail="Regularize as parcelas em atraso antes de antecipar ou renegociar")
+
+
+def _diferencas(id_financeiro: int, abertas: list, plano: PlanoRenegociacao):
+    """Só o que mudou: UPDATEs das parcelas que continuam, INSERTs das novas e o número a partir do qual apagar"""
+    atuais = {numero: (id_parcela, float(valor), vencimento) for id_parcela, numero, valor, vencimento, _ in abertas}
+    atualizacoes, novas = [], []
+    for numero, valor, vencimento in plano.parcelas:
+        if numero in atuais:
+            id_parcela, valor_atual, vencimento_atual = atuais[numero]
+            if abs(valor_atual - valor) >= 0.005 or vencimento_atual != vencimento:
+                atualizacoes.append({"id_parcela": id_parcela, "valor_parcela": valor, "data_vencimento": vencimento})
+        else:
+            novas.append({
+                "id_financeiro": id_financeiro, "numero_parcela": numero, "valor_parcela": valor,
+                "data_vencimento": vencimento, "status": "pendente",
+            })
+    ultimo_numero = plano.parcelas[-1][0] if plano.parcelas else abertas[0][1] - 1
+    return atualizacoes, novas, ultimo_numero
+
+
+def _registro(tipo: str, id_financeiro: int, taxa_anterior: float, plano: PlanoRenegociacao) -> dict:
+    return {
+        "id_financeiro": id_financeiro, "tipo": tipo, "data": datetime.now(), "valor_pago": plano.valor_pago,
+        "saldo_anterior": plano.saldo_anterior, "saldo_novo": plano.saldo_novo,
+        "taxa_anterior": taxa_anterior, "taxa_nova": plano.taxa_juros, "sistema": plano.sistema,
+        "parcelas_anteriores": plano.parcelas_anteriores, "parcelas_novas": len(plano.parcelas),
+    }
+
+
+def renegociar_contrato(
+    session: Session,
+    id_contrato: int,
+    tipo: str,
+    valor_antecipado: float = 0.0,
+    modo: str = "prazo",
+    nova_taxa: float | None = None,
+    novo_prazo: int | None = None,
+    novo_sistema: str | None = None,
+    simular: bool = False,
+    id_cliente: int | None = None,
+) -> RenegociacaoResultadoSchema:
+    """
+    Antecipação ou renegociação de um contrato ativo e em dia. Aplica o plano com o mínimo de
+    statements: um UPDATE em lote (executemany) das parcelas que mudaram, um INSERT em lote das
+    novas, um DELETE das que sobraram, o UPDATE do financeiro e o registro no histórico.
+    Se o valor antecipado cobre o saldo, as parcelas em aberto são removidas e o contrato é quitado.
+    Com id_cliente, o contrato precisa ser desse cliente. O commit fica por conta de quem chama.
+    """
+    consulta = (
+        select(Financeiro, Contrato.status, Contrato.id_cliente)
+        .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato)
+        .where(Financeiro.id_contrato == id_contrato)
+    )
+    if not simular:
+        # Duas renegociações simultâneas do mesmo contrato: a segunda espera (PostgreSQL)
+        consulta = consulta.with_for_update(of=Financeiro)
+    linha = session.execute(consulta).first()
+    if not linha or (id_cliente is not None and linha.id_cliente != id_cliente):
+        raise HTTPException(status_code=404, detail="Contrato não encontrado")
+    financeiro, status, _ = linha
+    if status != "ativo":
+        raise HTTPException(status_code=400, detail=f"Só contratos ativos podem ser renegociados. Status atual: {status}")
+
+    abertas = _parcelas_em_aberto(session, [financeiro.id_financeiro]).get(financeiro.id_financeiro, [])
+    _verificar_em_dia(abertas, date.today())
+
+    taxa_anterior = float(financeiro.taxa_juros or 0)
+    plano = planejar(
+        [float(valor) for _, _, valor, _, _ in abertas], abertas[0][1], financeiro.data_primeiro_vencimento,
+        taxa_anterior, financeiro.sistema_amortizacao or "price",
+        valor_antecipado=valor_antecipado, modo=modo, nova_taxa=nova_taxa, novo_prazo=novo_prazo, novo_sistema=novo_sistema,
+    )
+
+    if not simular:
+        atualizacoes, novas, ultimo_numero = _diferencas(financeiro.id_financeiro, abertas, plano)
+        if atualizacoes:
+            session.execute(update(Parcela), atualizacoes)
+        if novas:
+            session.execute(insert(Parcela), novas)
+        if ultimo_numero < abertas[-1][1]:
+            session.execute(
+                delete(Parcela)
+                .where(Parcela.id_financeiro == financeiro.id_financeiro, Parcela.numero_parcela > ultimo_numero)
+                .execution_options(synchronize_session=False)
+            )
+        session.execute(
+            update(Financeiro)
+            .where(Financeiro.id_financeiro == financeiro.id_financeiro)
+            .values(qtde_parcelas=ultimo_numero, taxa_juros=plano.taxa_juros, sistema_amortizacao=plano.sistema)
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(insert(Renegociacao), [_registro(tipo, financeiro.id_financeiro, taxa_anterior, plano)])
+        marcar_contratos_alterados(session, {id_contrato})
+        if plano.quitado:
+            transicionar_contrato(session, id_contrato, "ativo", "quitado")
+
+    return RenegociacaoResultadoSchema(
+        id_contrato=id_contrato,
+        tipo=tipo,
+        simulacao=simular,
+        quitado=plano.quitado,
+        valor_pago=plano.valor_pago,
+        saldo_anterior=plano.saldo_anterior,
+        saldo_novo=plano.saldo_novo,
+        taxa_juros=plano.taxa_juros,
+        sistema=plano.sistema,
+        parcelas_anteriores=plano.parcelas_anteriores,
+        parcelas_novas=len(plano.parcelas),
+        parcelas=[
+            ParcelaPlanoSchema(numero_parcela=numero, valor_parcela=valor, data_vencimento=vencimento)
+            for numero, valor, vencimento in plano.parcelas
+        ]
+    )
+
+
+def repreciar_contratos(
+    session: Session,
+    nova_taxa: float,
+    taxa_anterior: float | None = None,
+    tamanho_lote: int = TAMANHO_LOTE_REPRECIAMENTO,
+    progresso=None,
+) -> dict:
+    """
+    Reprecifica as parcelas em aberto dos contratos ativos (opcionalmente só os da taxa_anterior)
+    para nova_taxa, mantendo o prazo. Em lotes por id_financeiro: cada lote custa uma query dos
+    financeiros, uma das parcelas em aberto e três statements em lote (parcelas, financeiros e
+    histórico), independente do tamanho. Contratos com parcelas em atraso ficam de fora.
+    Os financeiros do lote ficam travados até o commit (FOR UPDATE SKIP LOCKED no PostgreSQL,
+    como em renegociar_contrato): um contrato sendo renegociado agora é pulado, e a parcela paga
+    depois da leitura não é sobrescrita (o UPDATE só vale para parcela ainda em aberto).
+    Commita por lote; 'progresso(processados, total)' é chamado a cada lote, se informado.
+    """
+    filtros = [Contrato.status == "ativo"]
+    if taxa_anterior is not None:
+        filtros.append(Financeiro.taxa_juros == taxa_anterior)
+    base = select(Financeiro.id_financeiro).join(Contrato, Contrato.id_contrato == Financeiro.id_contrato).where(*filtros)
+    total = session.execute(select(func.count()).select_from(base.subquery())).scalar_one()
+
+    hoje = date.today()
+    repreciados = ignorados = processados = 0
+    ultimo_id = 0
+    while True:
+        lote = session.execute(
+            select(Financeiro.id_financeiro, Financeiro.id_contrato, Financeiro.taxa_juros,
+                   Financeiro.sistema_amortizacao, Financeiro.data_primeiro_vencimento)
+            .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato)
+            .where(*filtros, Financeiro.id_financeiro > ultimo_id)
+            .order_by(Financeiro.id_financeiro)
+            .limit(tamanho_lote)
+            .with_for_update(of=Financeiro, skip_locked=True)
+        ).all()
+        if not lote:
+            break
+
+        abertas_por_financeiro = _parcelas_em_aberto(session, [linha[0] for linha in lote])
+        parcelas, financeiros, historico, contratos = [], [], [], set()
+        for id_financeiro, id_contrato, taxa, sistema, primeiro_vencimento in lote:
+            abertas = abertas_por_financeiro.get(id_financeiro, [])
+            if not abertas or any(status == "atrasada" or vencimento < hoje for _, _, _, vencimento, status in abertas):
+                ignorados += 1
+                continue
+            taxa = float(taxa or 0)
+            plano = planejar(
+                [float(valor) for _, _, valor, _, _ in abertas], abertas[0][1], primeiro_vencimento,
+                taxa, sistema or "price", nova_taxa=nova_taxa,
+            )
+            atualizacoes, _, _ = _diferencas(id_financeiro, abertas, plano)
+            parcelas.extend(atualizacoes)
+            financeiros.append({"id_financeiro": id_financeiro, "taxa_juros": nova_taxa})
+            historico.append(_registro("repreciamento", id_financeiro, taxa, plano))
+            contratos.add(id_contrato)
+            repreciados += 1
+
+        if parcelas:
+            # Só parcela ainda em aberto (pode ter sido paga depois da leitura); or_ em vez de in_,
+            # que não combina com executemany
+            session.execute(
+                update(Parcela).where(or_(Parcela.status == "pendente", Parcela.status == "atrasada"))
+                .execution_options(synchronize_session=None),
+                parcelas,
+            )
+        if financeiros:
+            session.execute(update(Financeiro), financeiros)
+            session.execute(insert(Renegociacao), historico)
+            marcar_contratos_alterados(session, contratos)
+        session.commit()
+
+        processados += len(lote)
+        ultimo_id = lote[-1][0]
+        if progresso:
+            progresso(processados, total)
+    return {"repreciados": repreciados, "ignorados": ignorados}
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from models import Cliente, Contrato, Financeiro, Parcela, Veiculo
+
+# Pesos do score (0 a 1000, maior = menor risco)
+PESO_COMPROMETIMENTO = 500   # parcela / renda: perde tudo a partir de COMPROMETIMENTO_MAXIMO
+PESO_LTV = 300               # valor financiado / valor do veículo
+PESO_EXPOSICAO = 200         # saldo em aberto em outros contratos / renda anual
+COMPROMETIMENTO_MAXIMO = 0.5
+
+TAMANHO_LOTE_SCORE = 5000
+
+
+@dataclass
+class AvaliacaoRisco:
+    comprometimento_renda: float | None
+    ltv: float
+    exposicao: float
+    score_risco: int
+
+
+def avaliar_risco(valor_parcela: float, renda: float | None, valor_veiculo: float,
+                  valor_entrada: float, exposicao: float) -> AvaliacaoRisco:
+    """
+    Calcula os indicadores e o score de uma solicitação. Sem renda informada o
+    comprometimento fica indefinido e recebe a penalidade máxima.
+    """
+    renda = float(renda or 0)
+    valor_veiculo = float(valor_veiculo or 0)
+    comprometimento = float(valor_parcela) / renda if renda > 0 else None
+    ltv = (valor_veiculo - float(valor_entrada or 0)) / valor_veiculo if valor_veiculo > 0 else 1.0
+    ltv = max(0.0, ltv)
+
+    penalidade_comprometimento = 1.0 if comprometimento is None else min(comprometimento / COMPROMETIMENTO_MAXIMO, 1.0)
+    penalidade_exposicao = min(float(exposicao) / (renda * 12), 1.0) if renda > 0 else (1.0 if exposicao else 0.0)
+    score = 1000 - (
+        PESO_COMPROMETIMENTO * penalidade_comprometimento
+        + PESO_LTV * min(ltv, 1.0)
+        + PESO_EXPOSICAO * penalidade_exposicao
+    )
+    return AvaliacaoRisco(
+        comprometimento_renda=round(comprometimento, 4) if comprometimento is not None else None,
+        ltv=round(ltv, 4),
+        exposicao=round(float(exposicao), 2),
+        score_risco=int(round(score)),
+    )
+
+
+def _consulta_exposicao(ids_cliente):
+    """Saldo em aberto (parcelas pendentes/atrasadas) dos contratos ativos, por cliente"""
+    return (
+        select(Contrato.id_cliente, func.coalesce(func.sum(Parcela.valor_parcela), 0))
+        .select_from(Parcela)
+        .join(Financeiro, Financeiro.id_financeiro == Parcela.id_financeiro)
+        .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato)
+        .where(
+            Contrato.status == "ativo",
+            Parcela.status.in_(("pendente", "atrasada")),
+            Contrato.id_cliente.in_(ids_cliente),
+        )
+        .group_by(Contrato.id_cliente)
+    )
+
+
+def exposicao_cliente(session: Session, id_cliente: int) -> float:
+    linha = session.execute(_consulta_exposicao([id_cliente])).first()
+    return float(linha[1]) if linha else 0.0
+
+
+def aplicar_avaliacao(financeiro: Financeiro, avaliacao: AvaliacaoRisco) -> None:
+    financeiro.comprometimento_renda = avaliacao.comprometimento_renda
+    financeiro.ltv = avaliacao.ltv
+    financeiro.exposicao = avaliacao.exposicao
+    financeiro.score_risco = avaliacao.score_risco
+
+
+def recalcular_scores_pendentes(session: Session, tamanho_lote: int = TAMANHO_LOTE_SCORE, progresso=None) -> int:
+    """
+    Recalcula o score de todas as solicitações pendentes, em lotes por id_financeiro.
+    Cada lote custa três statements (dados do lote, exposição dos clientes do lote e um UPDATE
+    em massa com executemany), independente do número de solicitações. Commita por lote.
+    'progresso(atualizadas, total)' é chamado a cada lote, se informado.
+    """
+    pendentes = (Contrato.status == "pendente")
+    total = session.execute(
+        select(func.count()).select_from(Financeiro)
+        .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato).where(pendentes)
+    ).scalar_one()
+
+    atualizadas = 0
+    ultimo_id = 0
+    while True:
+        lote = session.execute(
+            select(
+                Financeiro.id_financeiro, Contrato.id_cliente, Parcela.valor_parcela,
+                func.coalesce(Financeiro.renda_mensal, Cliente.renda), Veiculo.valor, Financeiro.valor_entrada,
+            )
+            .join(Contrato, Contrato.id_contrato == Financeiro.id_contrato)
+            .join(Cliente, Cliente.id_cliente == Contrato.id_cliente)
+            .join(Veiculo, Veiculo.id_veiculo == Contrato.id_veiculo)
+            # parcelas de mesmo valor: a primeira basta (índice único id_financeiro + numero_parcela)
+            .join(Parcela, (Parcela.id_financeiro == Financeiro.id_financeiro) & (Parcela.numero_parcela == 1))
+            .where(pendentes, Financeiro.id_financeiro > ultimo_id)
+            .order_by(Financeiro.id_financeiro)
+            .limit(tamanho_lote)
+        ).all()
+        if not lote:
+            break
+
+        exposicoes = dict(session.execute(_consulta_exposicao({linha[1] for linha in lote})).all())
+        valores = []
+        for id_financeiro, id_cliente, parcela, renda, valor_veiculo, entrada in lote:
+            avaliacao = avaliar_risco(parcela, renda, valor_veiculo, entrada, float(exposicoes.get(id_cliente, 0)))
+            valores.append({
+                "id_financeiro": id_financeiro,
+                "comprometimento_renda": avaliacao.comprometimento_renda,
+                "ltv": avaliacao.ltv,
+                "exposicao": avaliacao.exposicao,
+                "score_risco": avaliacao.score_risco,
+            })
+        session.execute(update(Financeiro), valores)
+        session.commit()
+
+        atualizadas += len(lote)
+        ultimo_id = lote[-1][0]
+        if progresso:
+            progresso(atualizadas, total)
+    return atualizadas
@@ -0,0 +1,40 @@
+import os
+import threading
+
+import bcrypt
+from fastapi.concurrency import run_in_threadpool
+
+from servicos.instrumentacao import medir
+from servicos.metricas import bcrypt_fila
+
+# Máximo de hashes bcrypt simultâneos (cada um ocupa uma thread por ~200ms)
+BCRYPT_CONCORRENCIA = int(os.getenv("BCRYPT_CONCORRENCIA", "4"))
+
+_semaforo = threading.BoundedSemaphore(BCRYPT_CONCORRENCIA)
+
+
+def _com_limite(funcao, *args):
+    with _semaforo:
+        return funcao(*args)
+
+
+async def _executar_bcrypt(funcao, *args):
+    """
+    Executa o bcrypt fora do event loop, limitado por um semáforo.
+    O gauge aureus_bcrypt_fila conta as operações aguardando ou em execução.
+    """
+    bcrypt_fila.inc()
+    try:
+        with medir("hash"):
+            return await run_in_threadpool(_com_limite, funcao, *args)
+    finally:
+        bcrypt_fila.dec()
+
+
+async def verificar_senha(senha: str, senha_hash: str) -> bool:
+    return await _executar_bcrypt(bcrypt.checkpw, senha.encode('utf-8'), senha_hash.encode('utf-8'))
+
+
+async def gerar_hash_senha(senha: str) -> str:
+    senha_hash = await _executar_bcrypt(lambda s: bcrypt.hashpw(s, bcrypt.gensalt()), senha.encode('utf-8'))
+    return senha_hash.decode('utf-8')
@@ -0,0 +1,123 @@
+"""
+Tarefas executadas pelos workers de jobs (servicos/jobs.py).
+Importar este módulo registra as tarefas; a API e o scripts.worker_jobs fazem isso na subida.
+"""
+from datetime import date
+
+from sqlalchemy import func, select, update
+
+from models import Parcela, Financeiro, Outbox
+from servicos.aging import gravar_snapshot_aging
+from servicos.cache_contrato import marcar_contratos_alterados
+from servicos.encargos import acumular_encargos, TAMANHO_LOTE_ENCARGOS
+from servicos.jobs import tarefa
+from servicos.outbox import (
+    LEMBRETE_DIAS_ANTECEDENCIA, TAMANHO_LOTE_OUTBOX, criar_remetente, drenar_outbox, enfileirar_lembretes_vencimento
+)
+from servicos.renegociacao import repreciar_contratos, TAMANHO_LOTE_REPRECIAMENTO
+from servicos.score import recalcular_scores_pendentes, TAMANHO_LOTE_SCORE
+
+
+@tarefa("recalcular_atrasos")
+def recalcular_atrasos(contexto, hoje: str | None = None, tamanho_lote: int = 5000) -> dict:
+    """Marca como 'atrasada' as parcelas pendentes vencidas, em lotes (um commit por lote)"""
+    data_corte = date.fromisoformat(hoje) if hoje else date.today()
+    vencidas = (Parcela.status == "pendente") & (Parcela.data_vencimento < data_corte)
+
+    with contexto.session_factory() as session:
+        total = session.execute(select(func.count()).select_from(Parcela).where(vencidas)).scalar_one()
+    contexto.progresso(0, f"{total} parcelas vencidas")
+
+    atualizadas = processadas = 0
+    while processadas < total:
+        with contexto.session_factory() as session:
+            lote = session.execute(
+                select(Parcela.id_parcela, Financeiro.id_contrato)
+                .join(Financeiro, Financeiro.id_financeiro == Parcela.id_financeiro)
+                .where(vencidas).order_by(Parcela.id_parcela).limit(tamanho_lote)
+            ).all()
+            if not lote:
+                break
+            # O predicado é repetido no UPDATE: parcela paga ou renegociada desde o SELECT não é tocada
+            resultado = session.execute(
+                update(Parcela).where(Parcela.id_parcela.in_([id_parcela for id_parcela, _ in lote]), vencidas)
+                .values(status="atrasada").execution_options(synchronize_session=False)
+            )
+            marcar_contratos_alterados(session, {id_contrato for _, id_contrato in lote})
+            session.commit()
+        atualizadas += resultado.rowcount
+        processadas += len(lote)
+        contexto.progresso(100 * min(processadas, total) / max(total, 1), f"{atualizadas}/{total} parcelas")
+
+    return {"parcelas_atualizadas": atualizadas, "data_corte": data_corte.isoformat()}
+
+
+@tarefa("snapshot_aging")
+def snapshot_aging(contexto, hoje: str | None = None) -> dict:
+    """Grava o snapshot diário do aging da carteira"""
+    data_referencia = date.fromisoformat(hoje) if hoje else date.today()
+    with contexto.session_factory() as session:
+        linhas = gravar_snapshot_aging(session, data_referencia)
+        session.commit()
+    return {"linhas": linhas, "data_referencia": data_referencia.isoformat()}
+
+
+@tarefa("recalcular_score")
+def recalcular_score(contexto, tamanho_lote: int = TAMANHO_LOTE_SCORE) -> dict:
+    """Recalcula o score de risco de todas as solicitações pendentes"""
+    def progresso(atualizadas, total):
+        contexto.progresso(100 * atualizadas / total, f"{atualizadas}/{total} solicitações")
+
+    with contexto.session_factory() as session:
+        atualizadas = recalcular_scores_pendentes(session, tamanho_lote, progresso)
+    return {"solicitacoes_atualizadas": atualizadas}
+
+
+@tarefa("repreciar_contratos")
+def repreciar(contexto, taxa_juros: float, taxa_anterior: float | None = None,
+              tamanho_lote: int = TAMANHO_LOTE_REPRECIAMENTO) -> dict:
+    """Reprecifica as parcelas em aberto dos contratos ativos para a nova taxa"""
+    def progresso(processados, total):
+        contexto.progresso(100 * processados / total, f"{processados}/{total} contratos")
+
+    with contexto.session_factory() as session:
+        resultado = repreciar_contratos(session, taxa_juros, taxa_anterior, tamanho_lote, progresso)
+    return {**resultado, "taxa_juros": taxa_juros}
+
+
+@tarefa("acumular_encargos")
+def acumular_encargos_atraso(contexto, hoje: str | None = None, tamanho_lote: int = TAMANHO_LOTE_ENCARGOS) -> dict:
+    """Grava multa e juros de mora nas parcelas em aberto vencidas"""
+    data_calculo = date.fromisoformat(hoje) if hoje else date.today()
+
+    def progresso(processadas, total):
+        contexto.progresso(100 * processadas / total, f"faixa {processadas}/{total} ids")
+
+    with contexto.session_factory() as session:
+        atualizadas = acumular_encargos(session, data_calculo, tamanho_lote, progresso)
+    return {"parcelas_atualizadas": atualizadas, "data_calculo": data_calculo.isoformat()}
+
+
+@tarefa("lembretes_vencimento")
+def lembretes_vencimento(contexto, dias: int = LEMBRETE_DIAS_ANTECEDENCIA, hoje: str | None = None) -> dict:
+    """Registra na outbox os lembretes das parcelas que vencem nos próximos 'dias' dias"""
+    data_referencia = date.fromisoformat(hoje) if hoje else date.today()
+    with contexto.session_factory() as session:
+        registrados = enfileirar_lembretes_vencimento(session, dias, data_referencia)
+        session.commit()
+    return {"lembretes_registrados": registrados, "dias": dias, "data_referencia": data_referencia.isoformat()}
+
+
+@tarefa("despachar_outbox")
+def despachar_outbox(contexto, tamanho_lote: int = TAMANHO_LOTE_OUTBOX) -> dict:
+    """Envia as mensagens prontas da outbox, em lotes, pelo remetente configurado (OUTBOX_DESTINO)"""
+    with contexto.session_factory() as session:
+        total = session.execute(
+            select(func.count()).select_from(Outbox).where(Outbox.status == "pendente")
+        ).scalar_one()
+
+    def progresso(totais):
+        processadas = totais["enviadas"] + totais["falhas"]
+        contexto.progresso(100 * processadas / max(total, 1), f"{processadas}/{total} mensagens")
+
+    return drenar_outbox(contexto.session_factory, criar_remetente(), tamanho_lote, progresso)
@@ -1,58 +1,111 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 from models import Base, Usuario, Cliente, Endereco
-from main import app, limiter
-from dependencies import pegar_sessao
+from config import Settings
+from main import create_app
+from dependencies import limiter
+from servicos.cache_contrato import cache_contrato
 import bcrypt
 from datetime import date
-from dotenv import load_dotenv
 
-load_dotenv()
+#substitui a função que identifica ip, o rate limiter pode nao funcionar nos testes
+def get_remote_address_override():
+    return "127.0.0.1"
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+limiter.key_func = get_remote_address_override
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-#troca o banco oficial pelo de teste
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+@pytest.fixture(autouse=True)
+def resetar_rate_limit():
+    """Zera os contadores do rate limiter para um teste não esgotar o limite do outro"""
+    limiter.reset()
+    yield
 
-#quando alguem pedir  pegar_sessao vai usar o override em vez do original
-app.dependency_overrides[pegar_sessao] = override_get_db
 
-#substitui a função que identifica ip, o rate limiter pode nao funcionar nos testes
-def get_remote_address_override():
-    return "127.0.0.1"
+def habilitar_savepoints_sqlite(engine):
+    """
+    O driver sqlite3 abre as transações por conta própria e não entende SAVEPOINT aninhado;
+    aqui o controle passa para o SQLAlchemy (receita da documentação do SQLAlchemy para pysqlite).
+    """
+    @event.listens_for(engine, "connect")
+    def _desligar_transacao_do_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
 
-limiter.key_func = get_remote_address_override
+    @event.listens_for(engine, "begin")
+    def _emitir_begin(conexao):
+        conexao.exec_driver_sql("BEGIN")
 
 
-@pytest.fixture(scope="function")
-def client():
+@pytest.fixture(scope="session")
+def settings_teste(tmp_path_factory):
     """
-    Cria as tabelas uma vez no início dos testes.
-    A limpeza é feita manualmente nas fixtures que criam dados.
+    Banco criado uma vez por sessão no diretório temporário do pytest (um por worker no
+    pytest -n auto). É um arquivo, e não ":memory:", para o EXPLAIN do log de consultas
+    lentas poder abrir a própria conexão em outra thread.
     """
-    Base.metadata.create_all(bind=engine)
+    caminho = tmp_path_factory.mktemp("db") / "test.db"
+    return Settings(
+        secret_key="chave-de-teste",
+        database_url=f"sqlite:///{caminho}",
+        server_timing_log=False,
+        jobs_workers=0,  # os testes executam os jobs com executar_proximo_job
+        sse_heartbeat=0.3,
+        sse_duracao_maxima=1.0,  # o TestClient só devolve a resposta quando o stream termina
+    )
+
+
+@pytest.fixture(scope="session")
+def app_teste(settings_teste):
+    """App isolado, com lifespan (engine e tabelas) executado uma vez por sessão"""
+    app = create_app(settings_teste)
     with TestClient(app) as test_client:
-        yield test_client
+        engine = app.state.engine
+        habilitar_savepoints_sqlite(engine)
+        Base.metadata.create_all(bind=engine)
+        app.state.test_client = test_client
+        yield app
 
 
 @pytest.fixture
-def db_session():
-    session = TestingSessionLocal()
+def conexao_teste(app_teste):
+    """
+    Cada teste roda dentro de uma transação que é desfeita no final. Os commits das rotas e
+    das fixtures viram SAVEPOINTs dessa transação, então nenhum teste precisa limpar dados.
+    """
+    engine = app_teste.state.engine
+    fabrica_original = app_teste.state.session_factory
+    conexao = engine.connect()
+    transacao = conexao.begin()
+    app_teste.state.session_factory = sessionmaker(
+        bind=conexao, autocommit=False, autoflush=False, join_transaction_mode="create_savepoint"
+    )
+    try:
+        yield conexao
+    finally:
+        app_teste.state.session_factory = fabrica_original
+        transacao.rollback()
+        conexao.close()
+        # o rollback não passa pelos eventos de sessão que invalidam o cache
+        cache_contrato.limpar()
+
+
+@pytest.fixture
+def client(app_teste, conexao_teste):
+    test_client = app_teste.state.test_client
+    test_client.cookies.clear()
+    return test_client
+
+
+@pytest.fixture
+def engine(app_teste):
+    return app_teste.state.engine
+
+
+@pytest.fixture
+def db_session(app_teste, conexao_teste):
+    session = app_teste.state.session_factory()
     try:
         yield session
     finally:
@@ -61,59 +114,42 @@ def db_session():
 
 @pytest.fixture
 def usuario_cliente(db_session):
-    """
-    Cria usuário, endereço e cliente para testes.
-    Usa try/finally para garantir limpeza mesmo se der erro.
-    """
-    usuario = None
-    endereco = None
-    cliente = None
+    """Cria usuário, endereço e cliente para testes (desfeitos no rollback do teste)"""
+    senha_hash = bcrypt.hashpw("senha123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    usuario = Usuario(
+        id_perfil=1,
+        login="cliente_teste",
+        senha_hash=senha_hash,
+        data_criacao=date.today()
+    )
+    db_session.add(usuario)
+    db_session.flush()
     
-    try:
-        senha_hash = bcrypt.hashpw("senha123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        usuario = Usuario(
-            id_perfil=1,
-            login="cliente_teste",
-            senha_hash=senha_hash,
-            data_criacao=date.today()
-        )
-        db_session.add(usuario)
-        db_session.flush()
-        
-        endereco = Endereco(
-            logradouro="Rua Teste",
-            numero="123",
-            bairro="Centro",
-            cidade="São Paulo",
-            estado="SP",
-            cep="01234567"
-        )
-        db_session.add(endereco)
-        db_session.flush()
-        
-        cliente = Cliente(
-            id_usuario=usuario.id_usuario,
-            id_endereco=endereco.id_endereco,
-            nome="Cliente Teste",
-            cpf="12345678901",
-            email="cliente@teste.com",
-            telefone="11999999999",
-            renda=5000.0,
-            data_cadastro=date.today()
-        )
-        db_session.add(cliente)
-        db_session.commit()
-        
-        yield usuario  
-        
-    finally:
-        if cliente:
-            db_session.delete(cliente)
-        if endereco:
-            db_session.delete(endereco)
-        if usuario:
-            db_session.delete(usuario)
-        db_session.commit()
+    endereco = Endereco(
+        logradouro="Rua Teste",
+        numero="123",
+        bairro="Centro",
+        cidade="São Paulo",
+        estado="SP",
+        cep="01234567"
+    )
+    db_session.add(endereco)
+    db_session.flush()
+    
+    cliente = Cliente(
+        id_usuario=usuario.id_usuario,
+        id_endereco=endereco.id_endereco,
+        nome="Cliente Teste",
+        cpf="12345678901",
+        email="cliente@teste.com",
+        telefone="11999999999",
+        renda=5000.0,
+        data_cadastro=date.today()
+    )
+    db_session.add(cliente)
+    db_session.commit()
+    
+    return usuario
 
 
 @pytest.fixture
@@ -132,3 +168,128 @@ def cliente_id(db_session, usuario_cliente):
     cliente = db_session.query(Cliente).filter(Cliente.id_usuario == usuario_cliente.id_usuario).first()
     return cliente.id_cliente
 
+
+
+def criar_contrato_teste(db_session, id_cliente, sufixo, status="pendente", qtde_parcelas=12):
+    """
+    Cria veículo, contrato, financeiro e parcelas direto no banco.
+    O sufixo deixa placa, chassi, RENAVAM e número do contrato únicos.
+    """
+    from models import Veiculo, Contrato, Financeiro, Parcela
+    from datetime import timedelta
+
+    veiculo = Veiculo(
+        marca="Fiat", modelo="Uno", ano_fabricacao=2024, ano_modelo=2024, cor="Branco",
+        placa=f"TST{sufixo:04d}", num_chassi=f"9BWTESTE{sufixo:09d}", num_renavam=f"9{sufixo:010d}", valor=50000.0
+    )
+    db_session.add(veiculo)
+    db_session.flush()
+
+    contrato = Contrato(
+        id_cliente=id_cliente,
+        id_veiculo=veiculo.id_veiculo,
+        num_contrato=f"CT-TESTE-{sufixo:04d}",
+        data_emissao=date.today(),
+        status=status
+    )
+    db_session.add(contrato)
+    db_session.flush()
+
+    financeiro = Financeiro(
+        id_contrato=contrato.id_contrato,
+        valor_total=54000.0,
+        valor_entrada=10000.0,
+        taxa_juros=1.5,
+        qtde_parcelas=qtde_parcelas,
+        data_primeiro_vencimento=date.today() + timedelta(days=30),
+        data_criacao=date.today()
+    )
+    db_session.add(financeiro)
+    db_session.flush()
+
+    for i in range(1, qtde_parcelas + 1):
+        db_session.add(Parcela(
+            id_financeiro=financeiro.id_financeiro,
+            numero_parcela=i,
+            valor_parcela=4500.0,
+            data_vencimento=date.today() + timedelta(days=30 * i)
+        ))
+    db_session.commit()
+    return contrato.id_contrato
+
+
+@pytest.fixture
+def contrato_cliente(db_session, cliente_id):
+    """Cria um contrato pendente com 12 parcelas para o cliente de teste"""
+    return criar_contrato_teste(db_session, cliente_id, 1)
+
+
+@pytest.fixture
+def fabrica_contratos(db_session, cliente_id):
+    """Cria quantos contratos o teste pedir: fabrica_contratos(10, status="ativo")"""
+    criados = []
+
+    def criar(qtde, status="pendente"):
+        for _ in range(qtde):
+            criados.append(criar_contrato_teste(db_session, cliente_id, 100 + len(criados), status=status))
+        return list(criados)
+
+    return criar
+
+
+@pytest.fixture
+def usuario_admin(db_session):
+    """Cria um usuário com perfil de administrador (id_perfil=2)"""
+    senha_hash = bcrypt.hashpw("admin123".encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
+    usuario = Usuario(
+        id_perfil=2,
+        login="admin_teste",
+        senha_hash=senha_hash,
+        data_criacao=date.today()
+    )
+    db_session.add(usuario)
+    db_session.commit()
+    return usuario
+
+
+@pytest.fixture
+def token_admin(usuario_admin, settings_teste):
+    from routes.auth_routes import criar_token
+    return criar_token(usuario_admin.id_usuario, settings=settings_teste)
+
+
+class ContadorQueries:
+    """
+    Registra todos os statements executados na engine de teste dentro do bloco:
+
+        with contar_queries() as queries:
+            client.get(...)
+        assert len(queries) <= 2, queries.statements
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.savepoints = 0
+
+    def _registrar(self, conn, cursor, statement, parameters, context, executemany):
+        # SAVEPOINTs vêm do isolamento por teste (fixture conexao_teste), não da rota
+        if statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            self.savepoints += 1
+        else:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._registrar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._registrar)
+
+    def __len__(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def contar_queries(engine):
+    return lambda: ContadorQueries(engine)
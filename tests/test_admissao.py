@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from middlewares.admissao import AdmissaoMiddleware, ClasseAdmissao, classificar_requisicao
+from servicos.metricas import exportar_metricas
+
+
+def test_classificacao_das_rotas():
+    assert classificar_requisicao("POST", "/auth/login") == "auth"
+    assert classificar_requisicao("GET", "/cliente/me") == "cliente"
+    assert classificar_requisicao("GET", "/admin/contratos") == "admin"
+    assert classificar_requisicao("PUT", "/admin/solicitacao/1/aprovar") == "escrita"
+    assert classificar_requisicao("POST", "/cliente/solicitacao") == "escrita"
+    assert classificar_requisicao("GET", "/cliente/eventos/aguardar") is None
+    assert classificar_requisicao("GET", "/metrics") is None
+
+
+def _app_lento(limites, fila, espera_maxima):
+    app = FastAPI()
+
+    @app.get("/cliente/lento")
+    async def lento():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    @app.get("/admin/rapido")
+    async def rapido():
+        return {"ok": True}
+
+    app.add_middleware(AdmissaoMiddleware, limites=limites, fila=fila, espera_maxima=espera_maxima, retry_after=2)
+    return app
+
+
+async def _disparar(app, caminho, quantidade):
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+        return await asyncio.gather(*(cliente.get(caminho) for _ in range(quantidade)))
+
+
+def test_fila_cheia_responde_503_com_retry_after():
+    app = _app_lento({"cliente": 1, "admin": 1}, fila=1, espera_maxima=5.0)
+    respostas = asyncio.run(_disparar(app, "/cliente/lento", 4))
+
+    # uma executando, uma na fila (atendida depois), duas descartadas sem esperar
+    assert sorted(r.status_code for r in respostas) == [200, 200, 503, 503]
+    descartada = next(r for r in respostas if r.status_code == 503)
+    assert descartada.headers["retry-after"] == "2"
+    assert "sobrecarregado" in descartada.json()["detail"]
+    assert 'aureus_admissao_rejeicoes_total{classe="cliente"}' in exportar_metricas()
+
+
+def test_espera_maxima_na_fila():
+    app = _app_lento({"cliente": 1}, fila=5, espera_maxima=0.05)
+    respostas = asyncio.run(_disparar(app, "/cliente/lento", 3))
+    assert sorted(r.status_code for r in respostas) == [200, 503, 503]
+
+
+def test_vaga_passa_para_a_fila_e_e_liberada():
+    async def cenario():
+        classe = ClasseAdmissao("teste", limite=1, fila=2, espera_maxima=1.0)
+        assert await classe.entrar()
+        segunda = asyncio.create_task(classe.entrar())
+        await asyncio.sleep(0)
+        assert classe.aguardando() == 1
+
+        classe.sair()  # a vaga vai direto para quem esperava
+        assert await segunda
+        assert classe.em_execucao == 1 and classe.aguardando() == 0
+
+        classe.sair()
+        assert classe.em_execucao == 0
+        return True
+
+    assert asyncio.run(cenario())
+
+
+def test_vaga_recebida_junto_com_o_timeout_e_devolvida(monkeypatch):
+    classe = ClasseAdmissao("teste", limite=1, fila=2, espera_maxima=1.0)
+
+    async def vaga_e_timeout_na_mesma_volta(vaga, timeout):
+        # como no wait_for do Python 3.12+: a vaga chega, mas o TimeoutError vence
+        classe.sair()
+        assert vaga.done()
+        raise asyncio.TimeoutError
+
+    async def cenario():
+        assert await classe.entrar()
+        monkeypatch.setattr(asyncio, "wait_for", vaga_e_timeout_na_mesma_volta)
+        return await classe.entrar()
+
+    assert asyncio.run(cenario()) is False
+    assert classe.em_execucao == 0 and classe.aguardando() == 0 and classe.rejeitadas == 1
+
+
+def test_api_admite_requisicoes_normais(client, usuario_cliente):
+    response = client.post("/auth/login", json={"login": "cliente_teste", "senha": "senha123"})
+    assert response.status_code == 200
+    # a vaga foi devolvida ao fim da requisição
+    assert 'aureus_admissao_em_execucao{classe="auth"} 0' in client.get("/metrics").text
@@ -0,0 +1,39 @@
+import pytest
+
+from models import Cliente
+
+
+@pytest.fixture
+def headers_admin(token_admin):
+    return {"Authorization": f"Bearer {token_admin}"}
+
+
+def _buscar(client, headers, termo):
+    response = client.get("/admin/busca", params={"q": termo}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [(r["tipo"], r["titulo"]) for r in response.json()["resultados"]]
+
+
+def test_busca_por_cliente(client, headers_admin, usuario_cliente):
+    assert ("cliente", "Cliente Teste") in _buscar(client, headers_admin, "ente tes")   # trecho do nome
+    assert ("cliente", "Cliente Teste") in _buscar(client, headers_admin, "456.789")    # CPF com pontuação
+    assert ("cliente", "Cliente Teste") in _buscar(client, headers_admin, "@TESTE.com")
+
+
+def test_busca_por_veiculo_e_contrato(client, headers_admin, contrato_cliente):
+    assert _buscar(client, headers_admin, "tst-0001") == [("veiculo", "TST0001")]
+    assert ("veiculo", "TST0001") in _buscar(client, headers_admin, "9BWTESTE")
+    assert _buscar(client, headers_admin, "CT-TESTE-0001") == [("contrato", "CT-TESTE-0001")]
+
+
+def test_indice_acompanha_alteracoes(client, headers_admin, db_session, usuario_cliente):
+    cliente = db_session.query(Cliente).filter(Cliente.id_usuario == usuario_cliente.id_usuario).first()
+    cliente.nome = "Maria Aparecida"
+    db_session.commit()
+
+    assert _buscar(client, headers_admin, "Cliente Teste") == []
+    assert _buscar(client, headers_admin, "aparecida") == [("cliente", "Maria Aparecida")]
+
+
+def test_busca_termo_curto(client, headers_admin):
+    assert client.get("/admin/busca", params={"q": "ab"}, headers=headers_admin).status_code == 400
@@ -0,0 +1,53 @@
+from models import Contrato
+from servicos.cache_contrato import cache_contrato, BackendLRU
+
+
+def test_detalhe_contrato_usa_cache(client, token_cliente, contrato_cliente):
+    cache_contrato.limpar()
+    headers = {"Authorization": f"Bearer {token_cliente}"}
+
+    primeira = client.get(f"/cliente/contrato/{contrato_cliente}", headers=headers)
+    segunda = client.get(f"/cliente/contrato/{contrato_cliente}", headers=headers)
+
+    assert primeira.status_code == 200
+    assert primeira.headers["x-cache"] == "MISS"
+    assert segunda.headers["x-cache"] == "HIT"
+    assert primeira.json() == segunda.json()
+    assert len(segunda.json()["financeiro"]["parcelas"]) == 12
+    assert cache_contrato.estatisticas()["hit_ratio"] == 0.5
+
+
+def test_cache_pode_ser_ignorado(client, token_cliente, contrato_cliente):
+    cache_contrato.limpar()
+    headers = {"Authorization": f"Bearer {token_cliente}"}
+    client.get(f"/cliente/contrato/{contrato_cliente}", headers=headers)
+
+    response = client.get(
+        f"/cliente/contrato/{contrato_cliente}",
+        headers={**headers, "Cache-Control": "no-cache"}
+    )
+    assert response.headers["x-cache"] == "MISS"
+
+
+def test_commit_invalida_cache(client, token_cliente, contrato_cliente, db_session):
+    cache_contrato.limpar()
+    headers = {"Authorization": f"Bearer {token_cliente}"}
+    client.get(f"/cliente/contrato/{contrato_cliente}", headers=headers)
+
+    contrato = db_session.query(Contrato).filter(Contrato.id_contrato == contrato_cliente).first()
+    contrato.status = "ativo"
+    db_session.commit()
+
+    response = client.get(f"/cliente/contrato/{contrato_cliente}", headers=headers)
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json()["status"] == "ativo"
+
+
+def test_backend_lru_descarta_mais_antigo():
+    backend = BackendLRU(capacidade=2)
+    backend.gravar(1, b"a")
+    backend.gravar(2, b"b")
+    backend.obter(1)
+    backend.gravar(3, b"c")
+    assert backend.obter(2) is None
+    assert backend.obter(1) == b"a"
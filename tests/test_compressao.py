@@ -0,0 +1,29 @@
+from middlewares.compressao import escolher_codificacao
+
+
+def test_resposta_grande_comprimida_com_gzip(client):
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert "paths" in response.json()
+
+
+def test_resposta_sem_accept_encoding_nao_comprimida(client):
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_resposta_pequena_nao_comprimida(client):
+    response = client.get("/auth/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_escolher_codificacao_respeita_q_zero():
+    assert escolher_codificacao("") is None
+    assert escolher_codificacao("gzip;q=0") is None
+    assert escolher_codificacao("deflate, gzip;q=0.5") == "gzip"
+    assert escolher_codificacao("*") in ("gzip", "br")
@@ -0,0 +1,47 @@
+import json
+import logging
+
+from servicos.consultas_lentas import LogConsultasLentas
+
+
+def test_consulta_lenta_registrada_com_explain(client, engine, usuario_cliente, caplog):
+    log = LogConsultasLentas(engine, limite_ms=0, capturar_explain=True).registrar()
+    try:
+        with caplog.at_level(logging.WARNING, logger="aureus.consultas_lentas"):
+            client.post("/auth/login", json={"login": "cliente_teste", "senha": "senha123"})
+    finally:
+        log.remover()  # aguarda os EXPLAINs pendentes
+
+    registros = [json.loads(r.getMessage()) for r in caplog.records if r.name == "aureus.consultas_lentas"]
+    consulta_usuario = next(r for r in registros if "FROM usuario" in r["statement"])
+    assert consulta_usuario["rota"] == "/auth/login"
+    assert "cliente_teste" in consulta_usuario["parametros"]
+    assert any("usuario" in linha for linha in consulta_usuario["explain"])
+
+
+def test_consulta_rapida_nao_registrada(client, engine, usuario_cliente, caplog):
+    log = LogConsultasLentas(engine, limite_ms=60_000).registrar()
+    try:
+        with caplog.at_level(logging.WARNING, logger="aureus.consultas_lentas"):
+            client.post("/auth/login", json={"login": "cliente_teste", "senha": "senha123"})
+    finally:
+        log.remover()
+    assert not [r for r in caplog.records if r.name == "aureus.consultas_lentas"]
+
+
+def test_statement_com_erro_nao_deixa_resto_na_conexao(engine, caplog):
+    from sqlalchemy import text
+
+    log = LogConsultasLentas(engine, limite_ms=0).registrar()
+    try:
+        with caplog.at_level(logging.WARNING, logger="aureus.consultas_lentas"), engine.connect() as conexao:
+            try:
+                conexao.execute(text("SELECT * FROM tabela_que_nao_existe"))
+            except Exception:
+                conexao.rollback()
+            assert conexao.execute(text("SELECT 42")).scalar() == 42
+            assert not [chave for chave in conexao.info if "inicio" in str(chave)]
+    finally:
+        log.remover()
+    registros = [json.loads(r.getMessage()) for r in caplog.records if r.name == "aureus.consultas_lentas"]
+    assert [r["statement"] for r in registros if r["statement"] != "BEGIN"] == ["SELECT 42"]
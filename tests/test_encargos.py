@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+
+from models import Financeiro, Parcela
+from servicos.encargos import acumular_encargos, calcular_encargos, expressoes_encargos, filtro_vencidas
+
+
+def _vencer_parcelas(db_session, id_contrato, dias_atras: int, quantas: int = 2):
+    """Move o vencimento das primeiras parcelas para o passado e ativa o contrato"""
+    parcelas = db_session.query(Parcela).join(Financeiro).filter(
+        Financeiro.id_contrato == id_contrato
+    ).order_by(Parcela.numero_parcela).all()
+    for parcela in parcelas[:quantas]:
+        parcela.data_vencimento = date.today() - timedelta(days=dias_atras)
+    parcelas[0].financeiro.contrato.status = "ativo"
+    db_session.flush()
+    return parcelas[:quantas]
+
+
+def test_calculo_em_python_e_no_banco_coincidem(db_session, contrato_cliente):
+    hoje = date.today()
+    _vencer_parcelas(db_session, contrato_cliente, dias_atras=45)
+
+    # 2% de multa e 1% ao mês pro rata: 4500 * 0.02 = 90 e 4500 * 0.01 / 30 * 45 = 67.5
+    assert calcular_encargos([4500, 4500], [hoje - timedelta(days=45), hoje + timedelta(days=1)], hoje) == [
+        (45, 90.0, 67.5), (0, 0.0, 0.0)
+    ]
+
+    multa, juros = expressoes_encargos(hoje, db_session.get_bind().dialect.name)
+    linhas = db_session.query(Parcela.valor_parcela, Parcela.data_vencimento, multa, juros).join(Financeiro).filter(
+        Financeiro.id_contrato == contrato_cliente, filtro_vencidas(hoje)
+    ).all()
+    assert len(linhas) == 2
+    esperado = calcular_encargos([l[0] for l in linhas], [l[1] for l in linhas], hoje)
+    assert [(float(l[2]), float(l[3])) for l in linhas] == [(m, j) for _, m, j in esperado]
+
+
+def test_contrato_mostra_valor_atualizado(client, token_cliente, db_session, contrato_cliente):
+    _vencer_parcelas(db_session, contrato_cliente, dias_atras=30, quantas=1)
+
+    response = client.get(f"/cliente/contrato/{contrato_cliente}", headers={"Authorization": f"Bearer {token_cliente}"})
+    assert response.status_code == 200, response.text
+    financeiro = response.json()["financeiro"]
+    vencida, a_vencer = financeiro["parcelas"][:2]
+    assert vencida["dias_atraso"] == 30
+    assert vencida["valor_atualizado"] == pytest.approx(4500 + 90 + 45)
+    assert a_vencer["valor_atualizado"] is None
+    assert financeiro["valor_em_atraso_atualizado"] == vencida["valor_atualizado"]
+
+
+def test_dashboard_soma_valor_atualizado(client, token_admin, db_session, contrato_cliente):
+    _vencer_parcelas(db_session, contrato_cliente, dias_atras=60)
+
+    metricas = client.get("/admin/dashboard/metrics", headers={"Authorization": f"Bearer {token_admin}"}).json()
+    assert metricas["parcelas_em_atraso_qtd"] >= 2
+    # cada parcela vencida há 60 dias soma 90 de multa e 90 de juros
+    assert metricas["parcelas_em_atraso_valor_atualizado"] >= metricas["parcelas_em_atraso_valor"] + 2 * 180 - 0.01
+
+
+def test_lote_grava_encargos_por_faixa(db_session, contrato_cliente):
+    vencidas = _vencer_parcelas(db_session, contrato_cliente, dias_atras=10)
+    faixas = []
+
+    atualizadas = acumular_encargos(db_session, tamanho_lote=1, progresso=lambda feitas, total: faixas.append(feitas))
+    assert atualizadas >= 2
+    assert len(faixas) >= 2 and faixas == sorted(faixas)
+
+    db_session.expire_all()
+    for parcela in vencidas:
+        assert float(parcela.valor_multa) == 90.0
+        assert float(parcela.valor_juros) == 15.0
+        assert parcela.data_calculo_encargos == date.today()
@@ -0,0 +1,53 @@
+import re
+
+import pytest
+
+from servicos.estado_contrato import transicionar_contrato, transicao_permitida
+
+
+def test_aprovar_e_processar_de_novo(client, token_admin, contrato_cliente):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+
+    response = client.put(f"/admin/solicitacao/{contrato_cliente}/aprovar", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "ativo"
+
+    # a segunda tentativa (ex.: outro admin ao mesmo tempo) não altera nada
+    response = client.put(f"/admin/solicitacao/{contrato_cliente}/rejeitar", headers=headers)
+    assert response.status_code == 400
+    assert "Status atual: ativo" in response.json()["detail"]
+
+
+def test_rejeitar_contrato_inexistente(client, token_admin):
+    response = client.put("/admin/solicitacao/999999/rejeitar", headers={"Authorization": f"Bearer {token_admin}"})
+    assert response.status_code == 404
+
+
+def test_transicao_e_um_unico_update(client, token_admin, contrato_cliente, contar_queries):
+    with contar_queries() as queries:
+        client.put(f"/admin/solicitacao/{contrato_cliente}/aprovar", headers={"Authorization": f"Bearer {token_admin}"})
+
+    # statements sobre a tabela contrato (o evento do painel lê o financeiro pelo id_contrato)
+    sobre_contrato = [s for s in queries.statements if re.search(r"\b(from|update|into)\s+contrato\b", s, re.I)]
+    assert len(sobre_contrato) == 1
+    assert sobre_contrato[0].startswith("UPDATE contrato")
+    assert "status = ?" in sobre_contrato[0].split("WHERE")[1]
+
+
+def test_transicao_invalida_cache_do_contrato(client, token_admin, contrato_cliente):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+    assert client.get(f"/admin/contrato/{contrato_cliente}", headers=headers).json()["status"] == "pendente"
+
+    client.put(f"/admin/solicitacao/{contrato_cliente}/aprovar", headers=headers)
+
+    response = client.get(f"/admin/contrato/{contrato_cliente}", headers=headers)
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json()["status"] == "ativo"
+
+
+def test_transicoes_previstas(db_session, contrato_cliente):
+    assert transicao_permitida("pendente", "ativo")
+    assert transicao_permitida("ativo", "quitado")
+    assert not transicao_permitida("rejeitado", "ativo")
+    with pytest.raises(ValueError):
+        transicionar_contrato(db_session, contrato_cliente, "pendente", "quitado")
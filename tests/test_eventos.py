@@ -0,0 +1,94 @@
+import asyncio
+import re
+import threading
+
+import pytest
+
+from servicos.eventos import BarramentoEventos, barramento
+
+
+@pytest.fixture
+def inscricao_admin():
+    loop = asyncio.new_event_loop()
+    inscricao = barramento.inscrever({"admin"}, loop=loop)
+
+    def proximo(timeout=1.0):
+        return loop.run_until_complete(inscricao.proximo(timeout))
+
+    yield proximo
+    barramento.cancelar(inscricao)
+    loop.close()
+
+
+def test_barramento_entrega_por_topico_entre_threads():
+    loop = asyncio.new_event_loop()
+    local = BarramentoEventos()
+    inscricao = local.inscrever({"admin"}, loop=loop, capacidade=2)
+
+    publicador = threading.Thread(target=lambda: [
+        local.publicar("cliente:1", "status", {"n": 0}),
+        *(local.publicar("admin", "solicitacao", {"n": n}) for n in range(1, 4)),
+    ])
+    publicador.start()
+    publicador.join()
+
+    # fila cheia: o mais antigo é descartado, o outro tópico nunca chega
+    recebidos = [loop.run_until_complete(inscricao.proximo(0.5)) for _ in range(2)]
+    assert [evento.dados["n"] for evento in recebidos] == [2, 3]
+    assert inscricao.descartados == 1
+    assert loop.run_until_complete(inscricao.proximo(0.05)) is None
+
+    local.cancelar(inscricao)
+    assert local.total_inscritos() == 0
+    loop.close()
+
+
+def test_aprovar_publica_apos_commit(client, token_admin, contrato_cliente, inscricao_admin):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+    assert client.put(f"/admin/solicitacao/{contrato_cliente}/aprovar", headers=headers).status_code == 200
+
+    evento = inscricao_admin()
+    assert evento.tipo == "solicitacao"
+    assert evento.dados["acao"] == "aprovada"
+    assert evento.dados["delta_metricas"] == {
+        "solicitacoes_pendentes": -1, "contratos_ativos": 1, "valor_total_financiado": 54000.0
+    }
+
+    # a segunda aprovação falha na transição: nada é publicado
+    assert client.put(f"/admin/solicitacao/{contrato_cliente}/aprovar", headers=headers).status_code == 400
+    assert inscricao_admin(0.1) is None
+
+
+def test_rejeitar_publica_motivo(client, token_admin, contrato_cliente, inscricao_admin):
+    response = client.put(
+        f"/admin/solicitacao/{contrato_cliente}/rejeitar",
+        json={"motivo": "Renda insuficiente"},
+        headers={"Authorization": f"Bearer {token_admin}"}
+    )
+    assert response.status_code == 200
+
+    evento = inscricao_admin()
+    assert evento.dados["acao"] == "rejeitada"
+    assert evento.dados["motivo"] == "Renda insuficiente"
+
+
+def test_stream_sse_admin(client, token_admin, contrato_cliente):
+    timer = threading.Timer(0.3, barramento.publicar, ("admin", "solicitacao", {"acao": "criada", "id_contrato": 1}))
+    timer.start()
+    response = client.get("/admin/eventos", headers={"Authorization": f"Bearer {token_admin}"})
+    timer.join()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocos = response.text.split("\n\n")
+    assert blocos[0] == "retry: 3000"
+    assert re.match(r"id: \d+\nevent: metricas\n", blocos[1])
+    assert '"solicitacoes_pendentes": 1' in blocos[1]
+    assert any(bloco.startswith("id: ") and "event: solicitacao" in bloco for bloco in blocos[2:])
+    assert ": keep-alive" in blocos
+    assert barramento.total_inscritos() == 0
+
+
+def test_stream_sse_exige_admin(client, token_cliente):
+    response = client.get("/admin/eventos", headers={"Authorization": f"Bearer {token_cliente}"})
+    assert response.status_code == 403
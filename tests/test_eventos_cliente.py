@@ -0,0 +1,62 @@
+import threading
+
+from servicos.eventos import barramento
+from servicos.eventos_cliente import topico_cliente
+
+
+def _aguardar(client, token, **params):
+    response = client.get("/cliente/eventos/aguardar", params=params, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_long_poll_entrega_rejeicao_com_motivo(client, token_cliente, token_admin, contrato_cliente, cliente_id):
+    inicial = _aguardar(client, token_cliente)
+    assert inicial["eventos"][0]["tipo"] == "contratos"
+    assert inicial["eventos"][0]["dados"]["contratos"][0]["status"] == "pendente"
+
+    response = client.put(
+        f"/admin/solicitacao/{contrato_cliente}/rejeitar",
+        json={"motivo": "Comprometimento de renda acima do limite"},
+        headers={"Authorization": f"Bearer {token_admin}"}
+    )
+    assert response.status_code == 200
+
+    # o evento foi publicado antes da chamada: vem do histórico, sem esperar o timeout
+    resposta = _aguardar(client, token_cliente, desde=inicial["ultimo_id"], timeout=5)
+    [evento] = resposta["eventos"]
+    assert evento["tipo"] == "status_solicitacao"
+    assert evento["dados"]["id_contrato"] == contrato_cliente
+    assert evento["dados"]["status"] == "rejeitado"
+    assert evento["dados"]["motivo"] == "Comprometimento de renda acima do limite"
+    assert resposta["ultimo_id"] == evento["id"]
+
+    # eventos de outros clientes não chegam
+    barramento.publicar(topico_cliente(cliente_id + 1), "status_solicitacao", {"id_contrato": 0})
+    vazio = _aguardar(client, token_cliente, desde=evento["id"], timeout=0.2)
+    assert vazio["eventos"] == []
+    assert vazio["ultimo_id"] >= evento["id"]
+
+    # o motivo fica gravado no contrato
+    contratos = client.get(f"/cliente/contratos/{cliente_id}", headers={"Authorization": f"Bearer {token_cliente}"}).json()
+    assert contratos["contratos"][0]["motivo_status"] == "Comprometimento de renda acima do limite"
+
+
+def test_long_poll_com_id_desconhecido_reenvia_snapshot(client, token_cliente, contrato_cliente):
+    resposta = _aguardar(client, token_cliente, desde=barramento.ultimo_id() + 1000, timeout=5)
+    assert [evento["tipo"] for evento in resposta["eventos"]] == ["contratos"]
+
+
+def test_stream_sse_cliente(client, token_cliente, token_admin, contrato_cliente, cliente_id):
+    aprovar = threading.Timer(0.3, client.put, (f"/admin/solicitacao/{contrato_cliente}/aprovar",), {
+        "headers": {"Authorization": f"Bearer {token_admin}"}
+    })
+    aprovar.start()
+    response = client.get("/cliente/eventos", headers={"Authorization": f"Bearer {token_cliente}"})
+    aprovar.join()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocos = response.text.split("\n\n")
+    assert "event: contratos" in blocos[1]
+    [aprovacao] = [bloco for bloco in blocos if "event: status_solicitacao" in bloco]
+    assert '"status": "ativo"' in aprovacao
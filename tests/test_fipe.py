@@ -0,0 +1,113 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from servicos.fipe import (
+    carregar_tabela_fipe, IndiceFipe, definir_indice_fipe, converter_valor_fipe, normalizar_codigo_fipe
+)
+
+
+@pytest.fixture
+def indice_fipe(tmp_path):
+    arquivo = tmp_path / "fipe.csv"
+    arquivo.write_text(
+        "CodigoFipe;Marca;Modelo;AnoModelo;Combustivel;Valor;MesReferencia\n"
+        "001004-9;Fiat;Uno Mille 1.0;2024;Gasolina;R$ 45.000,00;outubro de 2025\n"
+        "0010049;Fiat;Uno Mille 1.0;2023;Gasolina;R$ 41.500,50;outubro de 2025\n",
+        encoding="utf-8"
+    )
+    caminho = str(tmp_path / "fipe.db")
+    assert carregar_tabela_fipe(str(arquivo), caminho) == 2
+    indice = IndiceFipe(caminho)
+    definir_indice_fipe(indice)
+    yield indice
+    definir_indice_fipe(None)
+
+
+def test_conversoes_fipe():
+    assert converter_valor_fipe("R$ 45.678,90") == Decimal("45678.90")
+    assert normalizar_codigo_fipe("0010049") == "001004-9"
+    with pytest.raises(ValueError):
+        normalizar_codigo_fipe("123")
+
+
+def test_busca_no_indice(indice_fipe):
+    referencia = indice_fipe.buscar("001004-9", 2023)
+    assert referencia.marca == "Fiat"
+    assert referencia.valor == Decimal("41500.50")
+    assert indice_fipe.buscar("001004-9", 2010) is None
+
+
+def test_rota_consulta_fipe(client, token_cliente, indice_fipe):
+    response = client.get(
+        "/cliente/fipe/001004-9/2024",
+        headers={"Authorization": f"Bearer {token_cliente}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["modelo"] == "Uno Mille 1.0"
+    assert response.json()["valor"] == 45000.0
+
+
+def test_solicitacao_acima_do_valor_fipe_rejeitada(client, token_cliente, cliente_id, indice_fipe):
+    dados_solicitacao = {
+        "id_cliente": cliente_id,
+        "informacoesFipe": {"CodigoFipe": "001004-9", "Valor": "R$ 45.000,00"},
+        "anoSelecionado": "2024-1",
+        "veiculo": {"placa": "FIP1E23", "numChassi": "9BWFIPE0000000001", "numRenavam": "88888888801"},
+        "financeiro": {"valorVeiculo": 90000.0, "parcelasSelecionadas": 12, "taxaJuros": 1.5}
+    }
+    response = client.post(
+        "/cliente/solicitacao",
+        json=dados_solicitacao,
+        headers={"Authorization": f"Bearer {token_cliente}"}
+    )
+    assert response.status_code == 400
+    assert "FIPE" in response.json()["detail"]
+
+
+def _solicitacao(cliente_id, sufixo, informacoes_fipe, ano, valor):
+    return {
+        "id_cliente": cliente_id,
+        "informacoesFipe": informacoes_fipe,
+        "anoSelecionado": ano,
+        "veiculo": {"placa": f"FIP{sufixo}E23", "numChassi": f"9BWFIPE000000000{sufixo}", "numRenavam": f"8888888880{sufixo}"},
+        "financeiro": {"valorVeiculo": valor, "parcelasSelecionadas": 12, "taxaJuros": 1.5}
+    }
+
+
+def test_solicitacao_sem_referencia_fipe_rejeitada(client, token_cliente, cliente_id, indice_fipe):
+    headers = {"Authorization": f"Bearer {token_cliente}"}
+    casos = [
+        (None, "2024-1"),                           # sem informacoesFipe
+        ({"CodigoFipe": "xyz"}, "2024-1"),          # código inválido
+        ({"CodigoFipe": "001004-9"}, "2010-1"),     # par (código, ano) fora do dump
+    ]
+    for i, (informacoes, ano) in enumerate(casos, start=2):
+        response = client.post("/cliente/solicitacao", json=_solicitacao(cliente_id, i, informacoes, ano, 1000.0), headers=headers)
+        assert response.status_code == 400, (informacoes, ano)
+        assert "FIPE" in response.json()["detail"]
+
+
+def test_solicitacao_zero_km_usa_ano_corrente(client, token_cliente, cliente_id, tmp_path):
+    arquivo = tmp_path / "fipe.csv"
+    arquivo.write_text(
+        "CodigoFipe;Marca;Modelo;AnoModelo;Combustivel;Valor;MesReferencia\n"
+        "001004-9;Fiat;Uno Mille 1.0;32000;Gasolina;R$ 50.000,00;outubro de 2025\n",
+        encoding="utf-8"
+    )
+    caminho = str(tmp_path / "fipe.db")
+    carregar_tabela_fipe(str(arquivo), caminho)
+    definir_indice_fipe(IndiceFipe(caminho))
+    headers = {"Authorization": f"Bearer {token_cliente}"}
+    try:
+        acima = client.post("/cliente/solicitacao", json=_solicitacao(cliente_id, 5, {"CodigoFipe": "001004-9"}, "32000-1", 90000.0), headers=headers)
+        assert acima.status_code == 400 and "50000.00" in acima.json()["detail"]
+
+        response = client.post("/cliente/solicitacao", json=_solicitacao(cliente_id, 6, {"CodigoFipe": "001004-9"}, "32000-1", 50000.0), headers=headers)
+        assert response.status_code in (200, 201), response.text
+    finally:
+        definir_indice_fipe(None)
+
+    veiculo = client.get(f"/cliente/contrato/{response.json()['id_contrato']}", headers=headers).json()["veiculo"]
+    assert veiculo["ano_modelo"] == veiculo["ano_fabricacao"] == date.today().year
+    assert veiculo["modelo"] == "Uno Mille 1.0"
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+import pytest
+
+from models import Financeiro, Parcela
+from servicos.fluxo_caixa import CenarioFluxoCaixa, projetar_fluxo_caixa
+
+HOJE = date(2025, 1, 15)
+SEM_RISCO = CenarioFluxoCaixa(taxa_inadimplencia=0, taxa_inadimplencia_atrasados=0, taxa_prepagamento=0, taxa_recuperacao=0)
+
+
+def test_sem_risco_o_esperado_e_o_contratual():
+    linhas = [(date(2025, 1, 20), False, 100), (date(2025, 3, 1), True, 50), (date(2025, 3, 31), False, 25)]
+    projecao = projetar_fluxo_caixa(linhas, HOJE, 6, SEM_RISCO)
+
+    assert [m.competencia for m in projecao.meses[:3]] == ["2025-01", "2025-02", "2025-03"]
+    assert [m.valor_esperado for m in projecao.meses[:3]] == [100, 0, 75]
+    assert projecao.total_esperado == projecao.total_contratual == 175
+
+
+def test_prepagamento_antecipa_sem_perder_valor():
+    linhas = [(date(2025, 1 + i, 20), False, 100) for i in range(6)]
+    cenario = CenarioFluxoCaixa(taxa_inadimplencia=0, taxa_prepagamento=0.1, taxa_recuperacao=0)
+    projecao = projetar_fluxo_caixa(linhas, HOJE, 6, cenario)
+
+    assert projecao.meses[0].valor_esperado > 100
+    assert projecao.total_esperado == pytest.approx(600)
+
+
+def test_inadimplencia_e_vencidas():
+    linhas = [(date(2024, 12, 1), False, 200), (date(2025, 2, 1), False, 100), (date(2025, 2, 1), True, 100)]
+    cenario = CenarioFluxoCaixa(taxa_inadimplencia=0.1, taxa_inadimplencia_atrasados=0.5, taxa_prepagamento=0, taxa_recuperacao=0.25)
+    projecao = projetar_fluxo_caixa(linhas, HOJE, 3, cenario)
+
+    assert projecao.valor_vencido == 200
+    assert projecao.meses[0].valor_esperado == 50  # 25% das vencidas
+    # mês 1: em dia sobrevive 0.9 e paga 0.9; inadimplente sobrevive 0.5 e paga 0.5
+    assert projecao.meses[1].valor_esperado == pytest.approx(100 * 0.9 * 0.9 + 100 * 0.5 * 0.5)
+
+
+def test_endpoint_fluxo_caixa(client, token_admin, db_session, fabrica_contratos):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+    id_contrato = fabrica_contratos(1, status="ativo")[0]
+    fabrica_contratos(1, status="pendente")
+
+    financeiro = db_session.query(Financeiro).filter(Financeiro.id_contrato == id_contrato).first()
+    parcela = db_session.query(Parcela).filter(Parcela.id_financeiro == financeiro.id_financeiro, Parcela.numero_parcela == 1).first()
+    parcela.data_vencimento = date.today() - timedelta(days=5)
+    db_session.commit()
+
+    response = client.get(
+        "/admin/relatorios/fluxo-caixa?taxa_inadimplencia=0&taxa_prepagamento=0&taxa_recuperacao=1", headers=headers
+    )
+    assert response.status_code == 200
+    projecao = response.json()
+    assert len(projecao["meses"]) == 72
+    assert projecao["valor_vencido"] == 4500.0
+    assert projecao["total_contratual"] == 11 * 4500.0
+    assert projecao["total_esperado"] == 12 * 4500.0
+
+    assert client.get("/admin/relatorios/fluxo-caixa?taxa_prepagamento=2", headers=headers).status_code == 422
@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, func, select
+
+from models import Base, Cliente, Contrato, Parcela, Veiculo
+from scripts.gerar_dados import gerar_carteira, gerar_cpf, gerar_placa, gerar_renavam, gerar_chassi
+
+
+def cpf_valido(cpf: str) -> bool:
+    digitos = [int(d) for d in cpf]
+    for tamanho in (9, 10):
+        soma = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos[:tamanho]))
+        resto = (soma * 10) % 11
+        if (0 if resto == 10 else resto) != digitos[tamanho]:
+            return False
+    return True
+
+
+def test_documentos_validos_e_unicos():
+    cpfs = {gerar_cpf(n) for n in range(1, 5001)}
+    assert len(cpfs) == 5000
+    assert all(cpf_valido(cpf) for cpf in cpfs)
+    assert len({gerar_placa(n) for n in range(5000)}) == 5000
+    assert len({gerar_chassi(n) for n in range(5000)}) == 5000
+    assert gerar_placa(0) == "AAA0A00"
+    assert len(gerar_renavam(123)) == 11
+
+
+def _gerar(caminho):
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    gerar_carteira(engine, clientes=20, contratos=50, parcelas=(12, 24), semente=7, tamanho_lote=100)
+    return engine
+
+
+def test_carteira_reproduzivel_e_consistente(tmp_path):
+    engine_a = _gerar(tmp_path / "a.db")
+    engine_b = _gerar(tmp_path / "b.db")
+
+    with engine_a.connect() as a, engine_b.connect() as b:
+        assert a.execute(select(func.count()).select_from(Cliente)).scalar() == 20
+        assert a.execute(select(func.count()).select_from(Contrato)).scalar() == 50
+
+        consulta = select(Parcela.id_financeiro, Parcela.numero_parcela, Parcela.valor_parcela, Parcela.status).order_by(Parcela.id_parcela)
+        assert a.execute(consulta).all() == b.execute(consulta).all()
+
+        # todo contrato tem veículo e cliente existentes
+        orfaos = a.execute(
+            select(func.count()).select_from(Contrato)
+            .outerjoin(Veiculo, Veiculo.id_veiculo == Contrato.id_veiculo)
+            .outerjoin(Cliente, Cliente.id_cliente == Contrato.id_cliente)
+            .where((Veiculo.id_veiculo == None) | (Cliente.id_cliente == None))
+        ).scalar()
+        assert orfaos == 0
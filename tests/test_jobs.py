@@ -0,0 +1,113 @@
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Financeiro, Job, Parcela
+from servicos.jobs import tarefa, enfileirar_job, executar_proximo_job, cancelar_job, recuperar_jobs_orfaos
+
+
+@tarefa("teste_cancela_a_si_mesmo")
+def _cancela_a_si_mesmo(contexto):
+    with contexto.session_factory() as session:
+        cancelar_job(session, contexto.id_job)
+        session.commit()
+    contexto.progresso(50)
+    return {"nao": "deveria chegar aqui"}
+
+
+@tarefa("teste_falha")
+def _falha(contexto):
+    raise RuntimeError("erro proposital")
+
+
+@tarefa("teste_longo_sem_progresso")
+def _longo_sem_progresso(contexto, espera, limite):
+    # Passa do limite de órfão sem chamar progresso(); só o heartbeat da execução a mantém viva
+    time.sleep(espera)
+    return {"recuperados": recuperar_jobs_orfaos(contexto.session_factory, timedelta(seconds=limite))}
+
+
+def _enfileirar(db_session, tipo):
+    job = enfileirar_job(db_session, tipo)
+    db_session.commit()
+    return job.id_job
+
+
+def test_recalcular_atrasos_responde_202_e_executa(client, token_admin, db_session, fabrica_contratos):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+    id_contrato = fabrica_contratos(1, status="ativo")[0]
+    financeiro = db_session.query(Financeiro).filter(Financeiro.id_contrato == id_contrato).first()
+    for parcela in db_session.query(Parcela).filter(Parcela.id_financeiro == financeiro.id_financeiro, Parcela.numero_parcela <= 3):
+        parcela.data_vencimento = date.today() - timedelta(days=10)
+    db_session.commit()
+
+    response = client.post("/admin/parcelas/recalcular-atrasos", headers=headers)
+    assert response.status_code == 202
+    id_job = response.json()["id_job"]
+    assert response.json()["url_status"] == f"/admin/jobs/{id_job}"
+    assert client.get(f"/admin/jobs/{id_job}", headers=headers).json()["status"] == "pendente"
+
+    assert executar_proximo_job(client.app.state.session_factory, "teste") == id_job
+
+    job = client.get(f"/admin/jobs/{id_job}", headers=headers).json()
+    assert job["status"] == "concluido"
+    assert job["progresso"] == 100
+    assert job["resultado"]["parcelas_atualizadas"] == 3
+    assert db_session.query(Parcela).filter(
+        Parcela.id_financeiro == financeiro.id_financeiro, Parcela.status == "atrasada"
+    ).count() == 3
+
+
+def test_cancelar_job_pendente(client, token_admin, db_session):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+    id_job = _enfileirar(db_session, "recalcular_atrasos")
+
+    response = client.post(f"/admin/jobs/{id_job}/cancelar", headers=headers)
+    assert response.json()["status"] == "cancelado"
+    assert executar_proximo_job(client.app.state.session_factory, "teste") is None
+
+    response = client.post(f"/admin/jobs/{id_job}/cancelar", headers=headers)
+    assert response.status_code == 400
+
+
+def test_cancelamento_durante_execucao(client, token_admin, db_session):
+    id_job = _enfileirar(db_session, "teste_cancela_a_si_mesmo")
+    executar_proximo_job(client.app.state.session_factory, "teste")
+
+    job = client.get(f"/admin/jobs/{id_job}", headers={"Authorization": f"Bearer {token_admin}"}).json()
+    assert job["status"] == "cancelado"
+    assert job["resultado"] is None
+
+
+def test_job_com_erro(client, token_admin, db_session):
+    id_job = _enfileirar(db_session, "teste_falha")
+    executar_proximo_job(client.app.state.session_factory, "teste")
+
+    job = client.get(f"/admin/jobs/{id_job}", headers={"Authorization": f"Bearer {token_admin}"}).json()
+    assert job["status"] == "falhou"
+    assert job["erro"] == "erro proposital"
+
+
+def test_job_inexistente(client, token_admin):
+    assert client.get("/admin/jobs/999999", headers={"Authorization": f"Bearer {token_admin}"}).status_code == 404
+
+
+def test_job_longo_sem_progresso_nao_volta_para_a_fila(tmp_path):
+    # Banco próprio: o heartbeat roda numa thread e precisa de conexão separada da tarefa
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    fabrica = sessionmaker(bind=engine)
+    with fabrica() as session:
+        id_job = enfileirar_job(session, "teste_longo_sem_progresso", {"espera": 0.6, "limite": 0.3}).id_job
+        session.commit()
+
+    assert executar_proximo_job(fabrica, "teste", intervalo_heartbeat=0.05) == id_job
+
+    with fabrica() as session:
+        job = session.get(Job, id_job)
+        assert job.status == "concluido"
+        assert job.resultado == '{"recuperados": 0}'
+    engine.dispose()
+
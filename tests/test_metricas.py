@@ -0,0 +1,66 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from servicos.metricas import Contador, Histograma, exportar_metricas, registrar_gauges_pool
+
+
+def test_endpoint_metrics(client, usuario_cliente):
+    client.post("/auth/login", json={"login": "cliente_teste", "senha": "senha123"})
+    client.post("/auth/login", json={"login": "cliente_teste", "senha": "errada"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    texto = response.text
+    assert 'aureus_http_requisicoes_total{metodo="POST",rota="/auth/login",status="200"}' in texto
+    assert 'aureus_http_latencia_segundos_bucket{metodo="POST",rota="/auth/login",le="+Inf"}' in texto
+    assert 'aureus_logins_total{resultado="sucesso"}' in texto
+    assert 'aureus_logins_total{resultado="senha_invalida"}' in texto
+    assert "aureus_http_requisicoes_em_andamento" in texto
+
+
+def test_rate_limit_contabilizado(client, usuario_cliente):
+    for _ in range(6):
+        response = client.post("/auth/login", json={"login": "x", "senha": "y"})
+    assert response.status_code == 429
+    assert 'aureus_rate_limit_rejeicoes_total{rota="/auth/login"}' in client.get("/metrics").text
+
+
+def test_histograma_acumula_buckets():
+    histograma = Histograma("teste_latencia", "teste", ("rota",), buckets=(0.1, 1.0))
+    histograma.observar(0.05, "/a")
+    histograma.observar(0.5, "/a")
+    histograma.observar(5.0, "/a")
+    linhas = histograma.exportar()
+    assert 'teste_latencia_bucket{rota="/a",le="0.1"} 1' in linhas
+    assert 'teste_latencia_bucket{rota="/a",le="1"} 2' in linhas
+    assert 'teste_latencia_bucket{rota="/a",le="+Inf"} 3' in linhas
+    assert 'teste_latencia_count{rota="/a"} 3' in linhas
+
+
+def test_contador_soma_threads():
+    import threading
+    contador = Contador("teste_total", "teste")
+    threads = [threading.Thread(target=lambda: [contador.inc() for _ in range(1000)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert contador.valores()[()] == 4000
+
+
+def test_overflow_do_pool_nunca_negativo(app_teste, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=5, max_overflow=2)
+    registrar_gauges_pool(engine)
+    try:
+        assert "aureus_db_pool_overflow 0\n" in exportar_metricas()
+        conexoes = [engine.connect() for _ in range(6)]
+        texto = exportar_metricas()
+        assert "aureus_db_pool_em_uso 6\n" in texto
+        assert "aureus_db_pool_overflow 1\n" in texto
+        for conexao in conexoes:
+            conexao.close()
+    finally:
+        registrar_gauges_pool(app_teste.state.engine)
+        engine.dispose()
@@ -0,0 +1,59 @@
+from models import Parcela, Financeiro
+
+
+def test_minha_conta(client, token_cliente, db_session, fabrica_contratos):
+    ids = fabrica_contratos(2, status="ativo")
+    financeiro = db_session.query(Financeiro).filter(Financeiro.id_contrato == ids[0]).first()
+    db_session.query(Parcela).filter(
+        Parcela.id_financeiro == financeiro.id_financeiro, Parcela.numero_parcela <= 2
+    ).update({"status": "paga"})
+    db_session.commit()
+
+    response = client.get("/cliente/me", headers={"Authorization": f"Bearer {token_cliente}"})
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["cliente"]["nome"] == "Cliente Teste"
+    assert data["endereco"]["cidade"]
+    assert data["total_contratos"] == 2
+    primeiro, segundo = data["contratos"]
+    assert primeiro["parcelas_pagas"] == 2
+    assert primeiro["proxima_parcela"]["numero_parcela"] == 3
+    assert primeiro["saldo_devedor"] == 10 * 4500.0
+    assert segundo["proxima_parcela"]["numero_parcela"] == 1
+    assert data["saldo_devedor_total"] == 22 * 4500.0
+
+
+def test_minha_conta_queries_fixas(client, token_cliente, fabrica_contratos, contar_queries):
+    headers = {"Authorization": f"Bearer {token_cliente}"}
+    fabrica_contratos(1)
+    with contar_queries() as poucos:
+        client.get("/cliente/me", headers=headers)
+    fabrica_contratos(5)
+    with contar_queries() as muitos:
+        assert len(client.get("/cliente/me", headers=headers).json()["contratos"]) == 6
+
+    # usuário do token + perfil + contratos
+    assert len(poucos) == len(muitos) == 3
+
+
+def test_minha_conta_get_condicional(client, token_cliente, db_session, contrato_cliente):
+    headers = {"Authorization": f"Bearer {token_cliente}"}
+    response = client.get("/cliente/me", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = client.get("/cliente/me", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    parcela = db_session.query(Parcela).filter(Parcela.numero_parcela == 1).first()
+    parcela.status = "paga"
+    db_session.commit()
+
+    response = client.get("/cliente/me", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_minha_conta_sem_token(client):
+    assert client.get("/cliente/me").status_code == 401
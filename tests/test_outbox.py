@@ -0,0 +1,108 @@
+import json
+from datetime import date, datetime, timedelta
+
+from models import Financeiro, Outbox, Parcela
+from servicos.jobs import enfileirar_job, executar_proximo_job
+from servicos.outbox import (
+    MAX_TENTATIVAS_OUTBOX, Remetente, despachar_lote, drenar_outbox, enfileirar_lembretes_vencimento
+)
+
+
+class RemetenteTeste(Remetente):
+    """Guarda as mensagens enviadas e falha para os destinatários em 'falhar'"""
+
+    def __init__(self, falhar=()):
+        self.enviadas = []
+        self.falhar = set(falhar)
+
+    def enviar(self, mensagem):
+        if mensagem["destinatario"] in self.falhar:
+            raise ConnectionError("provedor indisponível")
+        self.enviadas.append(mensagem)
+
+
+def _outbox(db_session, tipo=None):
+    db_session.expire_all()
+    consulta = db_session.query(Outbox).order_by(Outbox.id_outbox)
+    return consulta.filter(Outbox.tipo == tipo).all() if tipo else consulta.all()
+
+
+def test_aprovacao_grava_mensagem_na_mesma_transacao(client, token_admin, db_session, contrato_cliente):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+    assert client.put(f"/admin/solicitacao/{contrato_cliente}/aprovar", headers=headers).status_code == 200
+
+    [mensagem] = _outbox(db_session, "status_solicitacao")
+    assert mensagem.destinatario == "cliente@teste.com"
+    assert mensagem.status == "pendente"
+    assert json.loads(mensagem.payload)["status"] == "ativo"
+
+    # transição recusada: nada é gravado
+    assert client.put(f"/admin/solicitacao/{contrato_cliente}/rejeitar", headers=headers).status_code == 400
+    assert len(_outbox(db_session, "status_solicitacao")) == 1
+
+
+def test_lembretes_de_vencimento_sem_duplicar(db_session, contrato_cliente):
+    hoje = date.today()
+    parcelas = db_session.query(Parcela).join(Financeiro).filter(
+        Financeiro.id_contrato == contrato_cliente
+    ).order_by(Parcela.numero_parcela).all()
+    parcelas[0].data_vencimento = hoje + timedelta(days=2)
+    parcelas[1].data_vencimento = hoje + timedelta(days=3)
+    db_session.flush()
+
+    # contrato ainda pendente: sem lembretes
+    assert enfileirar_lembretes_vencimento(db_session, dias=3, hoje=hoje) == 0
+
+    parcelas[0].financeiro.contrato.status = "ativo"
+    db_session.flush()
+    assert enfileirar_lembretes_vencimento(db_session, dias=3, hoje=hoje) == 2
+    assert enfileirar_lembretes_vencimento(db_session, dias=3, hoje=hoje) == 0
+
+    lembretes = _outbox(db_session, "lembrete_vencimento")
+    assert [json.loads(m.payload)["numero_parcela"] for m in lembretes] == [1, 2]
+
+
+def test_despachante_reenvia_com_backoff_e_desiste(client, db_session, contrato_cliente):
+    session_factory = client.app.state.session_factory
+    agora = datetime.now()
+    for destinatario in ("ok@teste.com", "falha@teste.com"):
+        db_session.add(Outbox(tipo="teste", canal="email", destinatario=destinatario, payload="{}",
+                              status="pendente", tentativas=0, proxima_tentativa=agora, criado_em=agora))
+    db_session.commit()
+
+    remetente = RemetenteTeste(falhar={"falha@teste.com"})
+    assert despachar_lote(session_factory, remetente) == {"enviadas": 1, "falhas": 1, "descartadas": 0}
+    assert [m["destinatario"] for m in remetente.enviadas] == ["ok@teste.com"]
+
+    enviada, com_falha = _outbox(db_session, "teste")
+    assert enviada.status == "enviado" and enviada.enviado_em is not None
+    assert com_falha.status == "pendente" and com_falha.tentativas == 1
+    assert com_falha.proxima_tentativa > datetime.now()
+    assert "provedor indisponível" in com_falha.erro
+
+    # ainda em backoff: nada a enviar
+    assert drenar_outbox(session_factory, remetente)["lotes"] == 0
+
+    # última tentativa falha: a mensagem fica como 'falhou'
+    com_falha.tentativas = MAX_TENTATIVAS_OUTBOX - 1
+    com_falha.proxima_tentativa = datetime.now() - timedelta(seconds=1)
+    db_session.commit()
+    assert despachar_lote(session_factory, remetente)["descartadas"] == 1
+    assert _outbox(db_session, "teste")[1].status == "falhou"
+
+
+def test_job_despacha_para_arquivo(client, db_session, contrato_cliente, tmp_path, monkeypatch):
+    destino = tmp_path / "outbox.jsonl"
+    monkeypatch.setenv("OUTBOX_DESTINO", str(destino))
+    agora = datetime.now()
+    for i in range(3):
+        db_session.add(Outbox(tipo="teste", canal="sms", destinatario=f"1199999000{i}", payload=json.dumps({"i": i}),
+                              status="pendente", tentativas=0, proxima_tentativa=agora, criado_em=agora))
+    enfileirar_job(db_session, "despachar_outbox", {"tamanho_lote": 2})
+    db_session.commit()
+
+    executar_proximo_job(client.app.state.session_factory, "teste")
+
+    linhas = [json.loads(linha) for linha in destino.read_text().splitlines()]
+    assert [linha["dados"]["i"] for linha in linhas] == [0, 1, 2]
+    assert {m.status for m in _outbox(db_session, "teste")} == {"enviado"}
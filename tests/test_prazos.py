@@ -0,0 +1,51 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from servicos.instrumentacao import MedicoesRequisicao, medicoes_atuais
+from servicos.metricas import exportar_metricas
+from servicos.prazos import PrazoExcedido
+
+# Conta até 50 milhões no SQLite: vários segundos sem o prazo
+CONSULTA_LENTA = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50000000) SELECT count(*) FROM n"
+)
+
+
+@pytest.fixture
+def prazos(app_teste):
+    prazos = app_teste.state.prazos_consultas
+    originais = dict(prazos.prazos_rotas)
+    yield prazos
+    prazos.prazos_rotas = originais
+
+
+def test_rota_com_prazo_vencido_responde_504(client, token_admin, prazos):
+    prazos.prazos_rotas["/admin/contratos"] = 1e-6
+    response = client.get("/admin/contratos", headers={"Authorization": f"Bearer {token_admin}"})
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Tempo limite da requisição excedido"
+    assert 'aureus_db_prazo_excedido_total{rota="/admin/contratos"}' in client.get("/metrics").text
+
+    # as demais rotas seguem com o prazo padrão
+    assert client.get("/admin/dashboard/metrics", headers={"Authorization": f"Bearer {token_admin}"}).status_code == 200
+
+
+def test_statement_lento_interrompido_no_sqlite(db_session, prazos):
+    prazos.prazos_rotas["/teste/lenta"] = 0.2
+    medicoes = MedicoesRequisicao({"route": SimpleNamespace(path="/teste/lenta")})
+    token = medicoes_atuais.set(medicoes)
+    try:
+        inicio = time.perf_counter()
+        with pytest.raises(PrazoExcedido):
+            db_session.execute(CONSULTA_LENTA)
+        assert time.perf_counter() - inicio < 1.5
+    finally:
+        medicoes_atuais.reset(token)
+        db_session.rollback()
+
+    # fora de requisição (jobs, scripts) não há prazo
+    assert db_session.execute(text("SELECT 1")).scalar() == 1
+    assert 'aureus_db_prazo_excedido_total{rota="/teste/lenta"}' in exportar_metricas()
@@ -0,0 +1,58 @@
+"""
+Orçamento de queries por endpoint: o número de statements não pode crescer
+com a quantidade de linhas (protege contra regressões N+1).
+"""
+import pytest
+
+
+@pytest.mark.parametrize("qtde", [1, 8])
+def test_queries_contratos_cliente(client, token_cliente, cliente_id, fabrica_contratos, contar_queries, qtde):
+    fabrica_contratos(qtde)
+    with contar_queries() as queries:
+        response = client.get(
+            f"/cliente/contratos/{cliente_id}",
+            headers={"Authorization": f"Bearer {token_cliente}"}
+        )
+    assert response.status_code == 200
+    assert response.json()["total"] == qtde
+    assert len(queries) <= 2, queries.statements
+
+
+@pytest.mark.parametrize("qtde", [1, 8])
+def test_queries_solicitacoes_abertas(client, token_admin, fabrica_contratos, contar_queries, qtde):
+    fabrica_contratos(qtde, status="pendente")
+    with contar_queries() as queries:
+        response = client.get("/admin/solicitacoes", headers={"Authorization": f"Bearer {token_admin}"})
+    assert response.status_code == 200
+    assert response.json()["total"] == qtde
+    assert len(queries) <= 2, queries.statements
+
+
+@pytest.mark.parametrize("qtde", [1, 8])
+def test_queries_contratos_vigentes(client, token_admin, fabrica_contratos, contar_queries, qtde):
+    fabrica_contratos(qtde, status="ativo")
+    with contar_queries() as queries:
+        response = client.get("/admin/contratos", headers={"Authorization": f"Bearer {token_admin}"})
+    assert response.status_code == 200
+    assert response.json()["total"] == qtde
+    assert len(queries) <= 2, queries.statements
+
+
+@pytest.mark.parametrize("qtde", [1, 8])
+def test_queries_dashboard(client, token_admin, fabrica_contratos, contar_queries, qtde):
+    fabrica_contratos(qtde, status="ativo")
+    with contar_queries() as queries:
+        response = client.get("/admin/dashboard/metrics", headers={"Authorization": f"Bearer {token_admin}"})
+    assert response.status_code == 200
+    assert response.json()["contratos_ativos"] == qtde
+    assert len(queries) <= 5, queries.statements
+
+
+def test_queries_detalhe_contrato(client, token_cliente, contrato_cliente, contar_queries):
+    with contar_queries() as queries:
+        response = client.get(
+            f"/cliente/contrato/{contrato_cliente}",
+            headers={"Authorization": f"Bearer {token_cliente}", "Cache-Control": "no-cache"}
+        )
+    assert response.status_code == 200
+    assert len(queries) <= 6, queries.statements
@@ -0,0 +1,151 @@
+import pytest
+from sqlalchemy import update
+
+from models import Contrato, Financeiro, Parcela, Renegociacao
+from servicos.jobs import executar_proximo_job
+from servicos.renegociacao import calcular_parcelas, saldo_devedor, planejar, repreciar_contratos
+from datetime import date
+
+
+def test_calculo_price_e_sac():
+    price = calcular_parcelas(10000, 1.5, 12, "price")
+    assert len(set(price)) == 1
+    assert saldo_devedor(price, 1.5) == pytest.approx(10000, abs=0.1)
+
+    sac = calcular_parcelas(12000, 1.0, 12, "sac")
+    assert sac[0] == 1000 + 120 and sac[-1] == 1000 + 10
+    assert saldo_devedor(sac, 1.0) == pytest.approx(12000, abs=0.1)
+
+    # mesma parcela, saldo menor: prazo menor e parcela igual ou menor
+    plano = planejar(price, 1, date(2026, 1, 31), 1.5, "price", valor_antecipado=5000)
+    assert len(plano.parcelas) < 12
+    assert plano.parcelas[0][1] <= price[0]
+    assert [vencimento for _, _, vencimento in plano.parcelas[:2]] == [date(2026, 1, 31), date(2026, 2, 28)]
+
+
+def _parcelas_abertas(db_session, id_contrato):
+    return db_session.query(Parcela).join(Financeiro).filter(
+        Financeiro.id_contrato == id_contrato, Parcela.status == "pendente"
+    ).order_by(Parcela.numero_parcela).all()
+
+
+def _antecipar(client, token, id_contrato, **dados):
+    return client.post(
+        f"/cliente/contrato/{id_contrato}/antecipacao", json=dados, headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+def test_antecipacao_reduz_prazo_em_statements_em_lote(client, token_cliente, db_session, fabrica_contratos, contar_queries):
+    [id_contrato] = fabrica_contratos(1, status="ativo")
+
+    simulacao = _antecipar(client, token_cliente, id_contrato, valor=15000, simular=True).json()
+    assert simulacao["simulacao"] is True
+    assert len(_parcelas_abertas(db_session, id_contrato)) == 12
+
+    with contar_queries() as queries:
+        response = _antecipar(client, token_cliente, id_contrato, valor=15000, modo="prazo")
+    assert response.status_code == 200, response.text
+    resultado = response.json()
+    assert resultado["parcelas_novas"] < 12
+    assert resultado["saldo_novo"] == pytest.approx(resultado["saldo_anterior"] - 15000, abs=0.01)
+
+    # leitura do contrato e das parcelas + um UPDATE em lote, um DELETE, o financeiro e o histórico
+    escritas = [s for s in queries.statements if s.startswith(("UPDATE parcela", "INSERT INTO parcela", "DELETE FROM parcela"))]
+    assert [s.split()[0] for s in escritas] == ["UPDATE", "DELETE"]
+
+    db_session.expire_all()
+    abertas = _parcelas_abertas(db_session, id_contrato)
+    assert len(abertas) == resultado["parcelas_novas"]
+    assert float(abertas[0].valor_parcela) == resultado["parcelas"][0]["valor_parcela"] <= 4500
+    financeiro = db_session.query(Financeiro).filter(Financeiro.id_contrato == id_contrato).one()
+    assert financeiro.qtde_parcelas == resultado["parcelas_novas"]
+    assert db_session.query(Renegociacao).filter(Renegociacao.id_financeiro == financeiro.id_financeiro).count() == 1
+
+
+def test_antecipacao_reduz_parcela(client, token_cliente, fabrica_contratos):
+    [id_contrato] = fabrica_contratos(1, status="ativo")
+    resultado = _antecipar(client, token_cliente, id_contrato, valor=10000, modo="parcela").json()
+    assert resultado["parcelas_novas"] == 12
+    assert resultado["parcelas"][0]["valor_parcela"] < 4500
+
+
+def test_antecipacao_do_saldo_quita_contrato(client, token_cliente, db_session, fabrica_contratos):
+    [id_contrato] = fabrica_contratos(1, status="ativo")
+    saldo = _antecipar(client, token_cliente, id_contrato, valor=1, simular=True).json()["saldo_anterior"]
+
+    assert _antecipar(client, token_cliente, id_contrato, valor=saldo + 100).status_code == 400
+    resultado = _antecipar(client, token_cliente, id_contrato, valor=saldo).json()
+    assert resultado["quitado"] is True
+
+    db_session.expire_all()
+    assert db_session.get(Contrato, id_contrato).status == "quitado"
+    assert _parcelas_abertas(db_session, id_contrato) == []
+
+
+def test_antecipacao_exige_contrato_ativo(client, token_cliente, contrato_cliente):
+    response = _antecipar(client, token_cliente, contrato_cliente, valor=1000)
+    assert response.status_code == 400
+
+
+def test_renegociacao_admin_para_sac(client, token_admin, db_session, fabrica_contratos):
+    [id_contrato] = fabrica_contratos(1, status="ativo")
+    response = client.post(
+        f"/admin/contrato/{id_contrato}/renegociacao",
+        json={"qtde_parcelas": 24, "sistema": "sac", "taxa_juros": 1.2},
+        headers={"Authorization": f"Bearer {token_admin}"}
+    )
+    assert response.status_code == 200, response.text
+    valores = [p["valor_parcela"] for p in response.json()["parcelas"]]
+    assert len(valores) == 24 and valores == sorted(valores, reverse=True)
+
+    db_session.expire_all()
+    abertas = _parcelas_abertas(db_session, id_contrato)
+    assert [p.numero_parcela for p in abertas] == list(range(1, 25))
+    financeiro = db_session.query(Financeiro).filter(Financeiro.id_contrato == id_contrato).one()
+    assert (financeiro.sistema_amortizacao, float(financeiro.taxa_juros), financeiro.qtde_parcelas) == ("sac", 1.2, 24)
+
+
+def test_repreciamento_em_lote(client, token_admin, db_session, fabrica_contratos):
+    ids = fabrica_contratos(3, status="ativo")
+    fabrica_contratos(1)  # pendente: fica de fora
+
+    response = client.post("/admin/contratos/repreciar", json={"taxa_juros": 1.0, "taxa_anterior": 1.5},
+                           headers={"Authorization": f"Bearer {token_admin}"})
+    assert response.status_code == 202
+    id_job = response.json()["id_job"]
+    assert executar_proximo_job(client.app.state.session_factory, "teste") == id_job
+
+    job = client.get(f"/admin/jobs/{id_job}", headers={"Authorization": f"Bearer {token_admin}"}).json()
+    assert job["status"] == "concluido"
+    assert job["resultado"]["repreciados"] == 3
+
+    db_session.expire_all()
+    for id_contrato in ids:
+        abertas = _parcelas_abertas(db_session, id_contrato)
+        assert len(abertas) == 12
+        assert float(abertas[0].valor_parcela) < 4500
+    # taxa_anterior não bate mais: nada a fazer
+    assert repreciar_contratos(db_session, 1.0, taxa_anterior=1.5) == {"repreciados": 0, "ignorados": 0}
+
+
+def test_repreciamento_nao_sobrescreve_parcela_paga_depois_da_leitura(db_session, fabrica_contratos, monkeypatch):
+    import servicos.renegociacao as renegociacao
+    [id_contrato] = fabrica_contratos(1, status="ativo")
+    primeira = _parcelas_abertas(db_session, id_contrato)[0]
+    valor_pago = float(primeira.valor_parcela)
+
+    ler_abertas = renegociacao._parcelas_em_aberto
+
+    def ler_e_pagar(session, ids_financeiro):
+        abertas = ler_abertas(session, ids_financeiro)
+        # baixa concorrente: a parcela é paga entre a leitura e o UPDATE do lote
+        session.execute(update(Parcela).where(Parcela.id_parcela == primeira.id_parcela).values(status="paga"))
+        return abertas
+
+    monkeypatch.setattr(renegociacao, "_parcelas_em_aberto", ler_e_pagar)
+    assert repreciar_contratos(db_session, 1.0, taxa_anterior=1.5)["repreciados"] == 1
+
+    db_session.expire_all()
+    paga = db_session.get(Parcela, primeira.id_parcela)
+    assert (paga.status, float(paga.valor_parcela)) == ("paga", valor_pago)
+    assert all(float(p.valor_parcela) < valor_pago for p in _parcelas_abertas(db_session, id_contrato))
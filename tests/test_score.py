@@ -0,0 +1,56 @@
+from models import Financeiro
+from servicos.score import avaliar_risco, recalcular_scores_pendentes
+
+
+def test_avaliar_risco():
+    # parcela de 1.000 para renda de 10.000, financiando 80% do veículo, sem outros contratos
+    avaliacao = avaliar_risco(1000, 10000, 50000, 10000, 0)
+    assert avaliacao.comprometimento_renda == 0.1
+    assert avaliacao.ltv == 0.8
+    assert avaliacao.score_risco == 1000 - 100 - 240
+
+    # sem renda: penalidade máxima de comprometimento
+    assert avaliar_risco(1000, None, 50000, 10000, 0).score_risco == 1000 - 500 - 240
+    # mais exposição, score menor
+    assert avaliar_risco(1000, 10000, 50000, 10000, 60000).score_risco < avaliacao.score_risco
+
+
+def test_solicitacao_criada_com_score(client, token_cliente, token_admin, cliente_id):
+    dados = {
+        "id_cliente": cliente_id, "tipoVeiculo": "carros", "marcaNome": "Fiat", "modeloNome": "Uno",
+        "anoSelecionado": "2024-1",
+        "veiculo": {"placa": "SCR1234", "numChassi": "9BWSCORE567890123", "numRenavam": "55555555555", "cor": "Preto"},
+        "financeiro": {"valorVeiculo": 50000.0, "valorEntrada": 10000.0, "parcelasSelecionadas": 36,
+                       "taxaJuros": 1.5, "rendaMensal": 8000.0, "valorParcela": 1500.0, "totalPagar": 54000.0}
+    }
+    response = client.post("/cliente/solicitacao", json=dados, headers={"Authorization": f"Bearer {token_cliente}"})
+    assert response.status_code == 200
+
+    detalhe = client.get(
+        f"/admin/solicitacao/{response.json()['id_contrato']}", headers={"Authorization": f"Bearer {token_admin}"}
+    ).json()
+    avaliacao = detalhe["avaliacao_risco"]
+    assert avaliacao["renda_mensal"] == 8000.0
+    assert avaliacao["comprometimento_renda"] == 0.1875
+    assert avaliacao["ltv"] == 0.8
+    assert avaliacao["score_risco"] == avaliar_risco(1500, 8000, 50000, 10000, 0).score_risco
+
+
+def test_recalculo_em_lote_e_ordenacao(client, token_admin, db_session, fabrica_contratos):
+    headers = {"Authorization": f"Bearer {token_admin}"}
+    ids = fabrica_contratos(3)
+    # entradas diferentes para scores diferentes
+    for id_contrato, entrada in zip(ids, [0, 25000, 10000]):
+        db_session.query(Financeiro).filter(Financeiro.id_contrato == id_contrato).update({"valor_entrada": entrada})
+    db_session.commit()
+
+    assert recalcular_scores_pendentes(db_session, tamanho_lote=2) == 3
+
+    maior_risco = client.get("/admin/solicitacoes?ordenar=score", headers=headers).json()["solicitacoes"]
+    assert [s["id_contrato"] for s in maior_risco] == [ids[0], ids[2], ids[1]]
+    menor_risco = client.get("/admin/solicitacoes?ordenar=-score", headers=headers).json()["solicitacoes"]
+    assert [s["id_contrato"] for s in menor_risco] == [ids[1], ids[2], ids[0]]
+
+    corte = maior_risco[1]["score_risco"]
+    filtradas = client.get(f"/admin/solicitacoes?score_minimo={corte}", headers=headers).json()
+    assert {s["id_contrato"] for s in filtradas["solicitacoes"]} == {ids[1], ids[2]}
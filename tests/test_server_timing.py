@@ -0,0 +1,38 @@
+import pytest
+
+
+def test_header_server_timing(client, usuario_cliente, contar_queries):
+    with contar_queries() as queries:
+        response = client.post(
+            "/auth/login",
+            json={"login": "cliente_teste", "senha": "senha123"}
+        )
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    metricas = {item.split(";")[0].strip(): item for item in timing.split(",")}
+    assert set(metricas) == {"db", "hash", "ser", "app", "total"}
+    assert len(queries) == 2
+    # o header também conta os SAVEPOINTs do isolamento por teste emitidos durante a requisição
+    queries_header = int(metricas["db"].split('desc="')[1].split(" ")[0])
+    assert len(queries) <= queries_header <= len(queries) + queries.savepoints
+    assert float(metricas["hash"].split("dur=")[1]) > 0
+
+
+def test_statement_com_erro_nao_deixa_resto_na_conexao(engine):
+    from sqlalchemy import text
+    from servicos.instrumentacao import MedicoesRequisicao, medicoes_atuais
+
+    medicoes = MedicoesRequisicao()
+    token = medicoes_atuais.set(medicoes)
+    try:
+        with engine.connect() as conexao:
+            with pytest.raises(Exception):
+                conexao.execute(text("SELECT * FROM tabela_que_nao_existe"))
+            conexao.rollback()
+            assert conexao.execute(text("SELECT 1")).scalar() == 1
+            assert not [chave for chave in conexao.info if "inicio" in str(chave)]
+    finally:
+        medicoes_atuais.reset(token)
+    # só os statements concluídos contam (o SELECT e os BEGINs do isolamento dos testes)
+    assert medicoes.db_queries == 3